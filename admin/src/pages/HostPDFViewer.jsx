@@ -11,6 +11,7 @@ const HostPDFViewer = () => {
   const [status, setStatus] = useState('Pending');
   const [property, setProperty] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [showPdf, setShowPdf] = useState(false);
 
   useEffect(() => {
     const fetchProperty = async () => {
@@ -33,6 +34,10 @@ const HostPDFViewer = () => {
 
   const host = property.createdBy || {};
   const pdfUrl = property.healthReportPDF || '/sample-property-report.pdf';
+  // The per-wall analysis stored with the property renders without downloading the PDF
+  const analysis = property.healthAnalysis;
+  const walls = analysis && analysis.walls ? Object.entries(analysis.walls) : [];
+  const wallLabel = (wall) => `${wall.charAt(0).toUpperCase()}${wall.slice(1).toLowerCase()} Wall`;
 
   const handleToggleVerification = () => {
     if (status === 'Verified') {
@@ -49,16 +54,41 @@ const HostPDFViewer = () => {
       <h1 className="dashboard-title">Verify Host</h1>
       <p className="dashboard-subtitle">Verifying: {host.fullName || 'N/A'} ({host.email || 'N/A'})</p>
 
-      <div className="pdf-container">
-        <iframe
-          className="pdf-viewer"
-          src={pdfUrl}
-          title="Host Document"
-          loading="lazy"
-        >
-          Your browser does not support iframes. <a href={pdfUrl} target="_blank" rel="noopener noreferrer">Click here</a> to view.
-        </iframe>
-      </div>
+      {walls.length > 0 && !showPdf ? (
+        <div className="health-report">
+          <div className="health-report-summary">
+            <span>Overall Score: <strong>{Number(analysis.averageScore).toFixed(1)}/10</strong></span>
+            {analysis.severity && <span>Severity: <strong>{analysis.severity}</strong></span>}
+            {analysis.recommendation && <span>{analysis.recommendation}</span>}
+          </div>
+          <div className="health-report-walls">
+            {walls.map(([wall, result]) => (
+              <div className="health-report-wall" key={wall}>
+                <h3>{wallLabel(wall)}</h3>
+                <img src={result.annotatedUrl || result.imageUrl} alt={wallLabel(wall)} loading="lazy" />
+                <p>Score: <strong>{Number(result.score).toFixed(1)}/10</strong> · {result.crackCount} cracks detected</p>
+                {result.quality && (result.quality.issues?.length > 0 || result.quality.duplicateOf) && (
+                  <p className="health-report-issues">
+                    Retake: {[...(result.quality.issues || []),
+                      ...(result.quality.duplicateOf ? [`duplicate of ${result.quality.duplicateOf}`] : [])].join('; ')}
+                  </p>
+                )}
+              </div>
+            ))}
+          </div>
+        </div>
+      ) : (
+        <div className="pdf-container">
+          <iframe
+            className="pdf-viewer"
+            src={pdfUrl}
+            title="Host Document"
+            loading="lazy"
+          >
+            Your browser does not support iframes. <a href={pdfUrl} target="_blank" rel="noopener noreferrer">Click here</a> to view.
+          </iframe>
+        </div>
+      )}
 
       <div className="verification-actions">
         <button
@@ -70,6 +100,11 @@ const HostPDFViewer = () => {
         <p className="verification-status">
           Current Status: <strong>{status}</strong>
         </p>
+        {walls.length > 0 && (
+          <button className="toggle-btn" onClick={() => setShowPdf(!showPdf)}>
+            {showPdf ? '📊 View Analysis' : '📄 View PDF'}
+          </button>
+        )}
         <button className="toggle-btn" onClick={() => navigate(-1)}>🔙 Go Back</button>
       </div>
     </section>
@@ -26,6 +26,9 @@ const propertySchema = new mongoose.Schema(
       default: "pending",
     },
     healthReportPDF: { type: String },
+    healthScore: { type: Number, min: 0, max: 10 },
+    // Per-wall crack results of the last analysis, used to re-run only changed walls
+    healthAnalysis: { type: mongoose.Schema.Types.Mixed },
     adminReview: {
       rating: { type: Number, min: 1, max: 5 },
       comment: { type: String, maxlength: 500 },
@@ -0,0 +1,51 @@
+import numpy as np
+
+from config import ANNOTATION_WIDTH_MM, ANNOTATION_HEIGHT_MM, ANNOTATION_DPI, ANNOTATION_JPEG_QUALITY
+
+# Size in pixels of the box a wall image is printed in
+ANNOTATION_WIDTH = round(ANNOTATION_WIDTH_MM / 25.4 * ANNOTATION_DPI)
+ANNOTATION_HEIGHT = round(ANNOTATION_HEIGHT_MM / 25.4 * ANNOTATION_DPI)
+# Settings that change the annotated JPEG, part of every detection cache key
+ANNOTATION_SETTINGS = f"{ANNOTATION_WIDTH}x{ANNOTATION_HEIGHT}:q{ANNOTATION_JPEG_QUALITY}"
+CRACK_COLOR = (56, 56, 255)  # BGR
+
+
+def draw_annotation(image_bgr, boxes, confidences, scale=1.0):
+    """BGR copy of `image_bgr` resized by `scale`, with one labelled rectangle per crack.
+
+    `boxes` (xyxy, in original image pixels) and `confidences` may be arrays or lists.
+    """
+    import cv2
+
+    height, width = image_bgr.shape[:2]
+    if scale != 1.0:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        canvas = cv2.resize(image_bgr, size, interpolation=cv2.INTER_AREA)
+    else:
+        canvas = image_bgr.copy()
+
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    corners = np.rint(boxes * scale).astype(np.int32)
+    np.clip(corners, 0, [canvas.shape[1] - 1, canvas.shape[0] - 1] * 2, out=corners)
+    labels = [f"Crack {conf:.2f}" for conf in np.asarray(confidences, dtype=np.float32).tolist()]
+
+    line_width = max(2, round(sum(canvas.shape[:2]) / 2 * 0.003))
+    for (x1, y1, x2, y2), label in zip(corners.tolist(), labels):
+        cv2.rectangle(canvas, (x1, y1), (x2, y2), CRACK_COLOR, line_width)
+        cv2.putText(canvas, label, (x1 + line_width, max(10, y1 - 4)), cv2.FONT_HERSHEY_SIMPLEX, 0.4,
+                    CRACK_COLOR, 1, cv2.LINE_AA)
+    return canvas
+
+
+def render_annotation(image_bgr, boxes, confidences, width=ANNOTATION_WIDTH, height=ANNOTATION_HEIGHT,
+                      quality=ANNOTATION_JPEG_QUALITY):
+    """JPEG of `image_bgr` with crack boxes drawn, downscaled to fit within `width` x `height`."""
+    import cv2
+
+    original_height, original_width = image_bgr.shape[:2]
+    scale = min(1.0, width / original_width, height / original_height)
+    canvas = draw_annotation(image_bgr, boxes, confidences, scale)
+    ok, encoded = cv2.imencode(".jpg", canvas, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Could not encode the annotated image")
+    return encoded.tobytes()
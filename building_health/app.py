@@ -1,16 +1,123 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
-from building_health_report import generate_building_health_report
+from building_health_report import analyze_property_images, load_wall_analysis
+from config import (
+    ANALYZE_ASYNC, ANALYZE_RETRY_AFTER, ARTIFACT_DIR, ARTIFACT_STORE, INFERENCE_BACKEND, MODEL_PRELOAD,
+    PROFILE_REQUESTS,
+)
+from detection_cache import detection_cache
+from event_stream import EventStream
+from jobs import JobQueue, QueueFullError
+from model_registry import registry
+from profiling import profile_if_slow
+from quality_gate import ImageQualityError
+from report_renderer import render_html, render_json, report_document
+import metrics
 import logging
+import os
+import threading
 
 app = Flask(__name__)
 CORS(app)
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+
+def warm_up_in_background():
+    """Warm every configured model; /healthz answers right away and /readyz once this finishes."""
+    threading.Thread(target=registry.warm_up_all, name="model-warm-up", daemon=True).start()
+
+
+if not MODEL_PRELOAD:
+    warm_up_in_background()
+elif INFERENCE_BACKEND == "pytorch":
+    # Runs in the gunicorn master with --preload, so workers fork with the weights loaded
+    registry.warm_up_all()
+else:
+    # ONNX Runtime / OpenVINO thread pools do not survive fork(); gunicorn's post_fork warms each worker
+    logging.info(f"⏭️ Not preloading the {INFERENCE_BACKEND} backend in the master process")
+
+job_queue = JobQueue()
+metrics.CallbackMetric(
+    "building_health_job_queue_depth", "Analysis jobs waiting for a worker.", job_queue.depth)
+
+
+def run_pipeline(images, property_id, mode, profile=False, previous_analysis=None, on_event=None):
+    with metrics.requests_in_flight.track_in_progress(), metrics.request_duration.time(mode=mode):
+        with profile_if_slow(f"analyze_{property_id}", enabled=profile):
+            try:
+                cloudinary_pdf_url, wall_analysis = analyze_property_images(
+                    images, property_id, previous_analysis, on_event)
+            except ImageQualityError:
+                metrics.requests_total.inc(mode=mode, status="bad_images")
+                raise
+            except Exception:
+                metrics.failures.inc(stage="analysis")
+                metrics.requests_total.inc(mode=mode, status="error")
+                raise
+    metrics.requests_total.inc(mode=mode, status="ok" if cloudinary_pdf_url else "upload_failed")
+    return cloudinary_pdf_url, wall_analysis
+
+
+def run_analysis_job(images, property_id, profile=False, previous_analysis=None):
+    cloudinary_pdf_url, wall_analysis = run_pipeline(images, property_id, "async", profile, previous_analysis)
+    if not cloudinary_pdf_url:
+        raise RuntimeError("Cloudinary upload failed.")
+    return {"pdf_url": cloudinary_pdf_url, "analysis": wall_analysis}
+
+
+def run_analysis_stream(stream, images, property_id, profile=False, previous_analysis=None):
+    stream.emit("started", {"walls": len(images)})
+    try:
+        cloudinary_pdf_url, wall_analysis = run_pipeline(
+            images, property_id, "stream", profile, previous_analysis, on_event=stream.emit)
+    except ImageQualityError as e:
+        stream.close("error", {"message": str(e), "issues": e.issues})
+        raise
+    except Exception as e:
+        stream.close("error", {"message": f"Analysis failed: {e}"})
+        raise
+    if not cloudinary_pdf_url:
+        stream.close("error", {"message": "Cloudinary upload failed."})
+        raise RuntimeError("Cloudinary upload failed.")
+    stream.close("done", {"pdf_url": cloudinary_pdf_url, "analysis": wall_analysis})
+    return {"pdf_url": cloudinary_pdf_url, "analysis": wall_analysis}
+
+
+def queue_full_response(mode, property_id):
+    metrics.requests_total.inc(mode=mode, status="rejected")
+    logging.warning(f"⚠️ Analysis queue full, rejecting property {property_id}")
+    response = jsonify({"message": "Analysis queue is full, try again later."})
+    response.headers["Retry-After"] = str(ANALYZE_RETRY_AFTER)
+    return response, 503
+
+
+def previous_analysis_for(data, property_id):
+    """Per-wall results stored with the property, when the client asks for an incremental run.
+
+    Results sent in the request are never used: they would be published and stored as if
+    the detector had produced them.
+    """
+    if data.get("incremental") and not property_id.startswith("temp_"):
+        return load_wall_analysis(property_id)
+    return None
+
+
 @app.route("/", methods=["GET"])
 def home():
     return "🏗️ Building Health Analysis Server Running"
 
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    return jsonify({"status": "ok"}), 200
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    if registry.is_warm():
+        return jsonify({"status": "ready"}), 200
+    if registry.warm_up_errors:
+        return jsonify({"status": "failed", "errors": registry.warm_up_errors}), 503
+    return jsonify({"status": "warming"}), 503
+
 @app.route("/analyze", methods=["POST"])
 def analyze():
     try:
@@ -21,20 +128,116 @@ def analyze():
         if not images or not property_id:
             return jsonify({"message": "Missing image data or property ID"}), 400
 
-        cloudinary_pdf_url = generate_building_health_report(images, property_id)
+        profile = PROFILE_REQUESTS or request.args.get("profile") == "1"
+        previous_analysis = previous_analysis_for(data, property_id)
+
+        if data.get("async", ANALYZE_ASYNC):
+            if not (4 <= len(images) <= 6):
+                return jsonify({"message": "Number of images must be between 4 and 6."}), 400
+            try:
+                job = job_queue.submit(run_analysis_job, images, property_id, profile, previous_analysis)
+            except QueueFullError:
+                return queue_full_response("async", property_id)
+
+            return jsonify({
+                "message": "Analysis queued.",
+                "job_id": job.id,
+                "status_url": f"/jobs/{job.id}"
+            }), 202
+
+        cloudinary_pdf_url, wall_analysis = run_pipeline(images, property_id, "sync", profile, previous_analysis)
 
         if not cloudinary_pdf_url:
             return jsonify({"message": "Cloudinary upload failed."}), 500
 
         return jsonify({
             "message": "Analysis complete.",
-            "pdf_url": cloudinary_pdf_url
+            "pdf_url": cloudinary_pdf_url,
+            "analysis": wall_analysis
         }), 200
+    except ImageQualityError as e:
+        logging.warning(f"⚠️ Rejected images for property {property_id}: {e}")
+        return jsonify({"message": str(e), "issues": e.issues}), 422
     except Exception as e:
         logging.error(f"❌ Error in /analyze: {e}")
         return jsonify({"message": "Analysis failed"}), 500
 
+@app.route("/analyze/stream", methods=["POST"])
+def analyze_stream():
+    """Like /analyze, but answers with Server-Sent Events as each wall and stage finishes.
+
+    Events: queued, started, fetched and wall (per wall), report, uploaded, then a final
+    done (pdf_url and analysis) or error, after which the stream ends.
+    """
+    try:
+        data = request.get_json()
+        images = data.get("images")
+        property_id = data.get("propertyId")
+
+        if not images or not property_id:
+            return jsonify({"message": "Missing image data or property ID"}), 400
+        if not (4 <= len(images) <= 6):
+            return jsonify({"message": "Number of images must be between 4 and 6."}), 400
+
+        profile = PROFILE_REQUESTS or request.args.get("profile") == "1"
+        previous_analysis = previous_analysis_for(data, property_id)
+        stream = EventStream()
+        # Emitted before submitting so it always precedes the job's own events
+        stream.emit("queued", {"ahead": job_queue.depth()})
+        try:
+            job_queue.submit(run_analysis_stream, stream, images, property_id, profile, previous_analysis)
+        except QueueFullError:
+            return queue_full_response("stream", property_id)
+    except Exception as e:
+        logging.error(f"❌ Error in /analyze/stream: {e}")
+        return jsonify({"message": "Analysis failed"}), 500
+
+    return Response(stream, mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"message": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    if detection_cache is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"enabled": True, **detection_cache.stats()}), 200
+
+@app.route("/artifacts/<path:filename>", methods=["GET"])
+def artifact(filename):
+    # Stand-in for Cloudinary's CDN when reports are published with ARTIFACT_STORE=local
+    if ARTIFACT_STORE != "local":
+        return jsonify({"message": "Artifacts are not served by this server"}), 404
+    return send_from_directory(os.path.abspath(ARTIFACT_DIR), filename)
+
+@app.route("/report/<property_id>", methods=["GET"])
+def property_report(property_id):
+    """The stored analysis of a property as an HTML page, or as JSON with ?format=json."""
+    report_format = request.args.get("format", "html")
+    if report_format not in ("html", "json"):
+        return jsonify({"message": "format must be html or json"}), 400
+    try:
+        wall_analysis = load_wall_analysis(property_id)
+    except Exception as e:
+        logging.error(f"❌ Error loading the analysis of property {property_id}: {e}")
+        return jsonify({"message": "Could not load the report"}), 500
+    if not wall_analysis or not wall_analysis.get("walls"):
+        return jsonify({"message": "No analysis found for this property"}), 404
+
+    document = report_document(wall_analysis)
+    if report_format == "json":
+        return Response(render_json(document), mimetype="application/json")
+    return Response(render_html(document), mimetype="text/html")
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
-    import os
     port = int(os.environ.get("PORT", 5001))
     app.run(host="0.0.0.0", port=port, debug=False)
@@ -0,0 +1,131 @@
+import io
+import logging
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    ARTIFACT_STORE, ARTIFACT_DIR, ARTIFACT_BASE_URL,
+    CLOUDINARY_CLOUD_NAME, CLOUDINARY_API_KEY, CLOUDINARY_API_SECRET,
+    UPLOAD_WORKERS, UPLOAD_TIMEOUT, UPLOAD_RETRIES, UPLOAD_BACKOFF,
+)
+from fork_safety import PerProcess
+from metrics import failures, upload_retries
+
+
+class UploadError(Exception):
+    pass
+
+
+class ArtifactStore(ABC):
+    """Where report artifacts are published. `put` stores bytes and returns their public URL.
+
+    `kind` is "raw" for the PDF and "image" for annotated wall images.
+    """
+
+    @abstractmethod
+    def put(self, data, name, kind="raw", timeout=UPLOAD_TIMEOUT):
+        pass
+
+    def retryable(self, error):
+        return True
+
+
+class CloudinaryStore(ArtifactStore):
+    def __init__(self, cloud_name=CLOUDINARY_CLOUD_NAME, api_key=CLOUDINARY_API_KEY,
+                 api_secret=CLOUDINARY_API_SECRET, pool_size=UPLOAD_WORKERS):
+        import cloudinary
+        import cloudinary.uploader
+        from cloudinary import utils
+
+        cloudinary.config(cloud_name=cloud_name, api_key=api_key, api_secret=api_secret, secure=True)
+        # The SDK's module-level connection pool keeps a single connection per host, so
+        # parallel uploads would each open (and then discard) their own
+        cloudinary.uploader._http = utils.get_http_connector(
+            cloudinary.config(), {**cloudinary.CERT_KWARGS, "maxsize": pool_size})
+
+    def put(self, data, name, kind="raw", timeout=UPLOAD_TIMEOUT):
+        import cloudinary.uploader
+
+        result = cloudinary.uploader.upload(
+            io.BytesIO(data),
+            resource_type=kind,
+            type="upload",  # Force public upload
+            filename=name,
+            timeout=timeout,
+        )
+        return result.get("secure_url")
+
+    def retryable(self, error):
+        from cloudinary.exceptions import AuthorizationRequired, BadRequest, NotAllowed, NotFound
+
+        # Rejected requests won't succeed on a second try
+        return not isinstance(error, (AuthorizationRequired, BadRequest, NotAllowed, NotFound))
+
+
+class LocalStore(ArtifactStore):
+    """Stores artifacts in a directory, for development and tests.
+
+    URLs point at `base_url` (e.g. the server's /artifacts route) or are file:// URLs.
+    """
+
+    def __init__(self, directory=ARTIFACT_DIR, base_url=ARTIFACT_BASE_URL):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+
+    def put(self, data, name, kind="raw", timeout=UPLOAD_TIMEOUT):
+        os.makedirs(self.directory, exist_ok=True)
+        filename = f"{uuid.uuid4().hex[:12]}_{os.path.basename(name)}"
+        path = os.path.join(self.directory, filename)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        if self.base_url:
+            return f"{self.base_url}/{filename}"
+        return "file://" + os.path.abspath(path)
+
+
+STORES = {"cloudinary": CloudinaryStore, "local": LocalStore}
+
+
+def create_store(name=ARTIFACT_STORE):
+    if name not in STORES:
+        raise ValueError(f"Unknown artifact store '{name}', expected one of {sorted(STORES)}")
+    return STORES[name]()
+
+
+def upload_artifact(store, data, name, kind="raw", timeout=UPLOAD_TIMEOUT, retries=UPLOAD_RETRIES):
+    """Store `data` with bounded, exponentially backed-off retries; returns its URL."""
+    if not data:
+        failures.inc(stage="upload")
+        raise UploadError(f"{name} is empty")
+
+    last_error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            upload_retries.inc(kind=kind)
+            time.sleep(UPLOAD_BACKOFF * 2 ** (attempt - 1))
+        try:
+            url = store.put(data, name, kind=kind, timeout=timeout)
+            if not url:
+                raise UploadError(f"No URL returned for {name}")
+            return url
+        except Exception as e:
+            last_error = e
+            logging.warning(f"⚠️ Upload attempt {attempt + 1}/{retries + 1} failed for {name}: {e}")
+            if not store.retryable(e):
+                break
+
+    failures.inc(stage="upload")
+    raise UploadError(f"Failed to upload {name}: {last_error}")
+
+
+# One pool shared by every request, created on first use in each (forked) process
+_executor = PerProcess(lambda: ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="artifact-upload"))
+
+
+def submit_upload(store, data, name, kind="raw"):
+    """Upload in the background on a pool shared by every request; returns a Future of the URL."""
+    return _executor.get().submit(upload_artifact, store, data, name, kind)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Regenerate health reports for many properties in one run, e.g. after retraining best.pt.
+
+Properties come from a JSONL manifest of {"propertyId": ..., "images": {...}} lines, or
+straight from the properties collection with --from-db. They are analysed by a pool of
+worker processes that each load the model once. Every finished property is appended to a
+checkpoint file, so running the same command again after an interruption skips the
+properties that are already done. Reports are written to MongoDB synchronously, so a
+property only counts as done once its report is stored.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from config import BATCH_CHECKPOINT, BATCH_WORKERS, COLLECTION_NAME, DATABASE_NAME, MONGO_URI
+
+
+def read_manifest(path):
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                yield str(entry["propertyId"]), entry["images"]
+            except (ValueError, KeyError) as e:
+                logging.error(f"❌ Skipping manifest line {line_number}: {e}")
+
+
+def read_collection(query=None, batch_size=500):
+    from pymongo import MongoClient
+
+    client = MongoClient(MONGO_URI)
+    try:
+        cursor = client[DATABASE_NAME][COLLECTION_NAME].find(
+            {"images": {"$exists": True}, **(query or {})}, {"images": 1}, batch_size=batch_size)
+        for doc in cursor:
+            images = {wall: url for wall, url in (doc.get("images") or {}).items() if url}
+            yield str(doc["_id"]), images
+    finally:
+        client.close()
+
+
+def load_checkpoint(path, retry_failed=False):
+    """Property ids already handled by an earlier run (only successes with retry_failed)."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A run killed mid-write leaves a truncated last line
+                continue
+            if entry["status"] == "done" or not retry_failed:
+                done.add(entry["propertyId"])
+            else:
+                done.discard(entry["propertyId"])
+    return done
+
+
+def init_worker():
+    from model_registry import registry
+
+    logging.getLogger().setLevel(logging.WARNING)
+    registry.warm_up()
+
+
+def analyze_property(property_id, images):
+    from building_health_report import generate_building_health_report
+
+    start = time.perf_counter()
+    try:
+        pdf_url = generate_building_health_report(images, property_id)
+        error = None if pdf_url else "Cloudinary upload failed."
+    except Exception as e:
+        pdf_url, error = None, str(e)
+    return {
+        "propertyId": property_id,
+        "status": "done" if pdf_url else "failed",
+        "pdf_url": pdf_url,
+        "error": error,
+        "walls": len(images),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+class Progress:
+    def __init__(self, every=25):
+        self.every = every
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.walls = 0
+        self.start = time.perf_counter()
+
+    def record(self, entry):
+        if entry["status"] == "done":
+            self.done += 1
+        else:
+            self.failed += 1
+            logging.error(f"❌ {entry['propertyId']}: {entry['error']}")
+        self.walls += entry["walls"]
+        if (self.done + self.failed) % self.every == 0:
+            logging.warning(f"📈 {self.summary()}")
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.start
+        finished = self.done + self.failed
+        return (f"{finished} properties ({self.done} done, {self.failed} failed) in {elapsed:.1f}s — "
+                f"{finished / elapsed:.2f} properties/s, {self.walls / elapsed:.1f} walls/s")
+
+
+def run_batch(items, checkpoint_path, executor, task=analyze_property, retry_failed=False, max_pending=None,
+              progress=None):
+    """Feed (property_id, images) pairs to `executor`, appending each result to the checkpoint."""
+    skip = load_checkpoint(checkpoint_path, retry_failed)
+    max_pending = max_pending or 2 * getattr(executor, "_max_workers", 1)
+    progress = progress or Progress()
+    pending = set()
+
+    os.makedirs(os.path.dirname(os.path.abspath(checkpoint_path)), exist_ok=True)
+    with open(checkpoint_path, "a+") as checkpoint:
+        # Terminate a line left half-written by a killed run so the next entry starts cleanly
+        if checkpoint.tell():
+            checkpoint.seek(checkpoint.tell() - 1)
+            if checkpoint.read(1) != "\n":
+                checkpoint.write("\n")
+
+        def drain(return_when):
+            nonlocal pending
+            finished, pending = wait(pending, return_when=return_when)
+            for future in finished:
+                entry = future.result()
+                checkpoint.write(json.dumps(entry) + "\n")
+                checkpoint.flush()
+                progress.record(entry)
+
+        for property_id, images in items:
+            if property_id in skip:
+                progress.skipped += 1
+                continue
+            skip.add(property_id)
+            # Keep only a few properties queued so a cursor over thousands is consumed lazily
+            if len(pending) >= max_pending:
+                drain(FIRST_COMPLETED)
+            pending.add(executor.submit(task, property_id, images))
+        if pending:
+            drain(ALL_COMPLETED)
+
+    return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--manifest", help="JSONL file of {propertyId, images} lines")
+    source.add_argument("--from-db", action="store_true", help="Read properties from MongoDB")
+    parser.add_argument("--query", help="Extra MongoDB filter as JSON, with --from-db")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Worker processes")
+    parser.add_argument("--checkpoint", default=BATCH_CHECKPOINT, help="Progress file used to resume")
+    parser.add_argument("--retry-failed", action="store_true", help="Analyse properties that failed last time again")
+    parser.add_argument("--progress-every", type=int, default=25, help="Log throughput every N properties")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    items = read_manifest(args.manifest) if args.manifest else read_collection(json.loads(args.query or "{}"))
+
+    # Split the cores between workers instead of every worker's runtime claiming all of them
+    os.environ.setdefault("INFERENCE_THREADS", str(max(1, (os.cpu_count() or 1) // args.workers)))
+    # A write-behind update could still fail after the property was checkpointed as done
+    os.environ["MONGO_WRITE_BEHIND"] = "0"
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context, initializer=init_worker) as executor:
+        progress = run_batch(items, args.checkpoint, executor, retry_failed=args.retry_failed,
+                             progress=Progress(args.progress_every))
+
+    print(f"✅ {progress.summary()}; {progress.skipped} skipped from {args.checkpoint}")
+
+
+if __name__ == "__main__":
+    main()
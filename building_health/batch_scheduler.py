@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+from config import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT
+from fork_safety import daemon_thread
+from metrics import Histogram
+from model_registry import registry as default_registry
+
+batch_size = Histogram(
+    "building_health_inference_batch_size", "Images per forward pass formed by the micro-batching scheduler.",
+    buckets=(1, 2, 4, 6, 8, 12, 16, 24, 32))
+queue_wait = Histogram(
+    "building_health_inference_queue_wait_seconds", "Time an image waited for its micro-batch to start.",
+    buckets=(0.001, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1, 2.5))
+
+
+class InferenceScheduler:
+    """Collects images from concurrent requests into shared forward passes of one model.
+
+    A batch starts as soon as `max_batch` images are waiting, or `max_wait` seconds after
+    the first one arrived. Batches are filled round-robin, one image per request at a time,
+    so a request with many walls cannot hold back one that arrived later with a few.
+    """
+
+    def __init__(self, model_name=None, options=None, max_batch=MICRO_BATCH_MAX_SIZE, max_wait=MICRO_BATCH_MAX_WAIT,
+                 registry=default_registry):
+        self.model_name = model_name
+        self.options = dict(options or {})
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self.registry = registry
+        self._requests = OrderedDict()
+        self._waiting = 0
+        self._condition = threading.Condition()
+        self._worker = daemon_thread(self._run, "inference-scheduler")
+
+    def predict(self, images):
+        """Results for `images` in order, computed together with other requests' images."""
+        futures = self.submit(images)
+        return [future.result() for future in futures]
+
+    def submit(self, images):
+        futures = [Future() for _ in images]
+        now = time.perf_counter()
+        with self._condition:
+            self._worker.get()
+            self._requests[object()] = deque((image, future, now) for image, future in zip(images, futures))
+            self._waiting += len(futures)
+            self._condition.notify()
+        return futures
+
+    def _next_batch(self):
+        with self._condition:
+            while not self._waiting:
+                self._condition.wait()
+            oldest = min(queue[0][2] for queue in self._requests.values())
+            deadline = oldest + self.max_wait
+            while self._waiting < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch = []
+            while len(batch) < self.max_batch and self._requests:
+                request, queue = next(iter(self._requests.items()))
+                batch.append(queue.popleft())
+                # Served requests go to the back of the line
+                if queue:
+                    self._requests.move_to_end(request)
+                else:
+                    del self._requests[request]
+            self._waiting -= len(batch)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            started = time.perf_counter()
+            for _, _, queued_at in batch:
+                queue_wait.observe(started - queued_at)
+            batch_size.observe(len(batch))
+            try:
+                results = self.registry.predict(
+                    [image for image, _, _ in batch], name=self.model_name, **self.options)
+                if len(results) != len(batch):
+                    raise RuntimeError(f"Model returned {len(results)} results for {len(batch)} images")
+            except Exception as e:
+                logging.error(f"❌ Micro-batch of {len(batch)} images failed: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(model_name=None, imgsz=None):
+    """The shared scheduler for a model and inference size (images in one batch share a size)."""
+    with _schedulers_lock:
+        key = (model_name, imgsz)
+        if key not in _schedulers:
+            _schedulers[key] = InferenceScheduler(model_name, {"imgsz": imgsz} if imgsz else None)
+        return _schedulers[key]
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of annotating one wall: the full-resolution PIL drawing and JPEG encode the
+pipeline used to do vs render_annotation's downscaled OpenCV path.
+
+Reports time and JPEG size per image, and the peak RSS of each variant. Each variant runs
+in its own subprocess so the peaks (which include OpenCV's and libjpeg's C allocations) do
+not mix; both load the same images first, so the difference between them is the rendering. Boxes are synthetic, so no model is needed.
+"""
+
+import argparse
+import glob
+import io
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from annotation import ANNOTATION_WIDTH, render_annotation
+from building_health_report import load_image_array
+
+DEFAULT_IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Dummy-Retakan-1", "test", "images")
+
+
+def synthetic_boxes(image, count):
+    height, width = image.shape[:2]
+    rng = np.random.default_rng(0)
+    corners = rng.uniform(0, 0.7, size=(count, 2)) * [width, height]
+    sizes = rng.uniform(0.05, 0.3, size=(count, 2)) * [width, height]
+    boxes = np.concatenate([corners, corners + sizes], axis=1).astype(np.float32)
+    return boxes, rng.uniform(0.3, 0.95, size=count).astype(np.float32)
+
+
+def full_resolution(image, boxes, confidences):
+    """The previous path: PIL drawing on the full-resolution image, then a JPEG encode."""
+    annotated = Image.fromarray(np.ascontiguousarray(image[:, :, ::-1]))
+    draw = ImageDraw.Draw(annotated)
+    line_width = max(2, round(sum(annotated.size) / 2 * 0.003))
+    for (x1, y1, x2, y2), conf in zip(boxes.tolist(), confidences.tolist()):
+        draw.rectangle((x1, y1, x2, y2), outline=(255, 56, 56), width=line_width)
+        draw.text((x1 + line_width, max(0, y1 - 12)), f"Crack {conf:.2f}", fill=(255, 56, 56))
+    buffer = io.BytesIO()
+    annotated.save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+VARIANTS = {"Full-res PIL": full_resolution, "Downscaled OpenCV": render_annotation}
+
+
+def peak_rss_kib():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def load_cases(args):
+    images = [load_image_array(path) for path in sorted(glob.glob(os.path.join(args.images, "*.jpg")))]
+    return images, [(image, *synthetic_boxes(image, args.boxes)) for image in images] * args.repeat
+
+
+def measure(render, cases):
+    """Timings, JPEG sizes, and peak RSS after loading the images and at the end."""
+    loaded = peak_rss_kib()
+    render(*cases[0])  # warm up imports and codecs
+    timings, sizes = [], []
+    for image, boxes, confidences in cases:
+        start = time.perf_counter()
+        data = render(image, boxes, confidences)
+        timings.append(time.perf_counter() - start)
+        sizes.append(len(data))
+    return {"timings": timings, "sizes": sizes, "loaded_rss": loaded, "peak_rss": peak_rss_kib()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", default=DEFAULT_IMAGES, help="Directory of wall images")
+    parser.add_argument("--boxes", type=int, default=8, help="Crack boxes drawn per image")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the image set")
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    images, cases = load_cases(args)
+    if args.variant:
+        print(json.dumps(measure(VARIANTS[args.variant], cases)))
+        return
+    if not images:
+        print(f"❌ No images found in {args.images}")
+        return
+    shapes = sorted({image.shape[1] for image in images})
+    print(f"🧪 {len(cases)} renders, {args.boxes} boxes each, source widths {shapes[0]}-{shapes[-1]} px, "
+          f"print width {ANNOTATION_WIDTH} px")
+
+    for label in VARIANTS:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--variant", label,
+                                 "--images", args.images, "--boxes", str(args.boxes), "--repeat", str(args.repeat)],
+                                check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.splitlines()[-1])
+        timings = result["timings"]
+        print(f"{label:<18} mean {statistics.mean(timings) * 1000:7.2f} ms"
+              f"   p95 {np.percentile(timings, 95) * 1000:7.2f} ms"
+              f"   peak RSS {result['peak_rss'] / 1024:7.1f} MiB (images {result['loaded_rss'] / 1024:.1f})"
+              f"   jpeg {statistics.mean(result['sizes']) / 1024:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
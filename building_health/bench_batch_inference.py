@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-property inference: sequential detect_cracks loop vs batched detect_cracks_batch
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import time
+
+from building_health_report import detect_cracks, detect_cracks_batch
+from model_registry import registry
+
+DEFAULT_IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Dummy-Retakan-1", "test", "images")
+
+
+def property_sets(images, walls_per_property):
+    for start in range(0, len(images) - walls_per_property + 1, walls_per_property):
+        chunk = images[start:start + walls_per_property]
+        yield {f"wall{i}": path for i, path in enumerate(chunk)}
+
+
+def bench(label, properties, run):
+    timings = []
+    for image_paths in properties:
+        start = time.perf_counter()
+        run(image_paths)
+        timings.append(time.perf_counter() - start)
+    print(f"{label:<24} mean {statistics.mean(timings) * 1000:8.1f} ms/property"
+          f"   p50 {statistics.median(timings) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", default=DEFAULT_IMAGES, help="Directory of wall images")
+    parser.add_argument("--walls", type=int, default=6, help="Walls per property (4-6)")
+    parser.add_argument("--batch-sizes", default="1,2,4,6", help="Comma separated batch sizes to try")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the image set")
+    args = parser.parse_args()
+
+    images = sorted(glob.glob(os.path.join(args.images, "*.jpg")))
+    properties = list(property_sets(images, args.walls)) * args.repeat
+    if not properties:
+        print(f"❌ Need at least {args.walls} images in {args.images}")
+        return
+
+    registry.warm_up()
+    print(f"🧪 {len(properties)} properties x {args.walls} walls")
+
+    bench("Sequential loop", properties,
+          lambda paths: [detect_cracks(path) for path in paths.values()])
+    for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+        bench(f"Batched (size {batch_size})", properties,
+              lambda paths: detect_cracks_batch(paths, batch_size=batch_size, micro_batch=False))
+
+
+if __name__ == "__main__":
+    main()
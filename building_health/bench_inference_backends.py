@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Compare inference backends on the Dummy-Retakan-1 images: latency per image and per
+6-wall batch, plus parity of every backend's detections against the PyTorch reference.
+
+A backend passes parity when each image gets the same crack count as PyTorch and every
+matched box overlaps its reference by at least --min-iou with a confidence within --tolerance.
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import time
+
+import numpy as np
+
+from config import YOLO_MODEL_PATH
+from image_fetch import decode_image
+from inference_backends import BACKENDS, create_backend, result_arrays
+from tiling import box_iou
+
+DEFAULT_IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Dummy-Retakan-1", "test", "images")
+
+
+def crack_arrays(result):
+    xyxy, conf, cls = result_arrays(result)
+    cracks = cls.astype(int) == 0
+    order = np.argsort(-conf[cracks], kind="stable")
+    return xyxy[cracks][order], conf[cracks][order]
+
+
+def parity(reference, candidate, min_iou, tolerance):
+    """(count matches, worst matched IoU, largest confidence difference) for one image."""
+    ref_boxes, ref_conf = reference
+    boxes, conf = candidate
+    if not len(ref_boxes) or not len(boxes):
+        return len(ref_boxes) == len(boxes), 1.0, 0.0
+    iou = box_iou(ref_boxes, boxes)
+    best = iou.argmax(axis=1)
+    matched_iou = iou[np.arange(len(ref_boxes)), best]
+    conf_diff = np.abs(ref_conf - conf[best])
+    ok = len(ref_boxes) == len(boxes) and matched_iou.min() >= min_iou and conf_diff.max() <= tolerance
+    return ok, float(matched_iou.min()), float(conf_diff.max())
+
+
+def time_backend(model, images, walls, repeat, options):
+    model(images[0], **options)
+    single = []
+    batched = []
+    for _ in range(repeat):
+        for image in images:
+            start = time.perf_counter()
+            model(image, **options)
+            single.append(time.perf_counter() - start)
+        for i in range(0, len(images) - walls + 1, walls):
+            start = time.perf_counter()
+            model(images[i:i + walls], **options)
+            batched.append(time.perf_counter() - start)
+    return single, batched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=YOLO_MODEL_PATH, help="PyTorch weights to export")
+    parser.add_argument("--images", default=DEFAULT_IMAGES, help="Directory of wall images")
+    parser.add_argument("--backends", default="pytorch,onnx,onnx-int8", help=f"Comma separated, from {BACKENDS}")
+    parser.add_argument("--walls", type=int, default=6, help="Walls per batch")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the image set")
+    parser.add_argument("--imgsz", type=int, default=640, help="Input size for every backend")
+    parser.add_argument("--min-iou", type=float, default=0.9, help="Minimum IoU of a matched box")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="Maximum confidence difference")
+    args = parser.parse_args()
+
+    images = []
+    for path in sorted(glob.glob(os.path.join(args.images, "*.jpg"))):
+        with open(path, "rb") as f:
+            images.append(decode_image(f.read()))
+    if not images:
+        print(f"❌ No images found in {args.images}")
+        return
+
+    options = {"imgsz": args.imgsz, "verbose": False}
+    backends = args.backends.split(",")
+    if "pytorch" not in backends:
+        backends.insert(0, "pytorch")
+    print(f"🧪 {len(images)} images, batches of {args.walls}, {args.repeat} passes")
+    print(f"{'backend':<12}{'load s':>8}{'img ms':>9}{'batch ms':>10}{'img/s':>8}{'parity':>9}{'min IoU':>9}{'max Δconf':>11}")
+
+    reference = None
+    for backend in backends:
+        start = time.perf_counter()
+        try:
+            model = create_backend(args.model, backend)
+        except ImportError as e:
+            print(f"{backend:<12} ⚠️ skipped, runtime not installed ({e.name})")
+            continue
+        load_time = time.perf_counter() - start
+
+        detections = [crack_arrays(model(image, **options)[0]) for image in images]
+        if reference is None:
+            reference = detections
+        checks = [parity(ref, det, args.min_iou, args.tolerance) for ref, det in zip(reference, detections)]
+        passed = sum(ok for ok, _, _ in checks)
+
+        single, batched = time_backend(model, images, args.walls, args.repeat, options)
+        batch_ms = statistics.mean(batched) * 1000 if batched else float("nan")
+        print(f"{backend:<12}{load_time:>8.1f}{statistics.mean(single) * 1000:>9.1f}{batch_ms:>10.1f}"
+              f"{1 / statistics.mean(single):>8.1f}{f'{passed}/{len(checks)}':>9}"
+              f"{min(iou for _, iou, _ in checks):>9.3f}{max(diff for _, _, diff in checks):>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
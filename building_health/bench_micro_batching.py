@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Load test of detector serving at increasing concurrency: every request running its own
+forward passes vs the micro-batching scheduler sharing them across requests.
+
+Each client thread sends requests of --walls decoded images back to back; a request's
+latency runs from submission until all of its walls have detections. With --large-job one
+extra client sends requests ten times that size, to show the small ones are not starved.
+"""
+
+import argparse
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+
+from batch_scheduler import InferenceScheduler
+from building_health_report import extract_detections, load_image_array
+from config import DEFAULT_MODEL_NAME, DETECT_BATCH_SIZE, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT
+from model_registry import registry
+from bench_pipeline import DATASET_DIR, StubResult
+
+
+class CostModel:
+    """Stub detector whose forward pass costs a fixed overhead plus a per-image share."""
+
+    def __init__(self, overhead, per_image):
+        self.overhead = overhead
+        self.per_image = per_image
+
+    def __call__(self, source, **kwargs):
+        images = source if isinstance(source, list) else [source]
+        time.sleep(self.overhead + self.per_image * len(images))
+        return [StubResult(image) for image in images]
+
+
+def direct(images):
+    results = []
+    for start in range(0, len(images), DETECT_BATCH_SIZE):
+        results += registry.predict(images[start:start + DETECT_BATCH_SIZE])
+    return [extract_detections(result, image) for result, image in zip(results, images)]
+
+
+def load_test(serve, images, concurrency, walls, duration, large_job):
+    latencies = {"small": [], "large": []}
+    done = {"walls": 0}
+    lock = threading.Lock()
+    stop = time.perf_counter() + duration
+
+    def client(index, kind, size):
+        position = index * size
+        while time.perf_counter() < stop:
+            request = [images[(position + i) % len(images)] for i in range(size)]
+            position += size
+            start = time.perf_counter()
+            serve(request)
+            with lock:
+                latencies[kind].append(time.perf_counter() - start)
+                done["walls"] += size
+
+    clients = [threading.Thread(target=client, args=(i, "small", walls)) for i in range(concurrency)]
+    if large_job:
+        clients.append(threading.Thread(target=client, args=(concurrency, "large", walls * 10)))
+    start = time.perf_counter()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return done["walls"] / elapsed, latencies
+
+
+def percentiles(samples):
+    values = np.asarray(samples) * 1000
+    return " ".join(f"p{p} {np.percentile(values, p):8.1f}" for p in (50, 95, 99))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="Comma separated client counts")
+    parser.add_argument("--walls", type=int, default=4, help="Walls per request")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per run")
+    parser.add_argument("--max-batch", type=int, default=MICRO_BATCH_MAX_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MICRO_BATCH_MAX_WAIT * 1000)
+    parser.add_argument("--large-job", action="store_true", help="Add one client sending 10x larger requests")
+    parser.add_argument("--stub-model", action="store_true",
+                        help="Replace the detector with a sleep-based cost model (no best.pt needed)")
+    parser.add_argument("--stub-overhead-ms", type=float, default=40, help="Stub cost per forward pass")
+    parser.add_argument("--stub-per-image-ms", type=float, default=15, help="Stub cost per image")
+    args = parser.parse_args()
+
+    if args.stub_model:
+        registry.set_model(DEFAULT_MODEL_NAME, CostModel(args.stub_overhead_ms / 1000, args.stub_per_image_ms / 1000))
+    registry.warm_up()
+
+    paths = sorted(glob.glob(os.path.join(DATASET_DIR, "test", "images", "*.jpg")))
+    images = [load_image_array(path) for path in paths]
+    if not images:
+        print(f"❌ No images found in {DATASET_DIR}")
+        return
+
+    scheduler = InferenceScheduler(max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000)
+
+    def micro_batched(request):
+        return [extract_detections(result, image) for result, image in zip(scheduler.predict(request), request)]
+
+    print(f"🧪 {args.walls} walls/request, {args.duration:.0f}s per run, "
+          f"micro-batches of up to {args.max_batch} within {args.max_wait_ms:.0f} ms")
+    print(f"{'clients':>7} {'mode':<14} {'walls/s':>8}   latency ms")
+    for concurrency in (int(value) for value in args.concurrency.split(",")):
+        for label, serve in (("direct", direct), ("micro-batched", micro_batched)):
+            throughput, latencies = load_test(serve, images, concurrency, args.walls, args.duration, args.large_job)
+            print(f"{concurrency:>7} {label:<14} {throughput:8.1f}   {percentiles(latencies['small'])}")
+            if latencies["large"]:
+                print(f"{'':>7} {'  large job':<14} {'':>8}   {percentiles(latencies['large'])}")
+
+
+if __name__ == "__main__":
+    main()
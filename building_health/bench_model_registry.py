@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-image detection latency: loading best.pt on every image vs the shared model registry
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import time
+
+from config import YOLO_MODEL_PATH
+from model_registry import ModelRegistry
+
+DEFAULT_IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Dummy-Retakan-1", "test", "images")
+
+
+def summarize(label, timings):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{label:<28} mean {statistics.mean(timings) * 1000:8.1f} ms"
+          f"   p50 {statistics.median(timings) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms")
+
+
+def bench_load_per_image(images, model_path):
+    from ultralytics import YOLO
+
+    timings = []
+    for image in images:
+        start = time.perf_counter()
+        YOLO(model_path)(image)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_registry(images, model_path):
+    registry = ModelRegistry({"bench": model_path}, default_name="bench")
+    start = time.perf_counter()
+    registry.warm_up()
+    print(f"Registry load + warm-up: {(time.perf_counter() - start) * 1000:.1f} ms (paid once per process)")
+
+    timings = []
+    for image in images:
+        start = time.perf_counter()
+        registry.predict(image)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", default=DEFAULT_IMAGES, help="Directory of wall images")
+    parser.add_argument("--model", default=YOLO_MODEL_PATH, help="Path to YOLO weights")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the image set")
+    args = parser.parse_args()
+
+    images = sorted(glob.glob(os.path.join(args.images, "*.jpg"))) * args.repeat
+    if not images:
+        print(f"❌ No images found in {args.images}")
+        return
+
+    print(f"🧪 {len(images)} images, model {args.model}")
+    summarize("Load best.pt per image", bench_load_per_image(images, args.model))
+    summarize("Shared registry", bench_registry(images, args.model))
+
+
+if __name__ == "__main__":
+    main()
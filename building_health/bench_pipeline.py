@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Per-stage benchmark of generate_building_health_report over the Dummy-Retakan-1 dataset.
+
+Wall images are served from a local HTTP server, Cloudinary uploads go to a temp directory
+and MongoDB is replaced by mongomock, so only our own pipeline is measured. Results are
+written as JSON so runs from different commits can be compared with --baseline.
+"""
+
+import argparse
+import functools
+import glob
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import cloudinary.uploader
+import mongomock
+import numpy as np
+
+import building_health_report as report
+import stage_timing
+from config import DEFAULT_MODEL_NAME, OUTPUT_DIR
+from inference_backends import ResultBoxes
+from model_registry import registry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_DIR = os.path.join(BASE_DIR, "Dummy-Retakan-1")
+STAGES = ["fetch", "decode", "quality", "inference", "annotate", "pdf", "upload", "db_update"]
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalUploader:
+    """Stand-in for cloudinary.uploader.upload that stores files in a local directory."""
+
+    def __init__(self, directory, latency=0.0):
+        self.directory = directory
+        self.latency = latency
+
+    def __call__(self, source, **options):
+        time.sleep(self.latency)
+        if hasattr(source, "read"):
+            data = source.read()
+            name = options.get("filename", "upload.bin")
+        else:
+            with open(source, "rb") as f:
+                data = f.read()
+            name = os.path.basename(source)
+        path = os.path.join(self.directory, f"{uuid.uuid4().hex}_{name}")
+        with open(path, "wb") as f:
+            f.write(data)
+        return {"secure_url": f"file://{path}"}
+
+
+class StubResult:
+    def __init__(self, image):
+        height, width = image.shape[:2]
+        self.orig_img = image
+        xyxy = np.array([[width * 0.2, height * 0.2, width * 0.6, height * 0.5]], dtype=np.float32)
+        self.boxes = ResultBoxes(xyxy, np.array([0.75], dtype=np.float32), np.zeros(1, dtype=np.float32))
+
+    def plot(self):
+        return self.orig_img.copy()
+
+
+class StubModel:
+    """Detector stand-in for machines without best.pt; everything but inference is still real."""
+
+    def __call__(self, source, **kwargs):
+        images = source if isinstance(source, list) else [source]
+        return [StubResult(report.load_image_array(image) if isinstance(image, str) else image) for image in images]
+
+
+class StageRecorder:
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, stage, seconds):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+
+def summarize(samples, elapsed):
+    values = np.asarray(samples) * 1000
+    return {
+        "count": len(samples),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "throughput_per_s": len(samples) / elapsed,
+    }
+
+
+def build_requests(base_url, count, walls, collection):
+    paths = sorted(glob.glob(os.path.join(DATASET_DIR, "test", "images", "*.jpg")))
+    paths += sorted(glob.glob(os.path.join(DATASET_DIR, "valid", "images", "*.jpg")))
+    urls = [f"{base_url}/{os.path.relpath(path, DATASET_DIR)}" for path in paths]
+
+    requests = []
+    for i in range(count):
+        images = {f"wall{w}": urls[(i * walls + w) % len(urls)] for w in range(walls)}
+        property_id = str(collection.insert_one({"title": f"Benchmark property {i}"}).inserted_id)
+        requests.append((images, property_id))
+    return requests
+
+
+def run(requests, concurrency):
+    recorder = StageRecorder()
+    latencies = []
+    failures = 0
+
+    def one(request):
+        nonlocal failures
+        start = time.perf_counter()
+        if not report.generate_building_health_report(*request):
+            failures += 1
+        latencies.append(time.perf_counter() - start)
+
+    stage_timing.add_listener(recorder)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, requests))
+        # Property updates are written behind the requests; count them in the run
+        report.get_property_updater().flush()
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_timing.remove_listener(recorder)
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(requests),
+        "failures": failures,
+        "elapsed_s": elapsed,
+        "requests_per_s": len(requests) / elapsed,
+        "request": summarize(latencies, elapsed),
+        "stages": {stage: summarize(recorder.samples[stage], elapsed) for stage in STAGES if stage in recorder.samples},
+    }
+
+
+def print_run(result):
+    print(f"\n📊 concurrency {result['concurrency']}: {result['requests']} requests in {result['elapsed_s']:.2f}s "
+          f"({result['requests_per_s']:.2f} req/s, {result['failures']} failed)")
+    print(f"   {'stage':<12}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}")
+    for stage, stats in list(result["stages"].items()) + [("request", result["request"])]:
+        print(f"   {stage:<12}{stats['count']:>7}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+              f"{stats['p99_ms']:>10.1f}{stats['throughput_per_s']:>10.2f}")
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {run["concurrency"]: run for run in json.load(f)["runs"]}
+    print(f"\n🔁 p95 change vs {baseline_path}")
+    for result in results["runs"]:
+        previous = baseline.get(result["concurrency"])
+        if not previous:
+            continue
+        for stage, stats in list(result["stages"].items()) + [("request", result["request"])]:
+            before = previous["stages"].get(stage) if stage != "request" else previous["request"]
+            if before and before["p95_ms"]:
+                change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+                print(f"   c={result['concurrency']:<3} {stage:<12}{before['p95_ms']:>10.1f} → {stats['p95_ms']:>8.1f} ms ({change:+.1f}%)")
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=12, help="Requests per run")
+    parser.add_argument("--walls", type=int, default=6, help="Walls per request (4-6)")
+    parser.add_argument("--concurrency", default="1,4", help="Comma separated concurrency levels")
+    parser.add_argument("--upload-latency", type=float, default=0.0, help="Simulated upload latency in seconds")
+    parser.add_argument("--cache", action="store_true", help="Keep the detection cache enabled")
+    parser.add_argument("--stub-model", action="store_true", help="Replace the detector with a stub (no best.pt needed)")
+    parser.add_argument("--output", help="Where to write JSON results")
+    parser.add_argument("--baseline", help="Earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    commit = git_commit()
+    output = args.output or os.path.join(OUTPUT_DIR, "benchmarks", f"pipeline-{commit}.json")
+
+    if args.stub_model:
+        registry.set_model(DEFAULT_MODEL_NAME, StubModel())
+    else:
+        registry.warm_up()
+    if not args.cache:
+        report.detection_cache = None
+
+    collection = mongomock.MongoClient().aasrasewa.properties
+    report.properties_collection = collection
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=DATASET_DIR))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as upload_dir:
+        cloudinary.uploader.upload = LocalUploader(upload_dir, args.upload_latency)
+
+        # One untimed request so connection pools and lazy imports are warm
+        run(build_requests(base_url, 1, args.walls, collection), 1)
+
+        results = {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "settings": {**vars(args), "python": platform.python_version(), "machine": platform.machine()},
+            "runs": [],
+        }
+        for concurrency in (int(level) for level in args.concurrency.split(",")):
+            result = run(build_requests(base_url, args.requests, args.walls, collection), concurrency)
+            results["runs"].append(result)
+            print_run(result)
+
+    server.shutdown()
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Throughput of detect_cracks_cached over the bundled images with the quality gate off, in
+flag mode, in reject mode (rejected properties skip inference) and with adaptive input sizes.
+
+Walls are grouped into properties of --walls images; the detection cache is disabled so
+every wall is decoded and inferred.
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import time
+
+import building_health_report as report
+import quality_gate
+from config import DEFAULT_MODEL_NAME
+from model_registry import registry
+from quality_gate import ImageQualityError, assess_image
+from bench_pipeline import DATASET_DIR, StubResult
+
+MODES = {
+    # label: (QUALITY_GATE, ADAPTIVE_IMGSZ)
+    "no gate": ("off", False),
+    "gate: flag": ("flag", False),
+    "gate: reject": ("reject", False),
+    "gate + adaptive imgsz": ("flag", True),
+}
+
+
+class ScaledCostModel:
+    """Stub detector whose cost grows with the inference size, like the real one."""
+
+    def __init__(self, per_image):
+        self.per_image = per_image
+
+    def __call__(self, source, imgsz=640, **kwargs):
+        images = source if isinstance(source, list) else [source]
+        time.sleep(self.per_image * len(images) * (imgsz / 640) ** 2)
+        return [StubResult(image) for image in images]
+
+
+def run(properties):
+    rejected = 0
+    start = time.perf_counter()
+    for image_bytes in properties:
+        try:
+            report.detect_cracks_cached(image_bytes)
+        except ImageQualityError:
+            rejected += 1
+    return time.perf_counter() - start, rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--walls", type=int, default=4, help="Walls per property")
+    parser.add_argument("--limit", type=int, default=0, help="Use only the first N images (0 = all)")
+    parser.add_argument("--stub-model", action="store_true", help="Replace the detector with a stub (no best.pt needed)")
+    parser.add_argument("--stub-per-image-ms", type=float, default=60, help="Stub cost per image at 640 px")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(DATASET_DIR, "*", "images", "*.jpg")))
+    if args.limit:
+        paths = paths[:args.limit]
+    blobs = []
+    for path in paths:
+        with open(path, "rb") as f:
+            blobs.append(f.read())
+    properties = [{f"wall{i}": data for i, data in enumerate(blobs[start:start + args.walls])}
+                  for start in range(0, len(blobs) - args.walls + 1, args.walls)]
+    if not properties:
+        print(f"❌ Need at least {args.walls} images in {DATASET_DIR}")
+        return
+
+    if args.stub_model:
+        registry.set_model(DEFAULT_MODEL_NAME, ScaledCostModel(args.stub_per_image_ms / 1000))
+    registry.warm_up()
+    report.detection_cache = None
+
+    images = [report.decode_image(data) for data in blobs]
+    timings = []
+    flagged = 0
+    for image in images:
+        start = time.perf_counter()
+        flagged += bool(assess_image(image)["issues"])
+        timings.append(time.perf_counter() - start)
+    print(f"🧪 {len(properties)} properties x {args.walls} walls; gate checks "
+          f"{statistics.mean(timings) * 1000:.2f} ms/image (p50 {statistics.median(timings) * 1000:.2f} ms), "
+          f"{flagged}/{len(images)} images flagged")
+
+    for label, (gate, adaptive) in MODES.items():
+        report.QUALITY_GATE, quality_gate.ADAPTIVE_IMGSZ = gate, adaptive
+        elapsed, rejected = run(properties)
+        walls = len(properties) * args.walls
+        print(f"{label:<22} {walls / elapsed:7.1f} walls/s   {elapsed * 1000 / len(properties):8.1f} ms/property"
+              f"   {rejected} properties rejected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Render time and output size of a 4- and 6-wall report: the flowing FPDF layout the pipeline
+used to build for every report vs the cached layout with print-sized images, plus the HTML
+(images inlined) and JSON outputs.
+
+Walls are rendered both from print-sized annotations, as the pipeline passes them now, and
+from the bundled photos upscaled to phone-camera size. Boxes are synthetic, so no model is
+needed.
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import time
+
+import cv2
+
+from annotation import render_annotation
+from bench_annotation import DEFAULT_IMAGES, synthetic_boxes
+from building_health_report import load_image_array
+from report_renderer import (
+    MemoryFPDF, analysis_text, render_html, render_json, render_pdf, report_document,
+)
+
+
+def flowing_pdf(document, images):
+    """The previous renderer: the whole document laid out from scratch, images embedded as given."""
+    pdf = MemoryFPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, document["title"], ln=True, align="C")
+
+    for count, wall in enumerate(document["walls"]):
+        if count > 0 and count % 2 == 0 and count // 2 < 4:
+            pdf.add_page()
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 10, wall["label"], ln=True)
+        pdf.image_buffers[f"{wall['wall']}.jpg"] = images[wall["wall"]]
+        pdf.image(f"{wall['wall']}.jpg", w=120, type="jpg")
+
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, "\nAI-Based Risk Analysis", ln=True)
+    pdf.set_font("Arial", "", 12)
+    pdf.multi_cell(0, 10, analysis_text(document).encode("latin-1", errors="ignore").decode("latin-1"))
+    return pdf.output(dest="S").encode("latin-1")
+
+
+RENDERERS = {
+    "PDF, flowing layout": flowing_pdf,
+    "PDF, cached layout": render_pdf,
+    "HTML": render_html,
+    "JSON": lambda document, images: render_json(document),
+}
+
+
+def make_document(walls):
+    results = {wall: {"score": 7.0, "crackCount": 2, "imageUrl": f"https://img.example/{wall}.jpg"} for wall in walls}
+    return report_document({"averageScore": 7.0, "walls": results})
+
+
+def measure(render, document, images, repeat):
+    render(document, images)  # warm up imports, codecs and the layout cache
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = render(document, images)
+        timings.append(time.perf_counter() - start)
+    return statistics.mean(timings), len(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", default=DEFAULT_IMAGES, help="Directory of wall images")
+    parser.add_argument("--repeat", type=int, default=5, help="Renders per measurement")
+    parser.add_argument("--photo-width", type=int, default=4032, help="Width of the phone-size photos")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.images, "*.jpg")))[:6]
+    if len(paths) < 6:
+        print(f"❌ Need at least 6 images in {args.images}")
+        return
+    photos = []
+    annotated = []
+    for path in paths:
+        image = load_image_array(path)
+        annotated.append(render_annotation(image, *synthetic_boxes(image, 8)))
+        scale = args.photo_width / image.shape[1]
+        photo = cv2.resize(image, (args.photo_width, round(image.shape[0] * scale)), interpolation=cv2.INTER_CUBIC)
+        photos.append(cv2.imencode(".jpg", photo, [cv2.IMWRITE_JPEG_QUALITY, 92])[1].tobytes())
+
+    for source, blobs in (("annotated", annotated), ("phone-size", photos)):
+        for walls in (4, 6):
+            names = [f"wall{i}" for i in range(walls)]
+            images = dict(zip(names, blobs))
+            document = make_document(names)
+            print(f"🧪 {walls} walls, {source} images ({sum(map(len, images.values())) / 1024:.0f} KiB in)")
+            for label, render in RENDERERS.items():
+                elapsed, size = measure(render, document, images, args.repeat)
+                print(f"   {label:<20} {elapsed * 1000:8.2f} ms   {size / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Cold-start and memory benchmark for the analysis server.
+
+Measures how long `import app` takes in a fresh interpreter, then starts the server in each
+mode and records the time until /healthz answers, the time until /readyz reports the model
+warm, and RSS / PSS / private memory of every process. PSS splits shared pages between the
+processes using them, so it shows how much of the model the preloaded workers share.
+
+Point --app-dir at another checkout (e.g. a `git worktree` of an older commit) to get the
+"before" numbers.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODES = ("dev", "gunicorn", "gunicorn-preload")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import(app_dir, repeat):
+    script = ("import resource, time; start = time.perf_counter(); import app; "
+              "print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)")
+    env = {**os.environ, "MODEL_PRELOAD": "0"}
+    times, rss = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", script], cwd=app_dir, env=env, capture_output=True,
+                                text=True, check=True).stdout.split()
+        times.append(float(output[-2]))
+        rss.append(int(output[-1]) / 1024)
+    return {"import_s": statistics.median(times), "import_peak_rss_mb": statistics.median(rss)}
+
+
+def memory_mb(pid):
+    """RSS, PSS and private (unshared) memory of one process from smaps_rollup."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": values.get("Rss", 0.0),
+        "pss_mb": values.get("Pss", 0.0),
+        "private_mb": values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0),
+    }
+
+
+def children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def read_json(response):
+    try:
+        return json.load(response)
+    except ValueError:
+        return {}
+
+
+def wait_for(url, start, deadline):
+    """(seconds from `start` until `url` answers 200 or None, last JSON body); gives up on a failed warm-up."""
+    status = None
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                return time.perf_counter() - start, read_json(response)
+        except urllib.error.HTTPError as e:
+            status = read_json(e)
+            if e.code == 404 or status.get("status") == "failed":
+                return None, status
+        except OSError:
+            pass
+        time.sleep(0.05)
+    return None, status
+
+
+def command(mode, app_dir, port, workers):
+    if mode == "dev":
+        return [sys.executable, "app.py"], {"PORT": str(port), "MODEL_PRELOAD": "0"}
+    conf = os.path.join(app_dir, "gunicorn.conf.py")
+    args = [sys.executable, "-m", "gunicorn", "-b", f"127.0.0.1:{port}", "-w", str(workers)]
+    if os.path.exists(conf):
+        args += ["-c", conf]
+    elif mode == "gunicorn-preload":
+        args.append("--preload")
+    return args + ["app:app"], {"MODEL_PRELOAD": "1" if mode == "gunicorn-preload" else "0"}
+
+
+def measure_server(mode, app_dir, workers, ready_timeout):
+    port = free_port()
+    args, env = command(mode, app_dir, port, workers)
+    start = time.perf_counter()
+    process = subprocess.Popen(args, cwd=app_dir, env={**os.environ, **env},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = start + ready_timeout
+        live_after, _ = wait_for(f"{base_url}/healthz", start, deadline)
+        if live_after is None:
+            # Older trees have no /healthz; fall back to the index route
+            live_after, _ = wait_for(f"{base_url}/", start, deadline)
+        ready_after, status = wait_for(f"{base_url}/readyz", start, deadline)
+        # Let the remaining workers finish booting before reading memory
+        time.sleep(1.0)
+        workers_memory = [memory_mb(pid) for pid in children(process.pid)]
+        result = {
+            "mode": mode,
+            "live_s": live_after,
+            "ready_s": ready_after,
+            "ready_status": (status or {}).get("status"),
+            "master": memory_mb(process.pid),
+            "workers": workers_memory,
+        }
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return result
+
+
+def print_server(result):
+    live = f"{result['live_s']:.2f}s" if result["live_s"] is not None else "never"
+    ready = f"{result['ready_s']:.2f}s" if result["ready_s"] is not None else (result["ready_status"] or "never")
+    print(f"\n🚀 {result['mode']}: live after {live}, ready after {ready}")
+    print(f"   {'process':<10}{'RSS MB':>9}{'PSS MB':>9}{'private MB':>12}")
+    rows = [("master", result["master"])] + [(f"worker {i}", m) for i, m in enumerate(result["workers"])]
+    for name, memory in rows:
+        print(f"   {name:<10}{memory['rss_mb']:>9.0f}{memory['pss_mb']:>9.0f}{memory['private_mb']:>12.0f}")
+    total = result["master"]["pss_mb"] + sum(m["pss_mb"] for m in result["workers"])
+    print(f"   {'total PSS':<10}{total:>18.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=BASE_DIR, help="building_health directory to measure")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma separated, from {MODES}")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters for the import timing")
+    parser.add_argument("--ready-timeout", type=float, default=120, help="Seconds to wait for /readyz")
+    parser.add_argument("--output", help="Where to write JSON results")
+    args = parser.parse_args()
+
+    app_dir = os.path.abspath(args.app_dir)
+    results = {"app_dir": app_dir, **measure_import(app_dir, args.repeat), "servers": []}
+    print(f"⏱️ import app: {results['import_s']:.3f}s, peak RSS {results['import_peak_rss_mb']:.0f} MB")
+
+    for mode in args.modes.split(","):
+        try:
+            result = measure_server(mode, app_dir, args.workers, args.ready_timeout)
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"\n⚠️ {mode}: could not start ({e})")
+            continue
+        results["servers"].append(result)
+        print_server(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
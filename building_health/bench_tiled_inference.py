@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark tiled detection latency against tile count on upscaled Dummy-Retakan-1 wall photos
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import time
+
+import numpy as np
+from PIL import Image
+
+from building_health_report import extract_detections
+from model_registry import registry
+from tiling import detect_tiled, split_tiles
+
+DEFAULT_IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Dummy-Retakan-1", "test", "images")
+
+
+def load_upscaled(path, long_side):
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        scale = long_side / max(img.size)
+        img = img.resize((round(img.width * scale), round(img.height * scale)), Image.BICUBIC)
+        return np.ascontiguousarray(np.asarray(img)[:, :, ::-1])
+
+
+def timed(run, images):
+    timings = []
+    crack_counts = []
+    for image in images:
+        start = time.perf_counter()
+        record = run(image)
+        timings.append(time.perf_counter() - start)
+        crack_counts.append(record["crack_count"])
+    return statistics.mean(timings) * 1000, statistics.mean(crack_counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", default=DEFAULT_IMAGES, help="Directory of wall images")
+    parser.add_argument("--long-side", type=int, default=4000, help="Upscale photos to this longest side")
+    parser.add_argument("--tile-sizes", default="1280,960,640", help="Comma separated tile sizes to try")
+    parser.add_argument("--overlap", type=int, default=128, help="Tile overlap in pixels")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.images, "*.jpg")))
+    if not paths:
+        print(f"❌ No images found in {args.images}")
+        return
+    images = [load_upscaled(path, args.long_side) for path in paths]
+    registry.warm_up()
+    print(f"🧪 {len(images)} images upscaled to {args.long_side}px")
+
+    latency, cracks = timed(lambda image: extract_detections(registry.predict(image)[0], image), images)
+    print(f"{'Whole image':<18} tiles {1:4d}   {latency:9.1f} ms/image   {cracks:5.2f} cracks/image")
+    for tile_size in (int(size) for size in args.tile_sizes.split(",")):
+        tile_count = len(split_tiles(images[0], tile_size, args.overlap))
+        latency, cracks = timed(lambda image: detect_tiled(image, tile_size=tile_size, overlap=args.overlap), images)
+        print(f"{f'Tiles {tile_size}px':<18} tiles {tile_count:4d}   {latency:9.1f} ms/image   {cracks:5.2f} cracks/image")
+
+
+if __name__ == "__main__":
+    main()
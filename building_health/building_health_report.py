@@ -1,20 +1,28 @@
 import os
 import logging
-from ultralytics import YOLO
-from PIL import Image
-from fpdf import FPDF
+import threading
+import time
 from dotenv import load_dotenv
-import urllib.request
-import cloudinary.uploader
-import cloudinary.api
-import cloudinary
-from pymongo import MongoClient
-from bson import ObjectId
 import sys
-import time
 
 # Import configuration
 from config import *
+from model_registry import registry
+from inference_backends import ResultBoxes
+from annotation import ANNOTATION_SETTINGS, render_annotation
+from image_fetch import ImageFetchError, fetch_images, decode_image, decode_budget, decoded_size, iter_image_bytes
+from detection_cache import RECORD_VERSION, detection_cache, make_key
+from tiling import detect_tiled
+from stage_timing import timed_stage
+from metrics import cracks_detected, failures, walls_analyzed, walls_reused
+from property_updates import PropertyUpdateError, PropertyUpdater, register_flush_on_exit
+from single_flight import SingleFlight, image_set_key
+from scratch_space import scratch_space
+from batch_scheduler import get_scheduler
+from profiling import is_profiling
+from artifact_store import UploadError, create_store, submit_upload
+from quality_gate import assess_image, choose_imgsz, find_duplicates, is_phash, reject_undecodable, screen
+from report_renderer import assess_severity, render_pdf, report_document
 
 # Load environment variables
 load_dotenv()
@@ -22,215 +30,526 @@ load_dotenv()
 # Logging setup
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-# Cloudinary configuration
-cloudinary.config(
-    cloud_name=CLOUDINARY_CLOUD_NAME,
-    api_key=CLOUDINARY_API_KEY,
-    api_secret=CLOUDINARY_API_SECRET,
-    secure=True
-)
-
-# MongoDB setup - Use the same connection string as the Node.js backend
-client = MongoClient(MONGO_URI)
-db = client[DATABASE_NAME]
-properties_collection = db[COLLECTION_NAME]
-
-# Create directories if they don't exist
-os.makedirs(PROCESSED_DIR, exist_ok=True)
-os.makedirs(PDF_DIR, exist_ok=True)
-
-
-def download_image(image_url, save_path):
-    urllib.request.urlretrieve(image_url, save_path)
-    logging.info(f"📥 Downloaded image to {save_path}")
-    return save_path
-
-
-def detect_cracks(image_path):
-    model = YOLO(YOLO_MODEL_PATH)
-    results = model(image_path)
-
-    crack_count = 0
-    confidences = []
-
-    for box in results[0].boxes:
-        if int(box.cls[0]) == 0:
-            crack_count += 1
-            confidences.append(float(box.conf[0]))
-
-    img_with_boxes = results[0].plot()
-    processed_path = os.path.join(PROCESSED_DIR, os.path.basename(image_path))
-    Image.fromarray(img_with_boxes).save(processed_path)
-
-    logging.info(f"🔍 {os.path.basename(image_path)} → {crack_count} cracks detected")
-
-    return processed_path, crack_count, confidences
-
-
-def generate_analysis(image_scores, avg_score):
-    analysis = "AI-Based Structural Crack Analysis:\n"
-    analysis += f"\nOverall Average Score (out of 10): {avg_score:.1f}\n\n"
-    for wall, score in image_scores.items():
-        analysis += f"- {wall.title()} Wall: {score:.1f}/10\n"
-
-    if avg_score < 4:
-        severity = "High"
-        recommendation = "Immediate structural inspection and repair is recommended."
-    elif avg_score < 7:
-        severity = "Medium"
-        recommendation = "Monitor the structure and consider a professional inspection."
-    else:
-        severity = "Low"
-        recommendation = "Structure is likely healthy. No immediate action needed."
-
-    analysis += f"\nSeverity Level: {severity}\nRecommendation: {recommendation}"
-    return analysis
-
-
-def generate_pdf_report(image_data, property_id, analysis):
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "Building Health Inspection Report", ln=True, align="C")
-
-    img_count = 0
-    for wall, img_path in image_data.items():
-        if img_count > 0 and img_count % 2 == 0 and img_count // 2 < 4:
-            pdf.add_page()
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 10, f"{wall.title()} Wall", ln=True)
-        pdf.image(img_path, w=120)
-        img_count += 1
-
-    pdf.set_font("Arial", "B", 14)
-    pdf.cell(0, 10, "\nAI-Based Risk Analysis", ln=True)
-    pdf.set_font("Arial", "", 12)
-
-    safe_analysis = analysis.encode('latin-1', errors='ignore').decode('latin-1')
-    pdf.multi_cell(0, 10, safe_analysis)
-
-    pdf_path = os.path.join(PDF_DIR, f"{property_id}_health_report.pdf")
-    pdf.output(pdf_path)
-
-    # Wait for file to be fully written and check size
-    last_size = -1
-    for _ in range(10):
-        if os.path.exists(pdf_path):
-            size = os.path.getsize(pdf_path)
-            print(f"[DEBUG] PDF exists: {pdf_path}, size: {size} bytes")
-            if size == last_size and size > 0:
-                break
-            last_size = size
-        time.sleep(0.1)
+# The artifact store and MongoDB are set up on first use, so importing this module has no
+# side effects and stays cheap; tests and benchmarks may assign their own collection or store here
+properties_collection = None
+artifact_store = None
+_mongo_client = None
+_mongo_pid = None
+_artifact_store = None
+_property_updater = None
+
+# Identical analyses already running, matched first by image URLs and then by image content
+analyses_by_url = SingleFlight("url")
+analyses_by_content = SingleFlight("content")
+_services_lock = threading.Lock()
+
+
+def get_properties_collection():
+    """The properties collection, connecting on first use and again in each forked worker."""
+    global _mongo_client, _mongo_pid
+    if properties_collection is not None:
+        return properties_collection
+    with _services_lock:
+        # MongoClient is not fork-safe, so a client inherited from the parent is never reused
+        if _mongo_client is None or _mongo_pid != os.getpid():
+            from pymongo import MongoClient
+
+            # Use the same connection string as the Node.js backend
+            _mongo_client = MongoClient(
+                MONGO_URI,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                serverSelectionTimeoutMS=MONGO_TIMEOUT_MS,
+                connectTimeoutMS=MONGO_TIMEOUT_MS,
+            )
+            _mongo_pid = os.getpid()
+        return _mongo_client[DATABASE_NAME][COLLECTION_NAME]
+
+
+def get_property_updater():
+    global _property_updater
+    with _services_lock:
+        if _property_updater is None:
+            _property_updater = PropertyUpdater(get_properties_collection)
+            register_flush_on_exit(_property_updater)
+        return _property_updater
+
+
+def get_artifact_store():
+    global _artifact_store
+    if artifact_store is not None:
+        return artifact_store
+    with _services_lock:
+        if _artifact_store is None:
+            _artifact_store = create_store()
+        return _artifact_store
+
+
+def load_image_array(image_path):
+    with open(image_path, "rb") as f:
+        return decode_image(f.read())
+
+
+@timed_stage("annotate")
+def extract_detections(result, image=None):
+    """Crack count, confidences, boxes and the JPEG-encoded annotated image for one result.
+
+    `image` is the BGR array the result was computed from (by default `result.orig_img`).
+    """
+    cracks = ResultBoxes.of(result).cracks()
+    annotated = render_annotation(result.orig_img if image is None else image, cracks.xyxy, cracks.conf)
+
+    return {
+        "crack_count": len(cracks),
+        "confidences": cracks.conf.tolist(),
+        "boxes": cracks.xyxy.tolist(),
+        "annotated": annotated,
+    }
+
+
+def save_detections(record, image_name, directory):
+    processed_path = os.path.join(directory, image_name)
+    with open(processed_path, "wb") as f:
+        f.write(record["annotated"])
+
+    logging.info(f"🔍 {image_name} → {record['crack_count']} cracks detected")
+
+    return processed_path, record["crack_count"], record["confidences"]
+
+
+def should_tile(image, tiled=None):
+    tiled = TILED_INFERENCE if tiled is None else tiled
+    return tiled and max(image.shape[:2]) >= TILE_MIN_RESOLUTION
+
+
+def detector_version(model_name=None):
+    """Model version plus any setting that changes detections or their records, for cache keys."""
+    version = f"{registry.version(model_name)}|record:{RECORD_VERSION}|annotation:{ANNOTATION_SETTINGS}"
+    if registry.predict_options:
+        version += "|" + ",".join(f"{k}={v}" for k, v in sorted(registry.predict_options.items()))
+    if TILED_INFERENCE:
+        version += f"|tiled:{TILE_SIZE}:{TILE_OVERLAP}:{TILE_MIN_RESOLUTION}:{TILE_NMS_IOU}"
+    if ADAPTIVE_IMGSZ:
+        version += "|imgsz:" + ",".join(map(str, ADAPTIVE_IMGSZ_SIZES))
+    return version
+
+
+def detect_cracks(image_path, model_name=None, tiled=None):
+    """(processed_path, crack_count, confidences) for one image file.
+
+    The annotated image is written to its own scratch job directory, kept until evicted.
+    """
+    image_name = os.path.basename(image_path)
+    source = load_image_array(image_path)
+    if should_tile(source, tiled):
+        record = detect_tiled(source, model_name=model_name)
     else:
-        print(f"[ERROR] PDF file not ready or is empty: {pdf_path}")
-
-    logging.info(f"📄 PDF saved at {pdf_path} (size: {os.path.getsize(pdf_path) if os.path.exists(pdf_path) else 'N/A'} bytes)")
+        imgsz = choose_imgsz(source.shape)
+        with timed_stage("inference"):
+            results = registry.predict(source, name=model_name, **({"imgsz": imgsz} if imgsz else {}))
+        record = extract_detections(results[0], source)
+    with scratch_space.job(os.path.splitext(image_name)[0]) as job_dir:
+        return save_detections(record, image_name, job_dir)
+
+
+def run_detections(images, batch_size=DETECT_BATCH_SIZE, model_name=None, tiled=None, micro_batch=MICRO_BATCHING):
+    """Run decoded BGR arrays through the detector in batched forward passes; wall -> record.
+
+    With tiling enabled, images at or above TILE_MIN_RESOLUTION go through detect_tiled instead.
+    With micro-batching, the walls join forward passes shared with other in-flight requests
+    and `batch_size` is replaced by MICRO_BATCH_MAX_SIZE, except in a profiled request, whose
+    inference stays in its own thread. With ADAPTIVE_IMGSZ, walls are
+    grouped by the inference size chosen for them and each group runs at its own size.
+    """
+    records = {}
+    groups = {}
+    for wall, image in images.items():
+        if should_tile(image, tiled):
+            records[wall] = detect_tiled(image, model_name=model_name)
+        else:
+            groups.setdefault(choose_imgsz(image.shape), []).append(wall)
+
+    batch_size = max(1, batch_size)
+    for imgsz, walls in groups.items():
+        options = {"imgsz": imgsz} if imgsz else {}
+        if micro_batch and not is_profiling():
+            with timed_stage("inference"):
+                results = get_scheduler(model_name, imgsz).predict([images[wall] for wall in walls])
+            for wall, result in zip(walls, results):
+                records[wall] = extract_detections(result, images[wall])
+            continue
+
+        for start in range(0, len(walls), batch_size):
+            chunk = walls[start:start + batch_size]
+            with timed_stage("inference"):
+                results = registry.predict([images[wall] for wall in chunk], name=model_name, **options)
+            for wall, result in zip(chunk, results):
+                records[wall] = extract_detections(result, images[wall])
+
+    return {wall: records[wall] for wall in images}
+
+
+def detect_cracks_batch(images, batch_size=DETECT_BATCH_SIZE, model_name=None, image_names=None,
+                        micro_batch=MICRO_BATCHING):
+    """Run every wall through the detector in batched forward passes.
+
+    `images` maps wall -> file path or decoded BGR array; arrays are named via `image_names`.
+    Returns a dict of wall -> (processed_path, crack_count, confidences), like detect_cracks,
+    with every annotated image written to one scratch job directory.
+    """
+    image_names = dict(image_names or {})
+    arrays = {}
+    for wall, source in images.items():
+        if isinstance(source, str):
+            image_names.setdefault(wall, os.path.basename(source))
+            source = load_image_array(source)
+        arrays[wall] = source
+
+    records = run_detections(arrays, batch_size=batch_size, model_name=model_name, micro_batch=micro_batch)
+    # Walls are saved under their own names so two walls from same-named files never collide
+    with scratch_space.job("detections") as job_dir:
+        return {wall: save_detections(records[wall], f"{wall}_{image_names.get(wall, wall + '.jpg')}", job_dir)
+                for wall in images}
+
+
+def detect_cracks_cached(image_bytes, model_name=None, known_hashes=None):
+    """Detection records for raw image bytes, skipping inference for content seen before.
+
+    Walls go through the quality gate before any inference; `known_hashes` holds the
+    perceptual hashes of the request's other walls, for the duplicate check.
+    """
+    records = {}
+    if detection_cache is not None:
+        version = detector_version(model_name)
+        keys = {wall: make_key(data, version) for wall, data in image_bytes.items()}
+        for wall, key in keys.items():
+            record = detection_cache.get(key)
+            if record is not None:
+                records[wall] = record
+
+    missing = [wall for wall in image_bytes if wall not in records]
+    # Decoded arrays are held until inference and annotation finish
+    with decode_budget.reserve(sum(decoded_size(image_bytes[wall]) for wall in missing)):
+        misses, undecodable = {}, {}
+        for wall in missing:
+            try:
+                misses[wall] = decode_image(image_bytes[wall])
+            except ImageFetchError as e:
+                undecodable[wall] = e
+        reject_undecodable(undecodable)
+        if QUALITY_GATE != "off":
+            quality = {wall: assess_image(image) for wall, image in misses.items()}
+            # Cached walls keep the assessment made when they were first analysed
+            quality.update({wall: record["quality"] for wall, record in records.items() if record.get("quality")})
+            screen(quality, known_hashes, mode=QUALITY_GATE)
+
+        if misses:
+            for wall, record in run_detections(misses, model_name=model_name).items():
+                if QUALITY_GATE != "off":
+                    record["quality"] = quality[wall]
+                if detection_cache is not None:
+                    detection_cache.put(keys[wall], record)
+                records[wall] = record
+    if detection_cache is not None:
+        logging.info(f"🗃️ Detection cache: {len(image_bytes) - len(misses)}/{len(image_bytes)} walls served from cache")
+
+    return {wall: records[wall] for wall in image_bytes}
+
+
+def render_pdf_report(image_data, document):
+    """PDF bytes of the report; `image_data` maps wall -> annotated JPEG bytes or image path."""
+    pdf_bytes = render_pdf(document, image_data)
+    logging.info(f"📄 PDF rendered in memory ({len(pdf_bytes)} bytes)")
+    return pdf_bytes
+
+
+def generate_pdf_report(image_data, property_id, document, directory):
+    pdf_path = os.path.join(directory, f"{property_id}_health_report.pdf")
+    with open(pdf_path, "wb") as f:
+        f.write(render_pdf(document, image_data))
+    logging.info(f"📄 PDF saved at {pdf_path} (size: {os.path.getsize(pdf_path)} bytes)")
     return pdf_path
 
 
-def upload_pdf_to_cloudinary(pdf_path):
+def upload_annotated_image(record, property_id, wall):
+    """Start publishing a wall's annotated image; returns a Future of its URL."""
+    return submit_upload(get_artifact_store(), record["annotated"], f"{property_id}_{wall}.jpg", kind="image")
+
+
+def upload_result(future):
     try:
-        # Extra check before upload
-        if not os.path.exists(pdf_path) or os.path.getsize(pdf_path) == 0:
-            logging.error(f"❌ PDF file does not exist or is empty: {pdf_path}")
-            return None
-        print(f"[DEBUG] Uploading PDF: {pdf_path}, size: {os.path.getsize(pdf_path)} bytes")
-        result = cloudinary.uploader.upload(
-            pdf_path,
-            resource_type="raw",
-            type="upload"  # Force public upload
-        )
-        cloud_url = result.get("secure_url")
-        logging.info(f"☁️ Uploaded PDF to Cloudinary: {cloud_url}")
-        return cloud_url
-    except Exception as e:
-        logging.error(f"❌ Cloudinary upload failed: {e}")
+        return future.result()
+    except UploadError as e:
+        logging.error(f"❌ {e}")
         return None
 
 
-def update_property_pdf(property_id, pdf_url):
+@timed_stage("db_update")
+def update_property_pdf(property_id, pdf_url, fields=None):
+    """Set the report URL (and any extra fields) with a single conditional update."""
+    from bson import ObjectId
+
     try:
         # Validate ObjectId format
         if not ObjectId.is_valid(property_id):
             logging.error(f"❌ Invalid ObjectId format: {property_id}")
             return False
-            
-        object_id = ObjectId(property_id)
-        
-        # First, check if the property exists
-        property_exists = properties_collection.find_one({"_id": object_id})
-        if not property_exists:
+
+        result = get_properties_collection().update_one(
+            {"_id": ObjectId(property_id)},
+            {"$set": {"healthReportPDF": pdf_url, **(fields or {})}}
+        )
+
+        if result.matched_count == 0:
             logging.error(f"❌ Property with ID {property_id} not found in database")
             return False
-        
-        # Update the property with the PDF URL
-        result = properties_collection.update_one(
-            {"_id": object_id},
-            {"$set": {"healthReportPDF": pdf_url}}
-        )
-        
-        if result.matched_count > 0 and result.modified_count > 0:
-            logging.info(f"✅ PDF URL successfully updated in MongoDB for property {property_id}")
-            return True
-        elif result.matched_count > 0:
+        if result.modified_count == 0:
+            # Re-running an unchanged analysis stores the same values again
             logging.warning(f"⚠️ Property found but no changes made for ID {property_id}")
-            return False
-        else:
-            logging.error(f"❌ No property found with ID {property_id}")
-            return False
-            
+        logging.info(f"✅ PDF URL successfully updated in MongoDB for property {property_id}")
+        return True
+
     except Exception as e:
+        failures.inc(stage="db_update")
         logging.error(f"❌ Failed to update MongoDB: {e}")
         return False
 
 
-def generate_building_health_report(image_urls_dict, property_id):
-    if not (4 <= len(image_urls_dict) <= 6):
-        raise ValueError("Number of images must be between 4 and 6.")
+def store_property_report(property_id, pdf_url, health_score, wall_analysis=None):
+    """Queue the report URL, score and per-wall results behind the request, or write them now.
+
+    A synchronous write that fails raises PropertyUpdateError, so callers such as the batch
+    CLI never count a report as stored when it is not.
+    """
+    fields = {"healthReportPDF": pdf_url, "healthScore": round(health_score, 2)}
+    if wall_analysis is not None:
+        fields["healthAnalysis"] = wall_analysis
+    if MONGO_WRITE_BEHIND:
+        get_property_updater().submit(property_id, fields)
+        logging.info(f"🗂️ Queued PDF URL update for property {property_id}")
+    elif update_property_pdf(property_id, pdf_url, fields):
+        logging.info(f"✅ Successfully stored PDF URL for property {property_id}")
+    else:
+        logging.error(f"❌ Failed to store PDF URL for property {property_id}")
+        raise PropertyUpdateError(f"Could not store the report for property {property_id}")
 
-    local_image_paths = {}
-    image_scores = {}
-    total_score = 0
-    total_confidences = []
 
-    for wall, url in image_urls_dict.items():
-        img_local_path = os.path.join(PROCESSED_DIR, f"{property_id}_{wall}.jpg")
-        download_image(url, img_local_path)
+def load_wall_analysis(property_id):
+    """Per-wall results stored with a property by an earlier analysis, if any."""
+    from bson import ObjectId
+
+    if not ObjectId.is_valid(property_id):
+        return None
+    doc = get_properties_collection().find_one({"_id": ObjectId(property_id)}, {"healthAnalysis": 1})
+    return (doc or {}).get("healthAnalysis")
 
-        processed_img_path, crack_count, confidences = detect_cracks(img_local_path)
-        local_image_paths[wall] = processed_img_path
 
-        score = 10 - crack_count * 1.5
-        score = max(0, min(10, score))
-        image_scores[wall] = score
-        total_score += score
-        total_confidences.extend(confidences)
+def quality_hashes(walls):
+    """wall -> perceptual hash, for records that went through the gate and carry a valid hash."""
+    hashes = {}
+    for wall, result in walls.items():
+        phash = (result.get("quality") or {}).get("phash")
+        if is_phash(phash):
+            hashes[wall] = phash
+    return hashes
 
-    avg_score = total_score / len(image_scores)
-    analysis = generate_analysis(image_scores, avg_score)
 
-    pdf_path = generate_pdf_report(local_image_paths, property_id, analysis)
-    cloud_url = upload_pdf_to_cloudinary(pdf_path)
+def wall_score(crack_count):
+    return max(0, min(10, 10 - crack_count * 1.5))
+
+
+def generate_building_health_report(image_urls_dict, property_id, previous_analysis=None):
+    return analyze_property_images(image_urls_dict, property_id, previous_analysis)[0]
+
+
+def analyze_property_images(image_urls_dict, property_id, previous_analysis=None, on_event=None):
+    """Analyse the walls and publish the report; returns (pdf_url, per-wall analysis).
+
+    With `previous_analysis` (the per-wall results stored by an earlier run, never taken from
+    a client) a wall is reused only when its image URL and model version match and its
+    detection is still in the detection cache, and then only the cached record is used;
+    every other wall is downloaded and run through the detector again.
+
+    `on_event(event, data)` is called as the pipeline progresses: "fetched" and "wall" for
+    each wall, then "report" once the PDF is rendered and "uploaded" once it is published.
+    Each wall is then inferred as soon as its download finishes instead of in one batch.
+    """
+    if not (4 <= len(image_urls_dict) <= 6):
+        raise ValueError("Number of images must be between 4 and 6.")
+
+    key = image_set_key(image_urls_dict, property_id)
+    if previous_analysis:
+        result, shared = analyses_by_url.do(
+            key, _incremental_report, image_urls_dict, property_id, previous_analysis, on_event)
+    elif on_event is not None:
+        result, shared = analyses_by_url.do(key, _report_streaming, image_urls_dict, property_id, on_event)
+    else:
+        result, shared = analyses_by_url.do(key, _report_from_urls, image_urls_dict, property_id)
+
+    if shared and on_event is not None:
+        # Attached to an identical analysis that reported its progress to its own caller
+        for wall, wall_result in result[1]["walls"].items():
+            on_event("wall", wall_event(wall, wall_result))
+        if result[0]:
+            on_event("uploaded", {"pdf_url": result[0]})
+    return result
+
+
+def wall_event(wall, wall_result):
+    return {"wall": wall, **{key: wall_result[key] for key in ("crackCount", "score", "confidences")}}
+
+
+def _report_from_urls(image_urls_dict, property_id):
+    image_bytes = fetch_images(image_urls_dict, decode=False)
+    key = image_set_key(image_bytes, property_id)
+    return analyses_by_content.do(key, _report_from_images, image_bytes, image_urls_dict, property_id)[0]
+
+
+def _report_streaming(image_urls_dict, property_id, on_event):
+    version = detector_version()
+    records = {}
+    keys = {}
+    uploads = {}
+    # Inference of each wall overlaps with the downloads still in progress, and its
+    # annotated image is published while the remaining walls are analysed
+    for wall, data in iter_image_bytes(image_urls_dict):
+        on_event("fetched", {"wall": wall, "bytes": len(data)})
+        records[wall] = detect_cracks_cached({wall: data}, known_hashes=quality_hashes(records))[wall]
+        keys[wall] = make_key(data, version)
+        if UPLOAD_ANNOTATED_IMAGES:
+            uploads[wall] = upload_annotated_image(records[wall], property_id, wall)
+        crack_count = records[wall]["crack_count"]
+        on_event("wall", {"wall": wall, "crackCount": crack_count, "score": wall_score(crack_count),
+                          "confidences": records[wall]["confidences"]})
+
+    records = {wall: records[wall] for wall in image_urls_dict}
+    return _publish_report(records, image_urls_dict, keys, version, property_id, on_event,
+                           announced=set(records), uploads=uploads)
+
+
+def _report_from_images(image_bytes, image_urls_dict, property_id):
+    records = detect_cracks_cached(image_bytes)
+    version = detector_version()
+    keys = {wall: make_key(data, version) for wall, data in image_bytes.items()}
+    return _publish_report(records, image_urls_dict, keys, version, property_id)
+
+
+def _incremental_report(image_urls_dict, property_id, previous_analysis, on_event=None):
+    version = detector_version()
+    previous_walls = previous_analysis.get("walls", {})
+    records = {}
+    reused = {}
+    for wall, url in image_urls_dict.items():
+        previous = previous_walls.get(wall)
+        if not previous or previous.get("imageUrl") != url or previous_analysis.get("modelVersion") != version:
+            continue
+        # Only what the detection cache can rebuild is reused: the stored annotated URL and
+        # quality results are never copied into the new report
+        record = detection_cache.get(previous.get("detectionKey")) if detection_cache is not None else None
+        if record is not None:
+            records[wall] = record
+            reused[wall] = previous
+    changed = {wall: url for wall, url in image_urls_dict.items() if wall not in reused}
+    logging.info(f"♻️ Incremental analysis: re-running {sorted(changed) or 'no walls'}, "
+                 f"reusing {len(reused)} previous results")
+    walls_reused.inc(len(reused))
+
+    image_bytes = fetch_images(changed, decode=False) if changed else {}
+    if image_bytes:
+        records.update(detect_cracks_cached(image_bytes, known_hashes=quality_hashes(records)))
+    keys = {wall: make_key(data, version) for wall, data in image_bytes.items()}
+    keys.update({wall: previous["detectionKey"] for wall, previous in reused.items()})
+
+    records = {wall: records[wall] for wall in image_urls_dict}
+    return _publish_report(records, image_urls_dict, keys, version, property_id, on_event)
+
+
+def _publish_report(records, image_urls_dict, keys, version, property_id, on_event=None, announced=(),
+                    uploads=None):
+    """Render and publish the report; annotated images upload while the PDF is rendered.
+
+    `uploads` holds wall -> Future of annotated image uploads the caller already started.
+    """
+    on_disk = REPORT_STORAGE_MODE == "disk"
+    uploads = dict(uploads or {})
+    quality = {wall: record["quality"] for wall, record in records.items() if record.get("quality")}
+    duplicates = find_duplicates(quality_hashes(records))
+
+    report_images = {}
+    image_scores = {}
+    wall_results = {}
+
+    for wall, record in records.items():
+        if not on_disk:
+            logging.info(f"🔍 {wall} → {record['crack_count']} cracks detected")
+        report_images[wall] = record["annotated"]
+
+        walls_analyzed.inc()
+        cracks_detected.inc(record["crack_count"])
+
+        image_scores[wall] = wall_score(record["crack_count"])
+        wall_results[wall] = {
+            "imageUrl": image_urls_dict[wall],
+            "crackCount": record["crack_count"],
+            "confidences": record["confidences"],
+            "boxes": record["boxes"],
+            "score": image_scores[wall],
+            "detectionKey": keys[wall],
+            "annotatedUrl": None,
+        }
+        if wall in quality:
+            wall_results[wall]["quality"] = {**quality[wall], "duplicateOf": duplicates.get(wall)}
+        if UPLOAD_ANNOTATED_IMAGES and wall not in uploads:
+            uploads[wall] = upload_annotated_image(record, property_id, wall)
+        if on_event is not None and wall not in announced:
+            on_event("wall", wall_event(wall, wall_results[wall]))
+
+    avg_score = sum(image_scores.values()) / len(image_scores)
+    severity, recommendation = assess_severity(avg_score)
+    wall_analysis = {
+        "modelVersion": version,
+        "averageScore": avg_score,
+        "severity": severity,
+        "recommendation": recommendation,
+        "analyzedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "walls": wall_results,
+    }
+    document = report_document(wall_analysis)
+
+    if on_disk:
+        # Each job gets its own directory, cleaned up by the scratch space later
+        with scratch_space.job(property_id) as job_dir:
+            report_images = {wall: save_detections(records[wall], f"{wall}.jpg", job_dir)[0]
+                             for wall in records}
+            pdf_path = generate_pdf_report(report_images, property_id, document, job_dir)
+            with open(pdf_path, "rb") as f:
+                pdf_bytes = f.read()
+    else:
+        pdf_bytes = render_pdf_report(report_images, document)
+    if on_event is not None:
+        on_event("report", {"bytes": len(pdf_bytes)})
+    pdf_upload = submit_upload(get_artifact_store(), pdf_bytes, f"{property_id}_health_report.pdf")
+
+    with timed_stage("upload"):
+        cloud_url = upload_result(pdf_upload)
+        for wall, future in uploads.items():
+            wall_results[wall]["annotatedUrl"] = upload_result(future)
 
     if cloud_url:
         logging.info(f"✅ Successfully generated health report PDF: {cloud_url}")
+        if on_event is not None:
+            on_event("uploaded", {"pdf_url": cloud_url})
         
         # Only try to update database if it's a real property ID (not temporary)
         if not property_id.startswith("temp_"):
-            success = update_property_pdf(property_id, cloud_url)
-            if success:
-                logging.info(f"✅ Successfully stored PDF URL for property {property_id}")
-            else:
-                logging.error(f"❌ Failed to store PDF URL for property {property_id}")
+            store_property_report(property_id, cloud_url, avg_score, wall_analysis)
         else:
             logging.info(f"📝 Using temporary ID {property_id} - PDF URL will be saved with property")
     else:
-        logging.error("❌ Failed to upload PDF to Cloudinary")
+        logging.error("❌ Failed to publish the report PDF")
 
-    return cloud_url
+    return cloud_url, wall_analysis
 
 
 # Main execution for command line usage
@@ -8,6 +8,14 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/aasrasewa")
 DATABASE_NAME = "aasrasewa"
 COLLECTION_NAME = "properties"
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 10))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+MONGO_TIMEOUT_MS = int(os.getenv("MONGO_TIMEOUT_MS", 5000))
+# Report URLs and scores are written behind the request and sent as one bulk_write per
+# MONGO_WRITE_BATCH_SIZE properties or every MONGO_FLUSH_INTERVAL seconds
+MONGO_WRITE_BEHIND = os.getenv("MONGO_WRITE_BEHIND", "1") == "1"
+MONGO_WRITE_BATCH_SIZE = int(os.getenv("MONGO_WRITE_BATCH_SIZE", 100))
+MONGO_FLUSH_INTERVAL = float(os.getenv("MONGO_FLUSH_INTERVAL", 1.0))
 
 # Cloudinary Configuration
 CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME", "dfdfmx8mo")
@@ -17,5 +25,163 @@ CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET", "QJ9xBrqzhxqgpC3gtwAy
 # File Paths
 YOLO_MODEL_PATH = os.path.join(os.getcwd(), "best.pt")
 OUTPUT_DIR = "output_reports"
-PROCESSED_DIR = os.path.join(OUTPUT_DIR, "processed")
-PDF_DIR = os.path.join(OUTPUT_DIR, "pdfs") 
\ No newline at end of file
+
+# Artifact Storage
+# Where the PDF and the annotated wall images are published: "cloudinary", or "local" to
+# keep them under ARTIFACT_DIR (served by /artifacts when ARTIFACT_BASE_URL points there)
+ARTIFACT_STORE = os.getenv("ARTIFACT_STORE", "cloudinary")
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", os.path.join(OUTPUT_DIR, "artifacts"))
+ARTIFACT_BASE_URL = os.getenv("ARTIFACT_BASE_URL", "")
+UPLOAD_ANNOTATED_IMAGES = os.getenv("UPLOAD_ANNOTATED_IMAGES", "1") == "1"
+# Uploads run in parallel on a shared pool; each attempt times out after UPLOAD_TIMEOUT
+# seconds and is retried UPLOAD_RETRIES times with exponential backoff
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", 8))
+UPLOAD_TIMEOUT = float(os.getenv("UPLOAD_TIMEOUT", 30))
+UPLOAD_RETRIES = int(os.getenv("UPLOAD_RETRIES", 2))
+UPLOAD_BACKOFF = float(os.getenv("UPLOAD_BACKOFF", 0.5))
+
+# Model Registry
+# Extra models can be served side by side, e.g. YOLO_EXTRA_MODELS="v2=/models/best_v2.pt"
+DEFAULT_MODEL_NAME = os.getenv("YOLO_MODEL_NAME", "default")
+YOLO_MODELS = {DEFAULT_MODEL_NAME: YOLO_MODEL_PATH}
+for _entry in filter(None, os.getenv("YOLO_EXTRA_MODELS", "").split(",")):
+    _name, _path = _entry.split("=", 1)
+    YOLO_MODELS[_name.strip()] = _path.strip()
+WARMUP_IMAGE_SIZE = int(os.getenv("WARMUP_IMAGE_SIZE", 640))
+
+# Inference Backend
+# "pytorch" runs best.pt through ultralytics; "onnx", "onnx-int8" and "openvino" export it
+# once next to the weights and run it with a CPU-optimized runtime
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "pytorch")
+# 0 leaves the runtime's default (usually one thread per core)
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", 0))
+INFERENCE_INTER_OP_THREADS = int(os.getenv("INFERENCE_INTER_OP_THREADS", 0))
+EXPORT_IMGSZ = int(os.getenv("EXPORT_IMGSZ", 640))
+
+# Startup
+# By default models warm up in a background thread and /readyz reports when they are done.
+# MODEL_PRELOAD=1 (set by gunicorn.conf.py) loads them while importing app.py instead, so
+# with gunicorn --preload the master holds one copy that forked workers share copy-on-write
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "0") == "1"
+
+# Detector Settings
+# Chosen with evaluate_detector.py; anything left unset uses the ultralytics defaults
+DETECT_OPTIONS = {}
+if os.getenv("DETECT_IMGSZ"):
+    DETECT_OPTIONS["imgsz"] = int(os.getenv("DETECT_IMGSZ"))
+if os.getenv("DETECT_CONF"):
+    DETECT_OPTIONS["conf"] = float(os.getenv("DETECT_CONF"))
+if os.getenv("DETECT_IOU"):
+    DETECT_OPTIONS["iou"] = float(os.getenv("DETECT_IOU"))
+
+# Batched Inference
+# Number of wall images sent through the detector per forward pass
+DETECT_BATCH_SIZE = int(os.getenv("DETECT_BATCH_SIZE", 6))
+
+# Adaptive Input Size
+# Each wall runs at the smallest of these inference sizes that covers its longest side, so
+# small photos are not upscaled to the full size; the largest one caps big photos
+ADAPTIVE_IMGSZ = os.getenv("ADAPTIVE_IMGSZ", "1") == "1"
+ADAPTIVE_IMGSZ_SIZES = sorted(int(size) for size in os.getenv(
+    "ADAPTIVE_IMGSZ_SIZES", f"320,480,{DETECT_OPTIONS.get('imgsz', 640)}").split(","))
+
+# Image Quality Gate
+# Walls are checked for resolution, blur, exposure and near-duplicates before inference:
+# "flag" records the problems with the results, "reject" fails the request, "off" skips it
+QUALITY_GATE = os.getenv("QUALITY_GATE", "flag")
+QUALITY_MIN_SIDE = int(os.getenv("QUALITY_MIN_SIDE", 224))
+# Variance of the Laplacian at 512 px; plain painted walls score well below textured scenes
+QUALITY_MIN_SHARPNESS = float(os.getenv("QUALITY_MIN_SHARPNESS", 10))
+QUALITY_MIN_BRIGHTNESS = float(os.getenv("QUALITY_MIN_BRIGHTNESS", 40))
+QUALITY_MAX_BRIGHTNESS = float(os.getenv("QUALITY_MAX_BRIGHTNESS", 230))
+# Largest share of pixels allowed to be clipped to black or white
+QUALITY_MAX_CLIPPED = float(os.getenv("QUALITY_MAX_CLIPPED", 0.5))
+# Walls whose 64-bit perceptual hashes differ in at most this many bits are duplicates
+QUALITY_DUPLICATE_DISTANCE = int(os.getenv("QUALITY_DUPLICATE_DISTANCE", 6))
+
+# Micro-batching
+# Walls from all in-flight requests share forward passes: a batch starts once
+# MICRO_BATCH_MAX_SIZE images are waiting or MICRO_BATCH_MAX_WAIT_MS after the first arrived
+MICRO_BATCHING = os.getenv("MICRO_BATCHING", "1") == "1"
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", DETECT_BATCH_SIZE))
+MICRO_BATCH_MAX_WAIT = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", 20)) / 1000
+
+# Image Fetching
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", 6))
+# Keep-alive connections per host, shared by every in-flight request
+FETCH_POOL_SIZE = int(os.getenv("FETCH_POOL_SIZE", 32))
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", 10))
+FETCH_RETRIES = int(os.getenv("FETCH_RETRIES", 2))
+FETCH_BACKOFF = float(os.getenv("FETCH_BACKOFF", 0.5))
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", 20 * 1024 * 1024))
+
+# Asynchronous Analysis Jobs
+# Requests run synchronously unless they send "async": true (or ANALYZE_ASYNC=1 flips the default)
+ANALYZE_ASYNC = os.getenv("ANALYZE_ASYNC", "0") == "1"
+ANALYZE_WORKERS = int(os.getenv("ANALYZE_WORKERS", 2))
+ANALYZE_QUEUE_SIZE = int(os.getenv("ANALYZE_QUEUE_SIZE", 20))
+ANALYZE_RETRY_AFTER = int(os.getenv("ANALYZE_RETRY_AFTER", 30))
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 3600))
+# Seconds between keep-alive comments on an idle /analyze/stream response
+SSE_KEEPALIVE = float(os.getenv("SSE_KEEPALIVE", 15))
+
+# Batch Re-analysis
+# batch_reanalyze.py worker processes; each loads the model once
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 2))
+BATCH_CHECKPOINT = os.getenv("BATCH_CHECKPOINT", os.path.join(OUTPUT_DIR, "batch_checkpoint.jsonl"))
+
+# Detection Cache
+DETECTION_CACHE_ENABLED = os.getenv("DETECTION_CACHE_ENABLED", "1") == "1"
+DETECTION_CACHE_DIR = os.getenv("DETECTION_CACHE_DIR", os.path.join(OUTPUT_DIR, "detection_cache"))
+DETECTION_CACHE_MEMORY_ENTRIES = int(os.getenv("DETECTION_CACHE_MEMORY_ENTRIES", 256))
+DETECTION_CACHE_MAX_BYTES = int(os.getenv("DETECTION_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+DETECTION_CACHE_TTL = int(os.getenv("DETECTION_CACHE_TTL", 7 * 24 * 3600))
+# The disk tier is scanned for expired entries at most every DETECTION_CACHE_EVICT_INTERVAL
+# seconds, or sooner once the bytes written since the last scan could exceed the limit
+DETECTION_CACHE_EVICT_INTERVAL = float(os.getenv("DETECTION_CACHE_EVICT_INTERVAL", 60))
+
+# Report Storage
+# "memory" keeps annotated images and the PDF in buffers end to end;
+# "disk" also writes them to a per-job directory under SCRATCH_DIR for debugging
+REPORT_STORAGE_MODE = os.getenv("REPORT_STORAGE_MODE", "memory")
+
+# Scratch Space and Memory Budget
+# Finished jobs' directories are removed after SCRATCH_TTL seconds, least recently used
+# first once they hold more than SCRATCH_MAX_MB; cleanup runs at most every
+# SCRATCH_CLEANUP_INTERVAL seconds
+SCRATCH_DIR = os.getenv("SCRATCH_DIR", os.path.join(OUTPUT_DIR, "jobs"))
+SCRATCH_TTL = float(os.getenv("SCRATCH_TTL", 6 * 3600))
+SCRATCH_MAX_BYTES = int(float(os.getenv("SCRATCH_MAX_MB", 500)) * 1024 * 1024)
+SCRATCH_CLEANUP_INTERVAL = float(os.getenv("SCRATCH_CLEANUP_INTERVAL", 60))
+# Decoded wall images held at once by all jobs in a worker (0 = no limit)
+DECODE_MEMORY_BUDGET = int(float(os.getenv("DECODE_MEMORY_BUDGET_MB", 512)) * 1024 * 1024)
+
+# Annotation
+# Annotated walls are drawn onto a copy downscaled to fit the ANNOTATION_WIDTH_MM x
+# ANNOTATION_HEIGHT_MM box they are printed in, so the PDF embeds them as they are
+ANNOTATION_WIDTH_MM = float(os.getenv("ANNOTATION_WIDTH_MM", 120))
+ANNOTATION_HEIGHT_MM = float(os.getenv("ANNOTATION_HEIGHT_MM", 105))
+ANNOTATION_DPI = int(os.getenv("ANNOTATION_DPI", 150))
+ANNOTATION_JPEG_QUALITY = int(os.getenv("ANNOTATION_JPEG_QUALITY", 85))
+
+# Report Rendering
+# Each wall is printed inside the annotation box, two per page; other images with more
+# pixels than the box needs at ANNOTATION_DPI are downscaled and re-encoded at
+# REPORT_JPEG_QUALITY before embedding
+REPORT_JPEG_QUALITY = int(os.getenv("REPORT_JPEG_QUALITY", 80))
+REPORT_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# Tiled Inference
+# Images whose longest side reaches TILE_MIN_RESOLUTION are split into overlapping tiles
+TILED_INFERENCE = os.getenv("TILED_INFERENCE", "0") == "1"
+TILE_SIZE = int(os.getenv("TILE_SIZE", 640))
+TILE_OVERLAP = int(os.getenv("TILE_OVERLAP", 128))
+TILE_MIN_RESOLUTION = int(os.getenv("TILE_MIN_RESOLUTION", 2000))
+TILE_NMS_IOU = float(os.getenv("TILE_NMS_IOU", 0.5))
+
+# Profiling
+# Profile every request with PROFILE_REQUESTS=1, or a single one with ?profile=1;
+# a cProfile dump is kept only when the request took longer than PROFILE_THRESHOLD seconds
+PROFILE_REQUESTS = os.getenv("PROFILE_REQUESTS", "0") == "1"
+PROFILE_THRESHOLD = float(os.getenv("PROFILE_THRESHOLD", 5.0))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(OUTPUT_DIR, "profiles"))
@@ -0,0 +1,111 @@
+"""
+Shared test fixtures: a local server for the bundled wall images, a counting stub detector
+and pipeline globals that are restored after every test
+"""
+
+import functools
+import glob
+import os
+import threading
+from contextlib import contextmanager
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+import building_health_report as report
+from artifact_store import LocalStore
+from config import DEFAULT_MODEL_NAME
+from inference_backends import ResultBoxes
+from model_registry import registry
+
+TEST_IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Dummy-Retakan-1", "test", "images")
+WALLS = ["frontWall", "backWall", "leftWall", "rightWall"]
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve_directory(directory=TEST_IMAGES_DIR, handler=QuietHandler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory=directory))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class CountingResult:
+    def __init__(self, image):
+        height, width = image.shape[:2]
+        self.orig_img = image
+        xyxy = np.array([[width * 0.1, height * 0.1, width * 0.5, height * 0.5]], dtype=np.float32)
+        self.boxes = ResultBoxes(xyxy, np.array([0.8], dtype=np.float32), np.zeros(1, dtype=np.float32))
+
+
+class CountingModel:
+    """Reports one crack per image and remembers how many images it was asked about."""
+
+    def __init__(self):
+        self.images = 0
+
+    def __call__(self, source, **kwargs):
+        images = source if isinstance(source, list) else [source]
+        self.images += len(images)
+        return [CountingResult(image) for image in images]
+
+
+@pytest.fixture
+def image_names():
+    """Sorted file names of the bundled wall images."""
+    return sorted(os.path.basename(path) for path in glob.glob(os.path.join(TEST_IMAGES_DIR, "*.jpg")))
+
+
+@pytest.fixture
+def serve_images():
+    """serve_directory, for tests that need their own request handler."""
+    return serve_directory
+
+
+@pytest.fixture
+def image_server():
+    """Base URL of a local HTTP server for the bundled wall images."""
+    with serve_directory() as base_url:
+        yield base_url
+
+
+@pytest.fixture
+def isolated_registry(monkeypatch):
+    """The shared model registry, with every model installed by the test removed afterwards."""
+    for attribute in ("_paths", "_models", "_locks", "_versions", "_warm"):
+        monkeypatch.setattr(registry, attribute, type(getattr(registry, attribute))(getattr(registry, attribute)))
+    monkeypatch.setattr(registry, "warm_up_errors", dict(registry.warm_up_errors))
+    return registry
+
+
+@pytest.fixture
+def counting_model(isolated_registry):
+    """A CountingModel installed as the default detector for the test."""
+    model = CountingModel()
+    isolated_registry.set_model(DEFAULT_MODEL_NAME, model)
+    return model
+
+
+@pytest.fixture
+def no_detection_cache(monkeypatch):
+    monkeypatch.setattr(report, "detection_cache", None)
+
+
+@pytest.fixture
+def local_store(monkeypatch, tmp_path):
+    """Publish reports and annotated images to a temporary directory instead of Cloudinary."""
+    store = LocalStore(str(tmp_path / "artifacts"))
+    monkeypatch.setattr(report, "artifact_store", store)
+    return store
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from config import (
+    DETECTION_CACHE_ENABLED,
+    DETECTION_CACHE_DIR,
+    DETECTION_CACHE_EVICT_INTERVAL,
+    DETECTION_CACHE_MEMORY_ENTRIES,
+    DETECTION_CACHE_MAX_BYTES,
+    DETECTION_CACHE_TTL,
+)
+from metrics import CallbackMetric
+
+
+# Bump whenever the fields of a cached record or the way its annotation is drawn change, so
+# entries written by an older version are never served (2: quality results, print-sized JPEGs)
+RECORD_VERSION = 2
+
+# Keys are SHA-256 hex digests; anything else could name a path outside the cache directory
+KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def make_key(image_bytes, model_version):
+    digest = hashlib.sha256(model_version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(image_bytes)
+    return digest.hexdigest()
+
+
+class DetectionCache:
+    """Detection results keyed by image content + model version.
+
+    An in-memory LRU sits in front of an on-disk tier. Each disk entry is a JSON file with
+    the crack count, confidences and boxes next to the annotated JPEG, evicted by TTL and
+    then least-recently-used until the directory fits in `max_bytes`. The directory is only
+    scanned every `evict_interval` seconds, or when the running total of bytes written since
+    the last scan goes over `max_bytes`.
+    """
+
+    def __init__(self, directory=DETECTION_CACHE_DIR, memory_entries=DETECTION_CACHE_MEMORY_ENTRIES,
+                 max_bytes=DETECTION_CACHE_MAX_BYTES, ttl=DETECTION_CACHE_TTL,
+                 evict_interval=DETECTION_CACHE_EVICT_INTERVAL):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.evict_interval = evict_interval
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        # Bytes on disk as of the last scan plus everything written since; None until scanned
+        self._disk_bytes = None
+        self._last_evict = time.monotonic()
+
+    def get(self, key):
+        """The record stored under `key`, or None; keys not made by make_key never match."""
+        if not isinstance(key, str) or not KEY_PATTERN.fullmatch(key):
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+            self._memory.pop(key, None)
+
+        record = self._read_disk(key, now)
+        with self._lock:
+            if record is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, record, now)
+        return record
+
+    def put(self, key, record):
+        now = time.time()
+        with self._lock:
+            self._remember(key, record, now)
+        try:
+            written = self._write_disk(key, record)
+            self._maybe_evict_disk(now, written)
+        except OSError as e:
+            logging.warning(f"⚠️ Could not persist detection cache entry {key[:12]}: {e}")
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def _remember(self, key, record, now):
+        self._memory[key] = (now, record)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _paths(self, key):
+        if not KEY_PATTERN.fullmatch(key):
+            raise ValueError(f"Invalid detection cache key {key!r}")
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".jpg"
+
+    def _read_disk(self, key, now):
+        meta_path, image_path = self._paths(key)
+        try:
+            if now - os.path.getmtime(meta_path) > self.ttl:
+                return None
+            with open(meta_path, "r") as f:
+                record = json.load(f)
+            with open(image_path, "rb") as f:
+                record["annotated"] = f.read()
+            # Touch both files so eviction treats them as recently used
+            os.utime(meta_path)
+            os.utime(image_path)
+            return record
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, record):
+        meta_path, image_path = self._paths(key)
+        meta = {k: v for k, v in record.items() if k != "annotated"}
+        os.makedirs(self.directory, exist_ok=True)
+        written = 0
+        for path, data, mode in ((image_path, record["annotated"], "wb"), (meta_path, json.dumps(meta), "w")):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, mode) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            written += len(data)
+        return written
+
+    def _maybe_evict_disk(self, now, written):
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += written
+            due = (self._disk_bytes is None or self._disk_bytes > self.max_bytes
+                   or time.monotonic() - self._last_evict >= self.evict_interval)
+        # One scan at a time; a put that finds one running leaves the eviction to it
+        if due and self._evict_lock.acquire(blocking=False):
+            try:
+                self._last_evict = time.monotonic()
+                total = self._evict_disk(now)
+                with self._lock:
+                    self._disk_bytes = total
+            finally:
+                self._evict_lock.release()
+
+    def _evict_disk(self, now):
+        """Remove expired and least recently used entries; returns the bytes left on disk."""
+        entries = {}
+        for name in os.listdir(self.directory):
+            key = name.rsplit(".", 1)[0]
+            if name.endswith(".tmp") or not KEY_PATTERN.fullmatch(key):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            mtime, size = entries.get(key, (now, 0))
+            entries[key] = (min(mtime, stat.st_mtime), size + stat.st_size)
+
+        total = sum(size for _, size in entries.values())
+        for key, (mtime, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if now - mtime <= self.ttl and total <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+        return total
+
+
+detection_cache = DetectionCache() if DETECTION_CACHE_ENABLED else None
+
+if detection_cache is not None:
+    CallbackMetric(
+        "building_health_detection_cache_lookups_total",
+        "Detection cache lookups by result.",
+        lambda: {
+            ("memory_hit",): detection_cache.memory_hits,
+            ("disk_hit",): detection_cache.disk_hits,
+            ("miss",): detection_cache.misses,
+        },
+        type="counter",
+        labelnames=["result"],
+    )
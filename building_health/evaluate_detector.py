@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Speed/accuracy sweep of detector settings over the labelled Dummy-Retakan-1 images.
+
+For every combination of model file, input size, confidence and NMS IoU threshold the
+detector is run over the valid/test splits and compared with the YOLO labels. Each setting
+reports precision, recall, mAP@0.5 and mAP@0.5:0.95 next to images/sec, peak RSS and how
+far the wall scores (10 - cracks * 1.5) drift from the first setting in the grid.
+"""
+
+import argparse
+import glob
+import itertools
+import json
+import os
+import resource
+import time
+
+import numpy as np
+
+from config import OUTPUT_DIR, YOLO_MODEL_PATH
+from image_fetch import decode_image
+from inference_backends import result_arrays
+from model_registry import ModelRegistry
+from tiling import box_iou
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_DIR = os.path.join(BASE_DIR, "Dummy-Retakan-1")
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+
+def parse_label_file(path, width, height):
+    """YOLO labels as absolute xyxy boxes; polygon rows are reduced to their bounding box."""
+    boxes = []
+    if not os.path.exists(path):
+        return np.empty((0, 4), dtype=np.float32)
+    with open(path) as f:
+        for line in f:
+            values = [float(v) for v in line.split()[1:]]
+            if len(values) == 4:
+                cx, cy, w, h = values
+                boxes.append([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2])
+            elif len(values) >= 6:
+                points = np.asarray(values[:len(values) // 2 * 2]).reshape(-1, 2)
+                boxes.append([*points.min(axis=0), *points.max(axis=0)])
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    return boxes * np.array([width, height, width, height], dtype=np.float32)
+
+
+def load_split(split):
+    samples = []
+    for image_path in sorted(glob.glob(os.path.join(DATASET_DIR, split, "images", "*"))):
+        with open(image_path, "rb") as f:
+            image = decode_image(f.read())
+        height, width = image.shape[:2]
+        label_path = os.path.join(DATASET_DIR, split, "labels", os.path.splitext(os.path.basename(image_path))[0] + ".txt")
+        samples.append((image, parse_label_file(label_path, width, height)))
+    return samples
+
+
+def match_predictions(pred_boxes, gt_boxes, iou_thresholds=IOU_THRESHOLDS):
+    """(num_preds, num_thresholds) true-positive matrix; predictions must be sorted by score."""
+    tp = np.zeros((len(pred_boxes), len(iou_thresholds)), dtype=bool)
+    if not len(pred_boxes) or not len(gt_boxes):
+        return tp
+    iou = box_iou(pred_boxes, gt_boxes)
+    for t, threshold in enumerate(iou_thresholds):
+        matches = np.argwhere(iou >= threshold)
+        if not matches.size:
+            continue
+        # Highest IoU pairs first, then keep one prediction per label and one label per prediction
+        matches = matches[np.argsort(-iou[matches[:, 0], matches[:, 1]], kind="stable")]
+        matches = matches[np.unique(matches[:, 1], return_index=True)[1]]
+        matches = matches[np.unique(matches[:, 0], return_index=True)[1]]
+        tp[matches[:, 0], t] = True
+    return tp
+
+
+def average_precision(tp, scores, num_labels):
+    """All-point interpolated AP per IoU threshold from pooled true-positive flags."""
+    if num_labels == 0 or not len(scores):
+        return np.zeros(tp.shape[1])
+    order = np.argsort(-scores, kind="stable")
+    tp = tp[order]
+    true_positives = np.cumsum(tp, axis=0)
+    false_positives = np.cumsum(~tp, axis=0)
+    recall = true_positives / num_labels
+    precision = true_positives / (true_positives + false_positives)
+
+    recall = np.vstack([np.zeros((1, tp.shape[1])), recall, np.ones((1, tp.shape[1]))])
+    precision = np.vstack([np.ones((1, tp.shape[1])), precision, np.zeros((1, tp.shape[1]))])
+    precision = np.flip(np.maximum.accumulate(np.flip(precision, axis=0), axis=0), axis=0)
+    return np.sum((recall[1:] - recall[:-1]) * precision[1:], axis=0)
+
+
+def reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def wall_scores(crack_counts):
+    return np.clip(10 - np.asarray(crack_counts) * 1.5, 0, 10)
+
+
+def evaluate(registry, model_name, samples, imgsz, conf, iou):
+    registry.predict(samples[0][0], name=model_name, imgsz=imgsz, conf=conf, iou=iou)
+
+    all_tp = []
+    all_scores = []
+    crack_counts = []
+    num_labels = 0
+    reset_peak_rss()
+    start = time.perf_counter()
+    for image, gt_boxes in samples:
+        result = registry.predict(image, name=model_name, imgsz=imgsz, conf=conf, iou=iou)[0]
+        xyxy, scores, cls = result_arrays(result)
+        keep = cls.astype(int) == 0
+        pred_boxes = xyxy[keep]
+        scores = scores[keep]
+        order = np.argsort(-scores, kind="stable")
+        all_tp.append(match_predictions(pred_boxes[order], gt_boxes))
+        all_scores.append(scores[order])
+        crack_counts.append(len(scores))
+        num_labels += len(gt_boxes)
+    elapsed = time.perf_counter() - start
+
+    tp = np.concatenate(all_tp)
+    scores = np.concatenate(all_scores)
+    ap = average_precision(tp, scores, num_labels)
+    found = int(tp[:, 0].sum())
+    return {
+        "precision": found / len(scores) if len(scores) else 0.0,
+        "recall": found / num_labels if num_labels else 0.0,
+        "map50": float(ap[0]),
+        "map50_95": float(ap.mean()),
+        "images_per_s": len(samples) / elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+        "crack_counts": crack_counts,
+    }
+
+
+def csv_values(text, cast):
+    return [cast(value) for value in text.split(",") if value]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", default=YOLO_MODEL_PATH, help="Comma separated model files")
+    parser.add_argument("--splits", default="valid,test", help="Comma separated dataset splits")
+    parser.add_argument("--imgsz", default="320,480,640", help="Comma separated input sizes")
+    parser.add_argument("--conf", default="0.25,0.4", help="Comma separated confidence thresholds")
+    parser.add_argument("--iou", default="0.7,0.5", help="Comma separated NMS IoU thresholds")
+    parser.add_argument("--output", help="Where to write JSON results")
+    args = parser.parse_args()
+
+    samples = [sample for split in csv_values(args.splits, str) for sample in load_split(split)]
+    if not samples:
+        print(f"❌ No labelled images found under {DATASET_DIR}")
+        return
+    print(f"🧪 {len(samples)} labelled images, {sum(len(gt) for _, gt in samples)} cracks")
+
+    models = csv_values(args.models, str)
+    registry = ModelRegistry({os.path.basename(path): path for path in models}, default_name=os.path.basename(models[0]))
+    grid = itertools.product(models, csv_values(args.imgsz, int), csv_values(args.conf, float), csv_values(args.iou, float))
+
+    results = []
+    reference_scores = None
+    print(f"{'model':<16}{'imgsz':>6}{'conf':>6}{'iou':>6}{'P':>7}{'R':>7}{'mAP50':>8}{'mAP50-95':>10}"
+          f"{'img/s':>8}{'RSS MB':>8}{'drift':>7}")
+    for model_path, imgsz, conf, iou in grid:
+        model_name = os.path.basename(model_path)
+        result = evaluate(registry, model_name, samples, imgsz, conf, iou)
+        scores = wall_scores(result.pop("crack_counts"))
+        if reference_scores is None:
+            reference_scores = scores
+        result.update({"model": model_path, "imgsz": imgsz, "conf": conf, "iou": iou,
+                       "score_drift": float(np.abs(scores - reference_scores).mean())})
+        results.append(result)
+        print(f"{model_name:<16}{imgsz:>6}{conf:>6.2f}{iou:>6.2f}{result['precision']:>7.3f}{result['recall']:>7.3f}"
+              f"{result['map50']:>8.3f}{result['map50_95']:>10.3f}{result['images_per_s']:>8.1f}"
+              f"{result['peak_rss_mb']:>8.0f}{result['score_drift']:>7.2f}")
+
+    output = args.output or os.path.join(OUTPUT_DIR, "benchmarks", f"sweep-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import json
+import queue
+import threading
+
+from config import SSE_KEEPALIVE
+
+
+class EventStream:
+    """Thread-safe queue of Server-Sent Events, numbered in the order they were emitted.
+
+    The analysis thread calls `emit` and finally `close`; the response iterates over the
+    stream, which ends after the close (or immediately once the client goes away).
+    """
+
+    def __init__(self, keepalive=SSE_KEEPALIVE):
+        self.keepalive = keepalive
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._closed = False
+
+    def emit(self, event, data):
+        with self._lock:
+            if self._closed:
+                return
+            self._next_id += 1
+            self._queue.put((self._next_id, event, data))
+
+    def close(self, event=None, data=None):
+        """Emit a last event (if given) and end the stream; later events are dropped."""
+        with self._lock:
+            if self._closed:
+                return
+            if event is not None:
+                self._next_id += 1
+                self._queue.put((self._next_id, event, data))
+            self._closed = True
+            self._queue.put(None)
+
+    def __iter__(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.keepalive)
+            except queue.Empty:
+                # Comment lines keep proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            if item is None:
+                return
+            event_id, event, data = item
+            yield f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
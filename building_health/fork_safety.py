@@ -0,0 +1,37 @@
+import os
+import threading
+
+
+class PerProcess:
+    """A value built on first use in each process.
+
+    Threads do not survive fork(), so a background thread or pool created in the parent is
+    dead weight in a forked worker; `get` builds a fresh one there instead of reusing it.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._value = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._value = self.factory()
+                self._pid = os.getpid()
+            return self._value
+
+    def current(self):
+        """The value built in this process, or None if `get` has not been called here yet."""
+        return self._value if self._pid == os.getpid() else None
+
+
+def daemon_thread(target, name):
+    """A daemon thread running `target`, started by the first `get()` in each process."""
+    def start():
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        return thread
+
+    return PerProcess(start)
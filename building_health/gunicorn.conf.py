@@ -0,0 +1,34 @@
+"""
+gunicorn settings for the analysis server: gunicorn -c gunicorn.conf.py app:app
+
+The app (and with the pytorch backend, the model) is loaded once in the master before
+forking, so every worker shares the same weights copy-on-write instead of loading its own.
+Set MODEL_PRELOAD=0 to load the app separately in each worker.
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 300))
+# Must be set before app.py (and config.py) are imported
+preload_app = os.environ.setdefault("MODEL_PRELOAD", "1") == "1"
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far into the permanent generation, so the workers' garbage
+    # collections don't write to (and un-share) the pages holding the model
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    from model_registry import registry
+
+    if not registry.is_warm():
+        import app
+
+        app.warm_up_in_background()
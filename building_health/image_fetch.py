@@ -0,0 +1,170 @@
+import io
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from PIL import Image, ImageOps
+
+from config import (
+    FETCH_WORKERS, FETCH_POOL_SIZE, FETCH_TIMEOUT, FETCH_RETRIES, FETCH_BACKOFF, FETCH_MAX_BYTES,
+    DECODE_MEMORY_BUDGET,
+)
+from metrics import CallbackMetric, Histogram, fetch_retries, failures
+from stage_timing import timed_stage
+
+
+class ImageFetchError(Exception):
+    pass
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Shared keep-alive session, pooled so concurrent fetch workers can each hold a connection."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=FETCH_POOL_SIZE, pool_maxsize=FETCH_POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _read_limited(response, max_bytes):
+    length = response.headers.get("Content-Length")
+    if length and int(length) > max_bytes:
+        raise ImageFetchError(f"Image is {length} bytes, limit is {max_bytes}")
+
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        size += len(chunk)
+        if size > max_bytes:
+            raise ImageFetchError(f"Image exceeds the {max_bytes} byte limit")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def fetch_image_bytes(url, session=None, timeout=FETCH_TIMEOUT, retries=FETCH_RETRIES, max_bytes=FETCH_MAX_BYTES):
+    session = session or get_session()
+    last_error = None
+
+    for attempt in range(retries + 1):
+        if attempt:
+            fetch_retries.inc()
+            time.sleep(FETCH_BACKOFF * 2 ** (attempt - 1))
+        try:
+            with session.get(url, timeout=timeout, stream=True) as response:
+                if 400 <= response.status_code < 500 and response.status_code != 429:
+                    # Client errors won't fix themselves, so don't spend retries on them
+                    failures.inc(stage="fetch")
+                    raise ImageFetchError(f"{url} returned HTTP {response.status_code}")
+                response.raise_for_status()
+                return _read_limited(response, max_bytes)
+        except requests.RequestException as e:
+            last_error = e
+            logging.warning(f"⚠️ Fetch attempt {attempt + 1}/{retries + 1} failed for {url}: {e}")
+
+    failures.inc(stage="fetch")
+    raise ImageFetchError(f"Failed to fetch {url} after {retries + 1} attempts: {last_error}")
+
+
+decode_budget_wait = Histogram(
+    "building_health_decode_budget_wait_seconds", "Time jobs waited for room in the decoded image memory budget.")
+
+
+class MemoryBudget:
+    """Caps the bytes of decoded images held at once by all jobs in this process.
+
+    `reserve` blocks until the bytes fit; a job needing more than the whole budget waits
+    until it can run alone instead of never running. A budget of 0 disables the cap.
+    """
+
+    def __init__(self, max_bytes=DECODE_MEMORY_BUDGET):
+        self.max_bytes = max_bytes
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, nbytes):
+        if not self.max_bytes:
+            yield
+            return
+        start = time.perf_counter()
+        with self._condition:
+            while self.in_use and self.in_use + nbytes > self.max_bytes:
+                self._condition.wait()
+            self.in_use += nbytes
+        decode_budget_wait.observe(time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_use -= nbytes
+                self._condition.notify_all()
+
+
+decode_budget = MemoryBudget()
+CallbackMetric(
+    "building_health_decoded_bytes_in_flight", "Bytes of decoded images reserved by running jobs.",
+    lambda: decode_budget.in_use)
+
+
+def decoded_size(data):
+    """Bytes of the array decode_image will produce, read from the image header only."""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            width, height = img.size
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        return 0  # decode_image reports the error
+    return width * height * 3
+
+
+@timed_stage("decode")
+def decode_image(data):
+    """Decode image bytes to a contiguous BGR array, the layout the detector expects."""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            return np.ascontiguousarray(np.asarray(img)[:, :, ::-1])
+    except Image.DecompressionBombError as e:
+        # Pixel count over Image.MAX_IMAGE_PIXELS; decoding it would exhaust memory
+        raise ImageFetchError(f"Image is too large to decode: {e}") from e
+    except (OSError, SyntaxError) as e:
+        raise ImageFetchError(f"Could not decode image: {e}") from e
+
+
+@timed_stage("fetch")
+def fetch_images(image_urls, decode=True, max_workers=FETCH_WORKERS):
+    """Fetch every wall concurrently; returns wall -> BGR array (or raw bytes when decode=False)."""
+    session = get_session()
+
+    def fetch(url):
+        data = fetch_image_bytes(url, session=session)
+        return decode_image(data) if decode else data
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(image_urls)))) as pool:
+        futures = {wall: pool.submit(fetch, url) for wall, url in image_urls.items()}
+        images = {wall: future.result() for wall, future in futures.items()}
+
+    logging.info(f"📥 Fetched {len(images)} images")
+    return images
+
+
+def iter_image_bytes(image_urls, max_workers=FETCH_WORKERS):
+    """Fetch every wall concurrently, yielding (wall, bytes) as each download completes."""
+    session = get_session()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(image_urls)))) as pool:
+        futures = {pool.submit(fetch_image_bytes, url, session=session): wall for wall, url in image_urls.items()}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
@@ -0,0 +1,224 @@
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from config import INFERENCE_BACKEND, INFERENCE_THREADS, INFERENCE_INTER_OP_THREADS, EXPORT_IMGSZ
+from annotation import draw_annotation
+from tiling import nms
+
+BACKENDS = ("pytorch", "onnx", "onnx-int8", "openvino")
+
+
+def result_arrays(result):
+    """xyxy boxes, confidences and classes of any backend's result as NumPy arrays."""
+    boxes = result.boxes
+    return tuple(
+        np.asarray(value.cpu().numpy() if hasattr(value, "cpu") else value, dtype=np.float32)
+        for value in (boxes.xyxy, boxes.conf, boxes.cls)
+    )
+
+
+class ResultBoxes:
+    __slots__ = ("xyxy", "conf", "cls")
+
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+    def __len__(self):
+        return len(self.conf)
+
+    @classmethod
+    def of(cls, result):
+        return cls(*result_arrays(result))
+
+    def cracks(self, crack_class=0):
+        keep = self.cls.astype(int) == crack_class
+        return ResultBoxes(self.xyxy[keep], self.conf[keep], self.cls[keep])
+
+
+class DetectionResult:
+    """Minimal stand-in for an ultralytics Results object, produced by the exported backends."""
+
+    __slots__ = ("orig_img", "boxes")
+
+    def __init__(self, orig_img, xyxy, conf, cls):
+        self.orig_img = orig_img
+        self.boxes = ResultBoxes(xyxy, conf, cls)
+
+    def plot(self):
+        # BGR at full resolution, like ultralytics' Results.plot()
+        return draw_annotation(self.orig_img, self.boxes.xyxy, self.boxes.conf)
+
+
+def letterbox(image, size):
+    """Resize keeping aspect ratio and pad to size x size with grey, as the YOLO trainer does."""
+    import cv2
+
+    height, width = image.shape[:2]
+    ratio = min(size / height, size / width)
+    new_width, new_height = round(width * ratio), round(height * ratio)
+    pad_x, pad_y = (size - new_width) / 2, (size - new_height) / 2
+    if (new_width, new_height) != (width, height):
+        image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    top, left = round(pad_y - 0.1), round(pad_x - 0.1)
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[top:top + new_height, left:left + new_width] = image
+    return canvas, ratio, (left, top)
+
+
+def postprocess(prediction, ratio, pad, image_shape, conf=0.25, iou=0.7, max_det=300):
+    """Decode one (4 + classes, anchors) YOLOv8 output into xyxy boxes in original image pixels."""
+    prediction = prediction.T
+    class_scores = prediction[:, 4:]
+    classes = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(classes)), classes]
+    keep = scores > conf
+    cxcywh, scores, classes = prediction[keep, :4], scores[keep], classes[keep]
+
+    boxes = np.concatenate([cxcywh[:, :2] - cxcywh[:, 2:] / 2, cxcywh[:, :2] + cxcywh[:, 2:] / 2], axis=1)
+    # Offset boxes per class so one NMS pass never suppresses across classes
+    offsets = classes[:, None].astype(np.float32) * 7680
+    kept = nms(boxes + offsets, scores, iou)[:max_det]
+    boxes, scores, classes = boxes[kept], scores[kept], classes[kept]
+
+    boxes -= np.array([pad[0], pad[1], pad[0], pad[1]], dtype=np.float32)
+    boxes /= ratio
+    height, width = image_shape[:2]
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+    return boxes.astype(np.float32), scores.astype(np.float32), classes.astype(np.float32)
+
+
+def export_model(model_path, fmt, imgsz=EXPORT_IMGSZ):
+    """Export the PyTorch weights once; later calls reuse the exported file while it is newer."""
+    from ultralytics import YOLO
+
+    base = os.path.splitext(model_path)[0]
+    target = {"onnx": base + ".onnx", "openvino": base + "_openvino_model"}[fmt]
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(model_path):
+        return target
+
+    start = time.perf_counter()
+    exported = YOLO(model_path).export(format=fmt, imgsz=imgsz, dynamic=fmt == "onnx")
+    logging.info(f"📦 Exported {model_path} to {fmt} in {time.perf_counter() - start:.1f}s")
+    return exported or target
+
+
+def quantize_onnx(onnx_path):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    target = os.path.splitext(onnx_path)[0] + "_int8.onnx"
+    if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(onnx_path):
+        quantize_dynamic(onnx_path, target, weight_type=QuantType.QUInt8)
+        logging.info(f"📦 Quantized {onnx_path} to int8")
+    return target
+
+
+class UltralyticsBackend:
+    name = "pytorch"
+
+    def __init__(self, model_path, threads=INFERENCE_THREADS):
+        import torch
+        from ultralytics import YOLO
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.model = YOLO(model_path)
+
+    def __call__(self, source, **options):
+        return self.model(source, **options)
+
+
+class ExportedBackend(ABC):
+    """Shared YOLO pre/post-processing around a runtime that maps an NCHW batch to raw outputs."""
+
+    name = None
+
+    def __init__(self, imgsz=EXPORT_IMGSZ):
+        self.imgsz = imgsz
+
+    @abstractmethod
+    def run(self, batch):
+        """Raw (batch, 4 + classes, anchors) outputs for a float32 NCHW batch."""
+
+    def __call__(self, source, imgsz=None, conf=0.25, iou=0.7, max_det=300, **ignored):
+        from image_fetch import decode_image
+
+        imgsz = imgsz or self.imgsz
+        images = source if isinstance(source, list) else [source]
+        decoded = []
+        for image in images:
+            if isinstance(image, str):
+                with open(image, "rb") as f:
+                    image = decode_image(f.read())
+            decoded.append(image)
+
+        boxed = [letterbox(image, imgsz) for image in decoded]
+        batch = np.stack([canvas for canvas, _, _ in boxed])[..., ::-1].transpose(0, 3, 1, 2)
+        batch = np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+
+        outputs = self.run(batch)
+        return [
+            DetectionResult(image, *postprocess(prediction, ratio, pad, image.shape, conf, iou, max_det))
+            for image, prediction, (_, ratio, pad) in zip(decoded, outputs, boxed)
+        ]
+
+
+class OnnxRuntimeBackend(ExportedBackend):
+    name = "onnx"
+
+    def __init__(self, model_path, int8=False, threads=INFERENCE_THREADS, inter_op_threads=INFERENCE_INTER_OP_THREADS,
+                 imgsz=EXPORT_IMGSZ):
+        import onnxruntime as ort
+
+        super().__init__(imgsz)
+        onnx_path = model_path if model_path.endswith(".onnx") else export_model(model_path, "onnx", imgsz)
+        if int8:
+            onnx_path = quantize_onnx(onnx_path)
+            self.name = "onnx-int8"
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = inter_op_threads
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def run(self, batch):
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVinoBackend(ExportedBackend):
+    name = "openvino"
+
+    def __init__(self, model_path, threads=INFERENCE_THREADS, imgsz=EXPORT_IMGSZ):
+        from openvino.runtime import Core
+
+        super().__init__(imgsz)
+        model_dir = export_model(model_path, "openvino", imgsz)
+        xml_path = next(os.path.join(model_dir, name) for name in os.listdir(model_dir) if name.endswith(".xml"))
+        core = Core()
+        model = core.read_model(xml_path)
+        # Exported with static shapes; let batch and input size vary like the ONNX export
+        model.reshape({model.inputs[0].any_name: [-1, 3, -1, -1]})
+        config = {"INFERENCE_NUM_THREADS": str(threads)} if threads else {}
+        self.compiled = core.compile_model(model, "CPU", config)
+
+    def run(self, batch):
+        return self.compiled(batch)[self.compiled.outputs[0]]
+
+
+def create_backend(model_path, backend=INFERENCE_BACKEND):
+    if backend == "pytorch":
+        return UltralyticsBackend(model_path)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxRuntimeBackend(model_path, int8=backend == "onnx-int8")
+    if backend == "openvino":
+        return OpenVinoBackend(model_path)
+    raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+
@@ -0,0 +1,120 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+
+from config import ANALYZE_WORKERS, ANALYZE_QUEUE_SIZE, JOB_RESULT_TTL
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, fn, args, kwargs):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        self._done = threading.Event()
+
+    def run(self):
+        self.status = "running"
+        self.started_at = time.time()
+        try:
+            self.result = self._fn(*self._args, **self._kwargs)
+            self.status = "done"
+        except Exception as e:
+            logging.error(f"❌ Job {self.id} failed: {e}")
+            self.error = str(e)
+            self.status = "failed"
+        finally:
+            self.finished_at = time.time()
+            self._done.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """Bounded queue drained by a fixed pool of worker threads."""
+
+    def __init__(self, workers=ANALYZE_WORKERS, max_queued=ANALYZE_QUEUE_SIZE, result_ttl=JOB_RESULT_TTL):
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"analyze-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logging.info(f"👷 Started {self.workers} analysis workers")
+
+    def submit(self, fn, *args, **kwargs):
+        self.start()
+        job = Job(fn, args, kwargs)
+        with self._lock:
+            self._prune()
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise QueueFullError(f"Job queue is full ({self._queue.maxsize} pending)")
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                job.run()
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,184 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+import stage_timing
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + list(extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for name, key, value in self.samples():
+            lines.append(f"{name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    @contextmanager
+    def track_in_progress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, (list(counts), total)) for key, (counts, total) in self._values.items()]
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for _, key, (counts, total) in self.samples():
+            for bound, count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {counts[-1]}")
+        return "\n".join(lines)
+
+
+class CallbackMetric(_Metric):
+    """Metric read from `callback()` at scrape time: a number, or a dict of label tuple -> number."""
+
+    def __init__(self, name, documentation, callback, type="gauge", labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.type = type
+        self.callback = callback
+
+    def samples(self):
+        values = self.callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [(self.name, key, value) for key, value in values.items()]
+
+
+def render():
+    with _registry_lock:
+        metrics = list(_registry)
+    return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+stage_duration = Histogram(
+    "building_health_stage_duration_seconds", "Time spent in each analysis pipeline stage.", ["stage"])
+request_duration = Histogram(
+    "building_health_request_duration_seconds", "End-to-end /analyze latency.", ["mode"])
+requests_total = Counter(
+    "building_health_requests_total", "Analysis requests by mode and outcome.", ["mode", "status"])
+requests_in_flight = Gauge(
+    "building_health_requests_in_flight", "Analysis requests currently being processed.")
+walls_analyzed = Counter(
+    "building_health_walls_analyzed_total", "Wall images that went through crack detection.")
+walls_reused = Counter(
+    "building_health_walls_reused_total", "Walls whose previous result was reused by an incremental analysis.")
+cracks_detected = Counter(
+    "building_health_cracks_detected_total", "Cracks detected across all analysed walls.")
+fetch_retries = Counter(
+    "building_health_fetch_retries_total", "Image download attempts that were retried.")
+upload_retries = Counter(
+    "building_health_upload_retries_total", "Artifact upload attempts that were retried, by artifact kind.", ["kind"])
+quality_issues = Counter(
+    "building_health_quality_issues_total", "Wall images that failed a pre-inference quality check, by check.", ["check"])
+coalesced_requests = Counter(
+    "building_health_coalesced_requests_total",
+    "Analysis requests that attached to an identical one already in progress, by how they matched.", ["level"])
+failures = Counter(
+    "building_health_failures_total", "Pipeline failures by stage.", ["stage"])
+
+stage_timing.add_listener(lambda stage, seconds: stage_duration.observe(seconds, stage=stage))
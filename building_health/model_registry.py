@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from config import DEFAULT_MODEL_NAME, DETECT_OPTIONS, INFERENCE_BACKEND, YOLO_MODELS, WARMUP_IMAGE_SIZE
+
+
+class ModelRegistry:
+    """Process-wide cache of YOLO models, loaded once and shared across threads."""
+
+    def __init__(self, model_paths=None, default_name=DEFAULT_MODEL_NAME, predict_options=None,
+                 backend=INFERENCE_BACKEND):
+        self._paths = dict(YOLO_MODELS if model_paths is None else model_paths)
+        self._default = default_name
+        self.backend = backend
+        self.predict_options = dict(DETECT_OPTIONS if predict_options is None else predict_options)
+        self._models = {}
+        self._locks = {}
+        self._versions = {}
+        self._warm = set()
+        self.warm_up_errors = {}
+        self._load_lock = threading.Lock()
+
+    def names(self):
+        return list(self._paths)
+
+    def register(self, name, path):
+        with self._load_lock:
+            self._paths[name] = path
+            self._models.pop(name, None)
+            self._versions.pop(name, None)
+            self._warm.discard(name)
+
+    def set_model(self, name, model):
+        """Install an already constructed model (or any callable with the YOLO interface)."""
+        with self._load_lock:
+            self._paths.setdefault(name, None)
+            self._models[name] = model
+            self._locks.setdefault(name, threading.Lock())
+            self._versions.pop(name, None)
+            self._warm.discard(name)
+
+    def get(self, name=None):
+        name = name or self._default
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._load_lock:
+            if name not in self._models:
+                if name not in self._paths:
+                    raise KeyError(f"Unknown model '{name}'")
+                from inference_backends import create_backend
+
+                start = time.perf_counter()
+                self._models[name] = create_backend(self._paths[name], self.backend)
+                self._locks.setdefault(name, threading.Lock())
+                logging.info(f"🧠 Loaded model '{name}' from {self._paths[name]} ({self.backend}) "
+                             f"in {time.perf_counter() - start:.2f}s")
+            return self._models[name]
+
+    def version(self, name=None):
+        """Identifier that changes whenever the model's weights change."""
+        name = name or self._default
+        if name not in self._versions:
+            path = self._paths.get(name)
+            if path and os.path.exists(path):
+                digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(chunk)
+                self._versions[name] = f"{name}:{digest.hexdigest()[:16]}"
+            else:
+                self._versions[name] = name
+            # Exported runtimes round differently, so their detections are cached separately
+            if self.backend != "pytorch":
+                self._versions[name] += f":{self.backend}"
+        return self._versions[name]
+
+    def predict(self, source, name=None, **kwargs):
+        # Ultralytics predictors keep per-call state, so calls on one model are serialized.
+        name = name or self._default
+        model = self.get(name)
+        with self._locks[name]:
+            return model(source, **{**self.predict_options, **kwargs})
+
+    def warm_up(self, name=None):
+        name = name or self._default
+        dummy = np.zeros((WARMUP_IMAGE_SIZE, WARMUP_IMAGE_SIZE, 3), dtype=np.uint8)
+        start = time.perf_counter()
+        self.predict(dummy, name=name)
+        self._warm.add(name)
+        self.warm_up_errors.pop(name, None)
+        logging.info(f"🔥 Warmed up model '{name}' in {time.perf_counter() - start:.2f}s")
+
+    def is_warm(self, name=None):
+        return (name or self._default) in self._warm
+
+    def warm_up_all(self):
+        for name in self.names():
+            try:
+                self.warm_up(name)
+            except Exception as e:
+                self.warm_up_errors[name] = str(e)
+                logging.error(f"❌ Warm-up failed for model '{name}': {e}")
+
+
+registry = ModelRegistry()
@@ -0,0 +1,62 @@
+import cProfile
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from config import PROFILE_DIR, PROFILE_THRESHOLD
+
+# cProfile hooks are process-wide on Python 3.12+, so only one request is profiled at a time
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def is_profiling():
+    """Whether the calling thread is inside profile_if_slow; work it would hand to another
+    thread, such as the micro-batch scheduler, should then run inline so it is captured."""
+    return getattr(_local, "active", False)
+
+
+@contextmanager
+def profile_if_slow(label, enabled=True, threshold=PROFILE_THRESHOLD, directory=PROFILE_DIR):
+    """Run the block under cProfile and keep the dump only if it took longer than `threshold`.
+
+    Only the calling thread is profiled; fetch and upload pool threads are not included, and
+    inference runs in that thread for the duration. While another profile is active the block
+    runs unprofiled.
+    """
+    if not enabled:
+        yield
+        return
+    if not _lock.acquire(blocking=False):
+        logging.info(f"⏭️ Not profiling {label}: another request is being profiled")
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Another profiling tool (a debugger, coverage) already holds the hooks
+        _lock.release()
+        logging.info(f"⏭️ Not profiling {label}: {e}")
+        yield
+        return
+
+    start = time.perf_counter()
+    _local.active = True
+    try:
+        yield
+    finally:
+        _local.active = False
+        profiler.disable()
+        _lock.release()
+        elapsed = time.perf_counter() - start
+        if elapsed >= threshold:
+            os.makedirs(directory, exist_ok=True)
+            safe_label = re.sub(r"[^A-Za-z0-9_.-]", "_", label)
+            path = os.path.join(directory, f"{safe_label}_{int(time.time())}.prof")
+            profiler.dump_stats(path)
+            logging.warning(f"🐢 {label} took {elapsed:.2f}s, profile saved to {path}")
@@ -0,0 +1,132 @@
+import atexit
+import logging
+import multiprocessing.util
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from config import MONGO_WRITE_BATCH_SIZE, MONGO_FLUSH_INTERVAL
+from fork_safety import daemon_thread
+from metrics import Histogram, failures
+from stage_timing import timed_stage
+
+write_batch_size = Histogram(
+    "building_health_db_write_batch_size", "Property updates sent per MongoDB bulk_write.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250))
+
+
+class PropertyUpdateError(Exception):
+    pass
+
+
+class PropertyUpdater:
+    """Write-behind queue of `$set` updates to property documents.
+
+    Updates for the same property are merged while they wait, and pending updates go out as
+    one ordered bulk_write once `batch_size` properties are queued or `flush_interval`
+    seconds have passed. `submit` returns a Future resolved with True once the property was
+    matched, or False if it does not exist or the write failed.
+    """
+
+    def __init__(self, get_collection, batch_size=MONGO_WRITE_BATCH_SIZE, flush_interval=MONGO_FLUSH_INTERVAL):
+        self.get_collection = get_collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = daemon_thread(self._run, "property-updater")
+
+    def submit(self, property_id, fields):
+        from bson import ObjectId
+
+        future = Future()
+        if not ObjectId.is_valid(property_id):
+            logging.error(f"❌ Invalid ObjectId format: {property_id}")
+            future.set_result(False)
+            return future
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Property updater is closed")
+            self._flusher.get()
+            queued_fields, futures = self._pending.pop(property_id, ({}, []))
+            # Re-inserted at the end so writes still reach MongoDB in submission order
+            self._pending[property_id] = ({**queued_fields, **fields}, futures + [future])
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+        return future
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """Write everything queued so far; returns the number of properties written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, OrderedDict()
+            if batch:
+                self._write(batch)
+            return len(batch)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self._wake.set()
+        flusher = self._flusher.current()
+        if flusher is not None and flusher.is_alive():
+            flusher.join(timeout=self.flush_interval + 30)
+        self.flush()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"❌ Property update flush failed: {e}")
+
+    @timed_stage("db_update")
+    def _write(self, batch):
+        from bson import ObjectId
+        from pymongo import UpdateOne
+
+        operations = [UpdateOne({"_id": ObjectId(pid)}, {"$set": fields}) for pid, (fields, _) in batch.items()]
+        write_batch_size.observe(len(operations))
+        try:
+            collection = self.get_collection()
+            result = collection.bulk_write(operations, ordered=True)
+            if result.matched_count == len(operations):
+                matched = set(batch)
+            else:
+                # bulk_write only reports totals, so look up which properties were missing
+                ids = [ObjectId(pid) for pid in batch]
+                matched = {str(doc["_id"]) for doc in collection.find({"_id": {"$in": ids}}, {"_id": 1})}
+        except Exception as e:
+            failures.inc(stage="db_update")
+            logging.error(f"❌ Failed to write {len(operations)} property updates to MongoDB: {e}")
+            self._resolve(batch, set())
+            return
+
+        for pid in set(batch) - matched:
+            logging.error(f"❌ No property found with ID {pid}")
+        logging.info(f"✅ Wrote {len(operations)} property updates to MongoDB "
+                     f"({result.modified_count} modified)")
+        self._resolve(batch, matched)
+
+    @staticmethod
+    def _resolve(batch, matched):
+        for pid, (_, futures) in batch.items():
+            for future in futures:
+                future.set_result(pid in matched)
+
+
+def register_flush_on_exit(updater):
+    """Flush pending updates when the interpreter, or a multiprocessing worker, shuts down."""
+    atexit.register(updater.close)
+    # multiprocessing children exit through os._exit and skip atexit, but run these finalizers
+    multiprocessing.util.Finalize(updater, updater.close, exitpriority=10)
@@ -0,0 +1,136 @@
+import re
+
+import numpy as np
+
+from config import (
+    QUALITY_GATE, QUALITY_MIN_SIDE, QUALITY_MIN_SHARPNESS, QUALITY_MIN_BRIGHTNESS, QUALITY_MAX_BRIGHTNESS,
+    QUALITY_MAX_CLIPPED, QUALITY_DUPLICATE_DISTANCE, ADAPTIVE_IMGSZ, ADAPTIVE_IMGSZ_SIZES,
+)
+from metrics import quality_issues
+from stage_timing import timed_stage
+
+# Sharpness is measured at this size so the threshold does not depend on the camera
+ANALYSIS_SIDE = 512
+PHASH_PATTERN = re.compile(r"[0-9a-f]{16}")
+
+
+class ImageQualityError(Exception):
+    """Raised before inference when a wall cannot be decoded, or fails a check with QUALITY_GATE=reject."""
+
+    def __init__(self, issues):
+        self.issues = issues
+        summary = "; ".join(f"{wall}: {', '.join(reasons)}" for wall, reasons in issues.items())
+        super().__init__(f"Image quality check failed ({summary})")
+
+
+def perceptual_hash(gray):
+    """64-bit DCT hash of a grayscale image, as 16 hex digits."""
+    import cv2
+
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].ravel()
+    bits = low > np.median(low[1:])
+    return np.packbits(bits).tobytes().hex()
+
+
+def is_phash(value):
+    """Whether `value` is a hash made by perceptual_hash, safe to pass to hash_distance."""
+    return isinstance(value, str) and PHASH_PATTERN.fullmatch(value) is not None
+
+
+def hash_distance(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def choose_imgsz(shape, sizes=ADAPTIVE_IMGSZ_SIZES):
+    """Smallest inference size that covers the image's longest side, capped at the largest."""
+    if not ADAPTIVE_IMGSZ or not sizes:
+        return None
+    longest = max(shape[:2])
+    return next((size for size in sizes if size >= longest), sizes[-1])
+
+
+@timed_stage("quality")
+def assess_image(image_bgr):
+    """Sharpness, exposure and resolution of one wall; `issues` lists the checks it failed."""
+    import cv2
+
+    height, width = image_bgr.shape[:2]
+    # Every check runs on a copy at most ANALYSIS_SIDE wide; striding first keeps the
+    # conversion of full-size phone photos cheap
+    step = max(1, max(height, width) // (ANALYSIS_SIDE * 2))
+    gray = cv2.cvtColor(np.ascontiguousarray(image_bgr[::step, ::step]), cv2.COLOR_BGR2GRAY)
+    scale = ANALYSIS_SIDE / max(gray.shape)
+    small = gray
+    if scale < 1:
+        small = cv2.resize(gray, (max(1, round(gray.shape[1] * scale)), max(1, round(gray.shape[0] * scale))),
+                           interpolation=cv2.INTER_AREA)
+
+    sharpness = float(cv2.Laplacian(small, cv2.CV_32F).var())
+    histogram = np.bincount(small.ravel(), minlength=256) / small.size
+    brightness = float(histogram @ np.arange(256))
+    dark, bright = float(histogram[:16].sum()), float(histogram[240:].sum())
+
+    issues = []
+    if min(height, width) < QUALITY_MIN_SIDE:
+        issues.append(f"resolution {width}x{height} below {QUALITY_MIN_SIDE} px")
+    if sharpness < QUALITY_MIN_SHARPNESS:
+        issues.append(f"blurry (sharpness {sharpness:.1f} below {QUALITY_MIN_SHARPNESS})")
+    if brightness < QUALITY_MIN_BRIGHTNESS or dark > QUALITY_MAX_CLIPPED:
+        issues.append(f"underexposed (mean brightness {brightness:.0f}, {dark:.0%} black)")
+    elif brightness > QUALITY_MAX_BRIGHTNESS or bright > QUALITY_MAX_CLIPPED:
+        issues.append(f"overexposed (mean brightness {brightness:.0f}, {bright:.0%} white)")
+
+    return {
+        "width": width,
+        "height": height,
+        "sharpness": round(sharpness, 1),
+        "brightness": round(brightness, 1),
+        "phash": perceptual_hash(small),
+        "issues": issues,
+    }
+
+
+def find_duplicates(hashes, max_distance=QUALITY_DUPLICATE_DISTANCE):
+    """wall -> earlier wall it (nearly) duplicates, comparing walls in the given order."""
+    duplicates = {}
+    seen = []
+    for wall, phash in hashes.items():
+        match = next((other for other, other_hash in seen if hash_distance(phash, other_hash) <= max_distance), None)
+        if match is not None:
+            duplicates[wall] = match
+        else:
+            seen.append((wall, phash))
+    return duplicates
+
+
+def wall_issues(quality, duplicates):
+    """wall -> every reason to distrust it, including duplicates of another wall."""
+    issues = {wall: list(report["issues"]) for wall, report in quality.items()}
+    for wall, original in duplicates.items():
+        if wall in issues:
+            issues[wall].append(f"duplicate of {original}")
+    return {wall: reasons for wall, reasons in issues.items() if reasons}
+
+
+def reject_undecodable(errors):
+    """Raise ImageQualityError for walls whose bytes could not be decoded; wall -> error."""
+    if not errors:
+        return
+    quality_issues.inc(len(errors), check="undecodable")
+    raise ImageQualityError({wall: [f"undecodable ({error})"] for wall, error in errors.items()})
+
+
+def screen(quality, known_hashes=None, mode=QUALITY_GATE):
+    """Check freshly assessed walls against each other and the request's other walls.
+
+    Counts every problem and raises ImageQualityError in reject mode; returns wall -> issues.
+    """
+    hashes = {**(known_hashes or {}), **{wall: report["phash"] for wall, report in quality.items()}}
+    issues = wall_issues(quality, find_duplicates(hashes))
+    for reasons in issues.values():
+        for reason in reasons:
+            quality_issues.inc(check=reason.split(" ")[0])
+    if issues and mode == "reject":
+        raise ImageQualityError(issues)
+    return issues
@@ -0,0 +1,253 @@
+import base64
+import io
+import json
+import re
+from functools import lru_cache
+
+import numpy as np
+from fpdf import FPDF
+from fpdf.fpdf import FPDF_VERSION
+from PIL import Image
+
+from config import (
+    ANNOTATION_WIDTH_MM, ANNOTATION_HEIGHT_MM, ANNOTATION_DPI, REPORT_JPEG_QUALITY, REPORT_TEMPLATES_DIR,
+)
+from stage_timing import timed_stage
+
+REPORT_TITLE = "Building Health Inspection Report"
+ANALYSIS_HEADING = "AI-Based Risk Analysis"
+
+# A4 geometry in millimetres; every wall gets a label and a fixed-size image box
+PAGE_HEIGHT = 297
+MARGIN = 10
+BOTTOM_MARGIN = 15
+TITLE_HEIGHT = 10
+LABEL_HEIGHT = 10
+LINE_HEIGHT = 8
+FIRST_SLOT_Y = MARGIN + TITLE_HEIGHT + 4
+SLOT_HEIGHT = LABEL_HEIGHT + ANNOTATION_HEIGHT_MM + 5
+WALLS_PER_PAGE = max(1, int((PAGE_HEIGHT - BOTTOM_MARGIN - FIRST_SLOT_Y) // SLOT_HEIGHT))
+# The analysis starts on the last wall's page only if this much room is left
+ANALYSIS_MIN_HEIGHT = 60
+
+
+class MemoryFPDF(FPDF):
+    """FPDF that can also embed JPEGs held in memory, registered under a virtual file name.
+
+    With `creation_date` (a PDF date string, "YYYYMMDDHHMMSS") the output no longer depends
+    on the clock, so the same document and images always give the same bytes.
+    """
+
+    def __init__(self, *args, creation_date=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.image_buffers = {}
+        self.creation_date = creation_date
+
+    def _parsejpg(self, filename):
+        data = self.image_buffers.get(filename)
+        if data is None:
+            return super()._parsejpg(filename)
+        with Image.open(io.BytesIO(data)) as img:
+            width, height = img.size
+            colspace = {"RGB": "DeviceRGB", "CMYK": "DeviceCMYK"}.get(img.mode, "DeviceGray")
+        return {"w": width, "h": height, "cs": colspace, "bpc": 8, "f": "DCTDecode", "data": data}
+
+    def _putinfo(self):
+        if self.creation_date is None:
+            return super()._putinfo()
+        # FPDF 1.7 always stamps the current time; this writes the same entries with a fixed date
+        self._out("/Producer " + self._textstring("PyFPDF " + FPDF_VERSION + " http://pyfpdf.googlecode.com/"))
+        self._out("/CreationDate " + self._textstring("D:" + self.creation_date))
+
+
+def assess_severity(avg_score):
+    """(severity, recommendation) for an average wall score out of 10."""
+    if avg_score < 4:
+        return "High", "Immediate structural inspection and repair is recommended."
+    if avg_score < 7:
+        return "Medium", "Monitor the structure and consider a professional inspection."
+    return "Low", "Structure is likely healthy. No immediate action needed."
+
+
+def report_document(wall_analysis):
+    """The report as plain data, built from the per-wall analysis stored with a property.
+
+    Every output format is rendered from this; it is also the JSON output itself.
+    """
+    walls = []
+    for wall, result in wall_analysis["walls"].items():
+        quality = result.get("quality") or {}
+        issues = list(quality.get("issues", []))
+        if quality.get("duplicateOf"):
+            issues.append(f"duplicate of {quality['duplicateOf']}")
+        walls.append({
+            "wall": wall,
+            "label": f"{wall.title()} Wall",
+            "score": result["score"],
+            "crackCount": result["crackCount"],
+            "imageUrl": result.get("imageUrl"),
+            "annotatedUrl": result.get("annotatedUrl"),
+            "issues": issues,
+        })
+
+    severity, recommendation = assess_severity(wall_analysis["averageScore"])
+    return {
+        "title": REPORT_TITLE,
+        "analyzedAt": wall_analysis.get("analyzedAt"),
+        "modelVersion": wall_analysis.get("modelVersion"),
+        "averageScore": wall_analysis["averageScore"],
+        "severity": severity,
+        "recommendation": recommendation,
+        "walls": walls,
+    }
+
+
+def analysis_text(document):
+    analysis = "AI-Based Structural Crack Analysis:\n"
+    analysis += f"\nOverall Average Score (out of 10): {document['averageScore']:.1f}\n\n"
+    for wall in document["walls"]:
+        analysis += f"- {wall['label']}: {wall['score']:.1f}/10\n"
+
+    flagged = [wall for wall in document["walls"] if wall["issues"]]
+    if flagged:
+        analysis += "\nPhotos to retake (their scores may be unreliable):\n"
+        for wall in flagged:
+            analysis += f"- {wall['label']}: {'; '.join(wall['issues'])}\n"
+
+    analysis += f"\nSeverity Level: {document['severity']}\nRecommendation: {document['recommendation']}"
+    return analysis
+
+
+@lru_cache(maxsize=None)
+def page_layout(wall_count):
+    """Drawing operations for a report with `wall_count` walls, worked out once per count.
+
+    Operations name the content they draw ("title", ("label", i), ...) rather than holding
+    it, so one layout serves every report with that many walls.
+    """
+    ops = [("page",), ("font", "B", 16), ("cell", MARGIN, MARGIN, TITLE_HEIGHT, "title", "C")]
+    y = FIRST_SLOT_Y
+    for index in range(wall_count):
+        if index and index % WALLS_PER_PAGE == 0:
+            ops.append(("page",))
+            y = MARGIN
+        ops += [("font", "B", 12), ("cell", MARGIN, y, LABEL_HEIGHT, ("label", index), "L"),
+                ("image", index, MARGIN, y + LABEL_HEIGHT)]
+        y += SLOT_HEIGHT
+
+    if y + ANALYSIS_MIN_HEIGHT > PAGE_HEIGHT - BOTTOM_MARGIN:
+        ops.append(("page",))
+        y = MARGIN
+    ops += [("font", "B", 14), ("cell", MARGIN, y, LABEL_HEIGHT, "heading", "L"),
+            ("font", "", 12), ("text", MARGIN, y + LABEL_HEIGHT, "analysis")]
+    return tuple(ops)
+
+
+def fit_image(image, width_mm=ANNOTATION_WIDTH_MM, height_mm=ANNOTATION_HEIGHT_MM, dpi=ANNOTATION_DPI,
+              quality=REPORT_JPEG_QUALITY):
+    """(JPEG bytes, printed width, printed height) of a wall image fitted into its box, in mm.
+
+    Images with more pixels than the box needs at `dpi` are downscaled and re-encoded; the
+    rest, including every annotation (render_annotation sizes them to this box), are
+    embedded as they are.
+    """
+    if not isinstance(image, bytes):
+        with open(image, "rb") as f:
+            image = f.read()
+    with Image.open(io.BytesIO(image)) as img:
+        (pixel_width, pixel_height), is_jpeg = img.size, img.format == "JPEG"
+
+    mm_per_pixel = min(width_mm / pixel_width, height_mm / pixel_height)
+    printed_width, printed_height = pixel_width * mm_per_pixel, pixel_height * mm_per_pixel
+    target_width = round(printed_width / 25.4 * dpi)
+    # A little slack keeps already print-sized images from being re-encoded over rounding
+    if target_width < pixel_width * 0.9 or not is_jpeg:
+        target_width = min(target_width, pixel_width)
+        target_height = max(1, round(pixel_height * target_width / pixel_width))
+        image = _encode_fitted(image, pixel_width, (target_width, target_height), quality)
+    return image, printed_width, printed_height
+
+
+def _encode_fitted(data, pixel_width, size, quality):
+    import cv2
+
+    # Let the JPEG decoder do most of the shrinking when the image is several times too large
+    flag = cv2.IMREAD_COLOR
+    for factor, reduced in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                            (2, cv2.IMREAD_REDUCED_COLOR_2)):
+        if pixel_width // factor >= size[0]:
+            flag = reduced
+            break
+    # FPDF embeds JPEGs as stored, so EXIF rotation is ignored here as well
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flag | cv2.IMREAD_IGNORE_ORIENTATION)
+    if image is None:
+        raise ValueError("Could not decode a report image")
+    if (image.shape[1], image.shape[0]) != size:
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Could not encode a report image")
+    return encoded.tobytes()
+
+
+def _latin1(text):
+    # The core PDF fonts only cover latin-1
+    return text.encode("latin-1", errors="ignore").decode("latin-1")
+
+
+@timed_stage("pdf")
+def render_pdf(document, images):
+    """PDF bytes of `document`; `images` maps wall -> annotated JPEG bytes or image path."""
+    fitted = [fit_image(images[wall["wall"]]) for wall in document["walls"]]
+    fields = {"title": document["title"], "heading": ANALYSIS_HEADING, "analysis": _latin1(analysis_text(document))}
+    fields.update({("label", index): _latin1(wall["label"]) for index, wall in enumerate(document["walls"])})
+
+    # Stamped with the analysis time, so re-rendering an analysis reproduces its PDF exactly
+    analyzed_at = re.sub(r"\D", "", document.get("analyzedAt") or "")[:14]
+    pdf = MemoryFPDF(creation_date=analyzed_at or None)
+    pdf.set_auto_page_break(auto=True, margin=BOTTOM_MARGIN)
+    for op in page_layout(len(fitted)):
+        kind = op[0]
+        if kind == "page":
+            pdf.add_page()
+        elif kind == "font":
+            pdf.set_font("Arial", op[1], op[2])
+        elif kind == "cell":
+            _, x, y, height, field, align = op
+            pdf.set_xy(x, y)
+            pdf.cell(0, height, fields[field], align=align)
+        elif kind == "image":
+            _, index, x, y = op
+            data, width, height = fitted[index]
+            name = f"wall{index}.jpg"
+            pdf.image_buffers[name] = data
+            pdf.image(name, x, y, width, height, type="jpg")
+        elif kind == "text":
+            _, x, y, field = op
+            pdf.set_xy(x, y)
+            pdf.multi_cell(0, LINE_HEIGHT, fields[field])
+    return pdf.output(dest="S").encode("latin-1")
+
+
+@lru_cache(maxsize=None)
+def _html_template():
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+    environment = Environment(loader=FileSystemLoader(REPORT_TEMPLATES_DIR), autoescape=select_autoescape(["html"]))
+    return environment.get_template("report.html")
+
+
+def render_html(document, images=None):
+    """Standalone HTML page of `document`; walls in `images` are inlined, the others linked."""
+    sources = {}
+    for wall in document["walls"]:
+        if images and wall["wall"] in images:
+            data = fit_image(images[wall["wall"]])[0]
+            sources[wall["wall"]] = "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+        else:
+            sources[wall["wall"]] = wall["annotatedUrl"] or wall["imageUrl"]
+    return _html_template().render(report=document, sources=sources).encode("utf-8")
+
+
+def render_json(document):
+    return json.dumps(document, indent=2).encode("utf-8")
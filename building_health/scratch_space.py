@@ -0,0 +1,111 @@
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from config import SCRATCH_DIR, SCRATCH_TTL, SCRATCH_MAX_BYTES, SCRATCH_CLEANUP_INTERVAL
+from metrics import CallbackMetric, Counter
+
+scratch_evictions = Counter(
+    "building_health_scratch_evictions_total", "Job scratch directories removed, by reason.", ["reason"])
+
+
+class ScratchSpace:
+    """Per-job working directories under `root`, kept for debugging until evicted.
+
+    Finished jobs' directories are removed once untouched for `ttl` seconds, and the
+    least recently used ones go first whenever the total size exceeds `max_bytes`.
+    Directories of jobs still running are never removed.
+    """
+
+    def __init__(self, root=SCRATCH_DIR, ttl=SCRATCH_TTL, max_bytes=SCRATCH_MAX_BYTES,
+                 cleanup_interval=SCRATCH_CLEANUP_INTERVAL):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.cleanup_interval = cleanup_interval
+        self._active = set()
+        self._lock = threading.Lock()
+        self._cleanup_lock = threading.Lock()
+        self._last_cleanup = time.monotonic()
+
+    @contextmanager
+    def job(self, name):
+        """A fresh directory for one job, so concurrent jobs for the same property never collide."""
+        path = os.path.join(self.root, f"{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}-{uuid.uuid4().hex[:8]}")
+        os.makedirs(path)
+        with self._lock:
+            self._active.add(path)
+        try:
+            yield path
+        finally:
+            with self._lock:
+                self._active.discard(path)
+            # The eviction clock starts when the job finishes
+            os.utime(path)
+            self.maybe_cleanup()
+
+    def maybe_cleanup(self):
+        if time.monotonic() - self._last_cleanup >= self.cleanup_interval:
+            self.cleanup()
+
+    def cleanup(self, now=None):
+        """Remove expired directories, then the oldest until under the size cap; returns the count."""
+        if not self._cleanup_lock.acquire(blocking=False):
+            return 0  # Another thread is already cleaning up
+        try:
+            self._last_cleanup = time.monotonic()
+            now = time.time() if now is None else now
+            entries = self._entries()
+            total = sum(size for _, _, size in entries)
+            with self._lock:
+                active = set(self._active)
+
+            removed = 0
+            for path, mtime, size in sorted(entries, key=lambda entry: entry[1]):
+                if path in active:
+                    continue
+                expired = now - mtime > self.ttl
+                if not expired and total <= self.max_bytes:
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                removed += 1
+                scratch_evictions.inc(reason="ttl" if expired else "size")
+            if removed:
+                logging.info(f"🧹 Removed {removed} job scratch directories ({total / 1e6:.1f} MB left)")
+            return removed
+        finally:
+            self._cleanup_lock.release()
+
+    def usage(self):
+        """(bytes, directories) currently under the root."""
+        entries = self._entries()
+        return sum(size for _, _, size in entries), len(entries)
+
+    def _entries(self):
+        """(path, mtime, size) of every job directory."""
+        try:
+            directories = [entry for entry in os.scandir(self.root) if entry.is_dir(follow_symlinks=False)]
+        except FileNotFoundError:
+            return []
+        entries = []
+        for directory in directories:
+            try:
+                size = sum(f.stat().st_size for f in os.scandir(directory.path) if f.is_file(follow_symlinks=False))
+                entries.append((directory.path, directory.stat().st_mtime, size))
+            except FileNotFoundError:
+                continue  # Removed while we were looking
+        return entries
+
+
+scratch_space = ScratchSpace()
+
+CallbackMetric(
+    "building_health_scratch_bytes", "Bytes held in job scratch directories.", lambda: scratch_space.usage()[0])
+CallbackMetric(
+    "building_health_scratch_directories", "Job scratch directories on disk.", lambda: scratch_space.usage()[1])
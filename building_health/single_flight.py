@@ -0,0 +1,68 @@
+import hashlib
+import logging
+import threading
+
+from metrics import coalesced_requests
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; callers arriving meanwhile share its outcome."""
+
+    def __init__(self, level):
+        self.level = level
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        """(result, shared) where shared is True if this caller attached to a running call."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            coalesced_requests.inc(level=self.level)
+            logging.info(f"🔗 Attached to an identical analysis already running ({self.level} {key[:12]})")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            # Forget the key first so later requests start a fresh analysis
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+def image_set_key(images, property_id):
+    """Key for a wall -> URL (or wall -> bytes) mapping analysed for `property_id`.
+
+    Temporary ids change on every click, so they only share work by image set; real
+    property ids are part of the key because each one needs its own database update.
+    """
+    digest = hashlib.sha256()
+    for wall, value in sorted(images.items()):
+        digest.update(wall.encode("utf-8") + b"\0")
+        digest.update(hashlib.sha256(value if isinstance(value, bytes) else value.encode("utf-8")).digest())
+    if not property_id.startswith("temp_"):
+        digest.update(b"\0" + property_id.encode("utf-8"))
+    return digest.hexdigest()
@@ -0,0 +1,32 @@
+import threading
+import time
+from contextlib import contextmanager
+
+_listeners = []
+_listeners_lock = threading.Lock()
+
+
+def add_listener(listener):
+    """Register `listener(stage, seconds)` to be called whenever a pipeline stage finishes."""
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def remove_listener(listener):
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def record(stage, seconds):
+    for listener in list(_listeners):
+        listener(stage, seconds)
+
+
+@contextmanager
+def timed_stage(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test the Server-Sent Events variant of /analyze
+"""
+
+import json
+
+import pytest
+
+from app import app
+from conftest import WALLS
+from event_stream import EventStream
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def stream_analysis(walls):
+    response = app.test_client().post("/analyze/stream", json={"images": walls, "propertyId": "temp_stream"})
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    return parse_events(response.get_data(as_text=True))
+
+
+@pytest.mark.usefixtures("counting_model", "no_detection_cache")
+def test_stream_reports_each_wall_then_done(local_store, image_server, image_names):
+    """Events arrive numbered in order: per-wall progress, the report, the upload, then done"""
+    walls = {wall: f"{image_server}/{name}" for wall, name in zip(WALLS, image_names)}
+    events = stream_analysis(walls)
+
+    ids = [event_id for event_id, _, _ in events]
+    names = [name for _, name, _ in events]
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    assert names[:2] == ["queued", "started"]
+    assert names[-3:] == ["report", "uploaded", "done"]
+    assert names.count("fetched") == 4 and names.count("wall") == 4
+    position = {(name, data.get("wall")): i for i, (_, name, data) in enumerate(events)}
+    for wall in WALLS:
+        # A wall's result always follows its own download
+        assert position[("fetched", wall)] < position[("wall", wall)]
+    assert events[-1][2]["pdf_url"].endswith("_temp_stream_health_report.pdf")
+    assert set(events[-1][2]["analysis"]["walls"]) == set(WALLS)
+
+
+@pytest.mark.usefixtures("counting_model", "no_detection_cache", "local_store")
+def test_stream_ends_with_error_event(image_server):
+    """A failing pipeline ends the stream with a single error event"""
+    events = stream_analysis({wall: f"{image_server}/missing-{wall}.jpg" for wall in WALLS})
+
+    names = [name for _, name, _ in events]
+    assert names[0] == "queued" and names[-1] == "error"
+    assert "done" not in names
+
+
+def test_closed_stream_drops_late_events():
+    """Nothing is emitted after the closing event"""
+    stream = EventStream(keepalive=0.01)
+    stream.emit("started", {})
+    stream.close("done", {"pdf_url": None})
+    stream.emit("wall", {})
+    assert [name for _, name, _ in parse_events("".join(stream))] == ["started", "done"]
+
+
+def main():
+    print("🧪 Testing Streaming Analysis")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All streaming analysis tests passed!")
+
+
+if __name__ == "__main__":
+    main()
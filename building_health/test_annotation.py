@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test the downscaled crack annotation and the array-backed detection records
+"""
+
+import cv2
+import numpy as np
+
+from annotation import ANNOTATION_WIDTH, render_annotation
+from building_health_report import extract_detections
+from inference_backends import DetectionResult
+
+
+def decode(data):
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def test_render_downscales_to_print_width():
+    """Wide images shrink to the printed width, boxes follow; small images keep their size"""
+    image = np.full((1500, 3000, 3), 255, dtype=np.uint8)
+    annotated = decode(render_annotation(image, [[600, 300, 2400, 1200]], [0.9]))
+    assert annotated.shape[1] == ANNOTATION_WIDTH
+    assert annotated.shape[0] == round(1500 * ANNOTATION_WIDTH / 3000)
+
+    scale = ANNOTATION_WIDTH / 3000
+    blue, green, red = annotated[round(750 * scale), round(600 * scale)].astype(int)
+    assert red > 200 and green < 120 and blue < 120, "box edge is drawn in red"
+    assert annotated[round(750 * scale), round(1500 * scale)].min() > 240, "inside of the box is untouched"
+
+    small = np.zeros((200, 300, 3), dtype=np.uint8)
+    assert decode(render_annotation(small, [], [])).shape == (200, 300, 3)
+
+
+def test_extract_detections_keeps_crack_class_only():
+    """Only class-0 boxes are counted, drawn and returned as plain lists"""
+    image = np.zeros((400, 600, 3), dtype=np.uint8)
+    xyxy = np.array([[10, 10, 100, 100], [200, 200, 300, 300], [50, 60, 70, 80]], dtype=np.float32)
+    result = DetectionResult(image, xyxy, np.array([0.9, 0.8, 0.4], dtype=np.float32),
+                             np.array([0, 1, 0], dtype=np.float32))
+
+    record = extract_detections(result)
+    assert record["crack_count"] == 2
+    assert record["boxes"] == [[10.0, 10.0, 100.0, 100.0], [50.0, 60.0, 70.0, 80.0]]
+    assert np.allclose(record["confidences"], [0.9, 0.4])
+    assert decode(record["annotated"]).shape == (400, 600, 3)
+
+
+def main():
+    print("🧪 Testing Annotation")
+    print("=" * 30)
+    test_render_downscales_to_print_width()
+    test_extract_detections_keeps_crack_class_only()
+    print("✅ All annotation tests passed!")
+
+
+if __name__ == "__main__":
+    main()
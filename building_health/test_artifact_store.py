@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test artifact stores, upload retries and publishing of the annotated wall images
+"""
+
+import os
+import re
+
+import pytest
+
+import building_health_report as report
+from artifact_store import ArtifactStore, LocalStore, UploadError, upload_artifact
+from conftest import WALLS
+from scratch_space import ScratchSpace
+
+
+class FlakyStore(ArtifactStore):
+    def __init__(self, failures, retryable=True):
+        self.failures = failures
+        self.attempts = 0
+        self._retryable = retryable
+
+    def put(self, data, name, kind="raw", timeout=None):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError("connection reset")
+        return f"https://example.com/{name}"
+
+    def retryable(self, error):
+        return self._retryable
+
+
+class RecordingStore(ArtifactStore):
+    def __init__(self):
+        self.artifacts = {}
+
+    def put(self, data, name, kind="raw", timeout=None):
+        self.artifacts[name] = (kind, data)
+        return f"https://example.com/{name}"
+
+
+def test_local_store_urls(tmp_path):
+    """The local store writes each artifact once and links it by base URL or file path"""
+    url = LocalStore(str(tmp_path)).put(b"%PDF-1.3", "report.pdf")
+    assert url.startswith("file://") and url.endswith("_report.pdf")
+    with open(url[len("file://"):], "rb") as f:
+        assert f.read() == b"%PDF-1.3"
+
+    url = LocalStore(str(tmp_path), base_url="http://localhost:5001/artifacts/").put(b"jpeg", "wall.jpg")
+    assert url.startswith("http://localhost:5001/artifacts/") and url.endswith("_wall.jpg")
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_upload_retries():
+    """Transient errors are retried; rejected uploads and empty artifacts are not"""
+    store = FlakyStore(failures=1)
+    assert upload_artifact(store, b"data", "report.pdf", retries=1) == "https://example.com/report.pdf"
+    assert store.attempts == 2
+
+    store = FlakyStore(failures=5, retryable=False)
+    with pytest.raises(UploadError):
+        upload_artifact(store, b"data", "report.pdf", retries=3)
+    assert store.attempts == 1
+
+    with pytest.raises(UploadError):
+        upload_artifact(FlakyStore(failures=0), b"", "report.pdf")
+
+
+@pytest.mark.usefixtures("counting_model", "no_detection_cache")
+def test_report_publishes_annotated_images(local_store, image_server, image_names):
+    """The PDF and every annotated wall image end up in the store"""
+    walls = {wall: f"{image_server}/{name}" for wall, name in zip(WALLS, image_names)}
+    pdf_url, analysis = report.analyze_property_images(walls, "temp_artifacts")
+
+    assert pdf_url.endswith("_temp_artifacts_health_report.pdf")
+    for wall, result in analysis["walls"].items():
+        assert result["annotatedUrl"].endswith(f"_temp_artifacts_{wall}.jpg")
+    assert len(os.listdir(local_store.directory)) == 5
+
+
+@pytest.mark.usefixtures("counting_model", "no_detection_cache")
+def test_pdf_is_rendered_in_memory_then_uploaded(image_server, image_names, monkeypatch, tmp_path):
+    """In memory mode the finished PDF goes straight from memory to the store, no file is written"""
+    store = RecordingStore()
+    monkeypatch.setattr(report, "artifact_store", store)
+    monkeypatch.setattr(report, "REPORT_STORAGE_MODE", "memory")
+    monkeypatch.setattr(report, "scratch_space", ScratchSpace(str(tmp_path / "scratch")))
+
+    def no_files(*args, **kwargs):
+        raise AssertionError("the report must not be written to disk")
+
+    monkeypatch.setattr(report, "save_detections", no_files)
+    monkeypatch.setattr(report, "generate_pdf_report", no_files)
+
+    walls = {wall: f"{image_server}/{name}" for wall, name in zip(WALLS, image_names)}
+    pdf_url, _ = report.analyze_property_images(walls, "temp_memory")
+
+    assert pdf_url == "https://example.com/temp_memory_health_report.pdf"
+    kind, pdf = store.artifacts["temp_memory_health_report.pdf"]
+    assert kind == "raw" and pdf.startswith(b"%PDF") and pdf.rstrip().endswith(b"%%EOF")
+    assert len(re.findall(rb"/Subtype /Image", pdf)) == len(WALLS)
+    assert not os.path.exists(tmp_path / "scratch")
+
+
+def main():
+    print("🧪 Testing Artifact Store")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All artifact store tests passed!")
+
+
+if __name__ == "__main__":
+    main()
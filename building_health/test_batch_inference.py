@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test that batched detection returns the same per-wall results as the one-image path
+"""
+
+import os
+
+import pytest
+
+import building_health_report as report
+from conftest import TEST_IMAGES_DIR, WALLS, CountingModel
+from config import DEFAULT_MODEL_NAME
+from scratch_space import ScratchSpace
+
+
+class BatchCountingModel(CountingModel):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def __call__(self, source, **kwargs):
+        self.batches.append(len(source) if isinstance(source, list) else 1)
+        return super().__call__(source, **kwargs)
+
+
+@pytest.fixture
+def model(isolated_registry, monkeypatch, tmp_path):
+    monkeypatch.setattr(report, "scratch_space", ScratchSpace(str(tmp_path), cleanup_interval=3600))
+    model = BatchCountingModel()
+    isolated_registry.set_model(DEFAULT_MODEL_NAME, model)
+    return model
+
+
+def test_batch_returns_a_tuple_per_wall(model, image_names):
+    """Walls come back as (path, crack_count, confidences), in as few forward passes as the batch size allows"""
+    paths = {wall: os.path.join(TEST_IMAGES_DIR, name) for wall, name in zip(WALLS, image_names)}
+    singles = {wall: report.detect_cracks(path, tiled=False) for wall, path in paths.items()}
+    model.batches.clear()
+
+    arrays = {**paths, "rightWall": report.load_image_array(paths["rightWall"])}
+    batched = report.detect_cracks_batch(arrays, batch_size=3, image_names={"rightWall": "right.jpg"},
+                                         micro_batch=False)
+
+    assert list(batched) == WALLS
+    assert sum(model.batches) == 4 and max(model.batches) == 3
+    for wall, (path, crack_count, confidences) in batched.items():
+        assert os.path.isfile(path) and path.endswith(".jpg")
+        assert (crack_count, confidences) == singles[wall][1:]
+    assert os.path.basename(batched["rightWall"][0]) == "rightWall_right.jpg"
+
+
+def main():
+    print("🧪 Testing Batched Detection")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All batched detection tests passed!")
+
+
+if __name__ == "__main__":
+    main()
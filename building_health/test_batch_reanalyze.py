@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test manifest streaming, checkpoint/resume and failed report writes of the batch re-analysis CLI
+"""
+
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+import building_health_report as report
+from batch_reanalyze import Progress, analyze_property, load_checkpoint, read_manifest, run_batch
+
+IMAGES = {"frontWall": "f.jpg", "backWall": "b.jpg", "leftWall": "l.jpg", "rightWall": "r.jpg"}
+
+
+def fake_analysis(property_id, images):
+    ok = not property_id.endswith("bad")
+    return {
+        "propertyId": property_id,
+        "status": "done" if ok else "failed",
+        "pdf_url": f"https://example.com/{property_id}.pdf" if ok else None,
+        "error": None if ok else "Cloudinary upload failed.",
+        "walls": len(images),
+        "seconds": 0.0,
+    }
+
+
+def test_manifest_skips_broken_lines():
+    """Blank and malformed lines are skipped instead of aborting the run"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "manifest.jsonl")
+        with open(path, "w") as f:
+            f.write(json.dumps({"propertyId": "p1", "images": IMAGES}) + "\n\n{broken\n")
+            f.write(json.dumps({"images": IMAGES}) + "\n")
+            f.write(json.dumps({"propertyId": 2, "images": IMAGES}) + "\n")
+        assert [pid for pid, _ in read_manifest(path)] == ["p1", "2"]
+
+
+def test_resume_skips_finished_properties():
+    """A second run only analyses what the first one did not finish (and failures on request)"""
+    items = [(f"p{i}", IMAGES) for i in range(5)] + [("p-bad", IMAGES)]
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, "checkpoint.jsonl")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = run_batch(items[:3], checkpoint, executor, task=fake_analysis)
+            assert (first.done, first.failed, first.skipped) == (3, 0, 0)
+
+            second = run_batch(items, checkpoint, executor, task=fake_analysis, progress=Progress())
+            assert (second.done, second.failed, second.skipped) == (2, 1, 3)
+            assert second.walls == 12
+
+            retry = run_batch(items, checkpoint, executor, task=fake_analysis, retry_failed=True)
+            assert (retry.done, retry.failed, retry.skipped) == (0, 1, 5)
+
+            # A run killed halfway through writing an entry
+            with open(checkpoint, "a") as f:
+                f.write('{"propertyId": "p9", "sta')
+            run_batch([("p9", IMAGES)], checkpoint, executor, task=fake_analysis)
+
+        assert load_checkpoint(checkpoint) == {f"p{i}" for i in range(5)} | {"p-bad", "p9"}
+
+
+def test_property_fails_when_its_report_is_not_stored(monkeypatch):
+    """With synchronous writes a report that never reaches MongoDB marks the property failed"""
+    collection = mongomock.MongoClient().aasrasewa.properties
+    stored = str(collection.insert_one({"title": "Stored"}).inserted_id)
+    monkeypatch.setattr(report, "properties_collection", collection)
+    monkeypatch.setattr(report, "MONGO_WRITE_BEHIND", False)
+
+    def publish(images, property_id):
+        report.store_property_report(property_id, f"https://example.com/{property_id}.pdf", 8.5)
+        return f"https://example.com/{property_id}.pdf"
+
+    monkeypatch.setattr(report, "generate_building_health_report", publish)
+    assert analyze_property(stored, IMAGES)["status"] == "done"
+    # Storing the same report again changes nothing but still succeeds
+    assert analyze_property(stored, IMAGES)["status"] == "done"
+
+    entry = analyze_property(str(ObjectId()), IMAGES)
+    assert entry["status"] == "failed" and "Could not store the report" in entry["error"]
+
+
+def main():
+    print("🧪 Testing Batch Re-analysis")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All batch re-analysis tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed detection cache (memory LRU + on-disk tier) and its use by the pipeline
+"""
+
+import os
+import tempfile
+import time
+
+import pytest
+
+import building_health_report as report
+from conftest import WALLS
+from detection_cache import DetectionCache, make_key
+
+
+def sample_record(crack_count=2):
+    return {
+        "crack_count": crack_count,
+        "confidences": [0.91, 0.42][:crack_count],
+        "boxes": [[1.0, 2.0, 30.0, 40.0], [5.0, 6.0, 70.0, 80.0]][:crack_count],
+        "annotated": bytes(range(256)) * 8,
+    }
+
+
+def test_key_depends_on_content_and_model():
+    """Same bytes + same model share a key; changing either changes it"""
+    assert make_key(b"wall", "default:abc") == make_key(b"wall", "default:abc")
+    assert make_key(b"wall", "default:abc") != make_key(b"wall", "default:def")
+    assert make_key(b"wall", "default:abc") != make_key(b"wall2", "default:abc")
+
+
+def test_memory_then_disk_hits():
+    """Entries survive in memory and, for a fresh process, on disk byte for byte"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DetectionCache(directory=directory, memory_entries=4)
+        key = make_key(b"front wall", "v1")
+        assert cache.get(key) is None
+        cache.put(key, sample_record())
+        assert cache.get(key) == sample_record()
+
+        restarted = DetectionCache(directory=directory, memory_entries=4)
+        assert restarted.get(key) == sample_record()
+        assert restarted.get(key) == sample_record()
+
+        assert cache.stats()["misses"] == 1 and cache.stats()["memory_hits"] == 1
+        assert restarted.stats()["disk_hits"] == 1 and restarted.stats()["memory_hits"] == 1
+
+
+def test_keys_that_are_not_digests_never_match():
+    """Paths and other strings are misses, even when such a file exists outside the cache"""
+    with tempfile.TemporaryDirectory() as root:
+        directory = os.path.join(root, "cache")
+        with open(os.path.join(root, "outside.json"), "w") as f:
+            f.write('{"crack_count": 0}')
+        with open(os.path.join(root, "outside.jpg"), "wb") as f:
+            f.write(b"jpeg")
+        cache = DetectionCache(directory=directory)
+        for key in ("../outside", os.path.join(root, "outside"), make_key(b"x", "v1").upper(), None):
+            assert cache.get(key) is None
+
+
+def test_memory_tier_is_lru_bounded():
+    """The memory tier keeps only the most recently used entries"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DetectionCache(directory=directory, memory_entries=2)
+        keys = [make_key(bytes([i]), "v1") for i in range(3)]
+        for key in keys:
+            cache.put(key, sample_record())
+        assert cache.stats()["memory_entries"] == 2
+        cache.get(keys[0])
+        assert cache.stats()["disk_hits"] == 1
+
+
+def test_ttl_expiry():
+    """Expired entries are misses in both tiers"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DetectionCache(directory=directory, ttl=0.05)
+        key = make_key(b"back wall", "v1")
+        cache.put(key, sample_record())
+        time.sleep(0.1)
+        assert cache.get(key) is None
+
+
+def test_disk_size_eviction():
+    """The disk tier drops least recently used entries to stay under max_bytes"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DetectionCache(directory=directory, memory_entries=1, max_bytes=3 * 2400)
+        keys = [make_key(bytes([i]), "v1") for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.put(key, sample_record())
+            stamp = time.time() - 100 + i
+            os.utime(os.path.join(directory, key + ".json"), (stamp, stamp))
+            os.utime(os.path.join(directory, key + ".jpg"), (stamp, stamp))
+        cache.put(make_key(b"last", "v1"), sample_record())
+
+        total = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        assert total <= 3 * 2400
+        assert not os.path.exists(os.path.join(directory, keys[0] + ".json"))
+        assert os.path.exists(os.path.join(directory, keys[2] + ".json"))
+
+
+def test_disk_scans_are_throttled(tmp_path, monkeypatch):
+    """Puts only rescan the directory once the interval passes or the limit may be exceeded"""
+    cache = DetectionCache(directory=str(tmp_path), max_bytes=10 * 2400, evict_interval=3600)
+    scans = []
+    evict = cache._evict_disk
+    monkeypatch.setattr(cache, "_evict_disk", lambda now: scans.append(now) or evict(now))
+
+    for i in range(4):
+        cache.put(make_key(bytes([i]), "v1"), sample_record())
+    assert len(scans) == 1, "only the first put scans, to learn the size on disk"
+
+    for i in range(4, 12):
+        cache.put(make_key(bytes([i]), "v1"), sample_record())
+    assert len(scans) >= 2
+    total = sum(os.path.getsize(os.path.join(str(tmp_path), name)) for name in os.listdir(str(tmp_path)))
+    assert total <= 10 * 2400
+
+
+def read_artifact(url):
+    with open(url[len("file://"):], "rb") as f:
+        return f.read()
+
+
+def test_cache_hit_skips_inference(counting_model, local_store, image_server, image_names, monkeypatch, tmp_path):
+    """Analysing the same photos again is served from the cache with a byte-identical report"""
+    monkeypatch.setattr(report, "detection_cache", DetectionCache(directory=str(tmp_path / "cache")))
+    # analyzedAt is also the PDF's creation date, so a frozen clock makes the PDFs comparable
+    frozen = time.gmtime(1_700_000_000)
+    monkeypatch.setattr(report.time, "gmtime", lambda *args: frozen)
+    walls = {wall: f"{image_server}/{name}" for wall, name in zip(WALLS, image_names)}
+    first_pdf, first = report.analyze_property_images(walls, "temp_cached")
+    second_pdf, second = report.analyze_property_images(walls, "temp_cached")
+
+    assert counting_model.images == 4
+    assert report.detection_cache.stats()["memory_hits"] == 4
+    assert read_artifact(second_pdf) == read_artifact(first_pdf)
+    assert b"/CreationDate (D:20231114221320)" in read_artifact(first_pdf)
+    # Every upload gets a fresh name, so compare what the annotated URLs point at
+    for wall in WALLS:
+        first_url, second_url = first["walls"][wall].pop("annotatedUrl"), second["walls"][wall].pop("annotatedUrl")
+        assert read_artifact(second_url) == read_artifact(first_url)
+    assert second == first
+
+
+def main():
+    print("🧪 Testing Detection Cache")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All detection cache tests passed!")
+
+
+if __name__ == "__main__":
+    main()
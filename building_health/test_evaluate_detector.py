@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test label parsing and the vectorized matching / AP math behind the detector settings sweep
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from evaluate_detector import average_precision, load_split, match_predictions, parse_label_file
+
+
+def test_parse_box_and_polygon_labels():
+    """Box rows and polygon rows both become absolute xyxy boxes"""
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write("0 0.5 0.5 0.2 0.4\n")
+        f.write("0 0.1 0.1 0.3 0.1 0.3 0.2 0.1 0.2\n")
+    try:
+        boxes = parse_label_file(f.name, width=100, height=200)
+    finally:
+        os.remove(f.name)
+    assert np.allclose(boxes, [[40, 60, 60, 140], [10, 20, 30, 40]])
+
+
+def test_bundled_labels_load():
+    """Every bundled validation image comes with its labels"""
+    samples = load_split("valid")
+    assert samples
+    assert all(image.ndim == 3 and gt.shape[1] == 4 for image, gt in samples)
+    assert sum(len(gt) for _, gt in samples) > 0
+
+
+def test_each_label_is_matched_once():
+    """A duplicate prediction of the same crack counts as a false positive"""
+    gt = np.array([[0, 0, 10, 10], [50, 50, 60, 60]], dtype=np.float32)
+    preds = np.array([[0, 0, 10, 10], [0, 0, 10, 9], [100, 100, 110, 110]], dtype=np.float32)
+    tp = match_predictions(preds, gt)
+    assert tp[:, 0].tolist() == [True, False, False]
+    assert tp[0].all()
+
+
+def test_average_precision():
+    """Perfect detections give AP 1; misses and false positives lower it"""
+    perfect = average_precision(np.ones((2, 1), dtype=bool), np.array([0.9, 0.8]), num_labels=2)
+    assert np.allclose(perfect, 1.0)
+
+    half_recall = average_precision(np.array([[True], [False]]), np.array([0.9, 0.8]), num_labels=2)
+    assert np.allclose(half_recall, 0.5)
+
+    fp_first = average_precision(np.array([[False], [True]]), np.array([0.9, 0.8]), num_labels=1)
+    assert np.allclose(fp_first, 0.5)
+
+
+def main():
+    print("🧪 Testing Detector Evaluation Math")
+    print("=" * 30)
+    test_parse_box_and_polygon_labels()
+    test_bundled_labels_load()
+    test_each_label_is_matched_once()
+    test_average_precision()
+    print("✅ All evaluation tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test that per-process values and background threads are rebuilt in a forked child
+"""
+
+import os
+import threading
+
+import pytest
+
+from fork_safety import PerProcess, daemon_thread
+
+
+def test_value_is_built_once_per_process():
+    """The parent reuses its value; a forked child builds its own"""
+    built = []
+    value = PerProcess(lambda: built.append(os.getpid()) or object())
+    assert value.current() is None
+    first = value.get()
+    assert value.get() is first and value.current() is first and built == [os.getpid()]
+
+    pid = os.fork()
+    if pid == 0:
+        # The child must not see the parent's value, then builds exactly one of its own
+        ok = value.current() is None and value.get() is not first and value.get() is value.get()
+        os._exit(0 if ok and built[-1] == os.getpid() else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert built == [os.getpid()]
+
+
+def test_daemon_thread_starts_on_first_use():
+    """The thread only starts when first needed, and only once"""
+    release = threading.Event()
+    thread = daemon_thread(release.wait, "waiter")
+    assert thread.current() is None
+    started = thread.get()
+    assert started.daemon and started.is_alive() and thread.get() is started
+    release.set()
+    started.join(1)
+
+
+def main():
+    print("🧪 Testing Fork Safety")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All fork safety tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the concurrent image fetch stage against a local HTTP server serving Dummy-Retakan-1/test/images
+"""
+
+import os
+
+import pytest
+import requests
+from PIL import Image
+
+from conftest import TEST_IMAGES_DIR, QuietHandler
+from image_fetch import ImageFetchError, fetch_image_bytes, fetch_images
+
+
+class FlakyHandler(QuietHandler):
+    """Answers 503 for the first `failures` requests, then serves files normally."""
+
+    failures = 0
+
+    def do_GET(self):
+        if FlakyHandler.failures > 0:
+            FlakyHandler.failures -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        super().do_GET()
+
+
+def test_fetch_all_walls_concurrently(image_server, image_names):
+    """All walls come back decoded, keyed by wall, matching the source dimensions"""
+    names = image_names[:6]
+    images = fetch_images({f"wall{i}": f"{image_server}/{name}" for i, name in enumerate(names)})
+
+    assert list(images) == [f"wall{i}" for i in range(len(names))]
+    for i, name in enumerate(names):
+        with Image.open(os.path.join(TEST_IMAGES_DIR, name)) as img:
+            width, height = img.size
+        assert images[f"wall{i}"].shape == (height, width, 3)
+        assert images[f"wall{i}"].flags["C_CONTIGUOUS"]
+
+
+def test_fetch_raw_bytes(image_server, image_names):
+    """decode=False hands back the exact served bytes"""
+    name = image_names[0]
+    images = fetch_images({"front": f"{image_server}/{name}"}, decode=False)
+
+    with open(os.path.join(TEST_IMAGES_DIR, name), "rb") as f:
+        assert images["front"] == f.read()
+
+
+def test_max_bytes_limit(image_server, image_names):
+    """Images over the byte limit are rejected instead of being read into memory"""
+    with pytest.raises(ImageFetchError):
+        fetch_image_bytes(f"{image_server}/{image_names[0]}", max_bytes=1024, retries=0)
+
+
+def test_missing_image_fails_without_retry(image_server):
+    """A 404 fails fast rather than burning retries"""
+    with pytest.raises(ImageFetchError, match="404"):
+        fetch_image_bytes(f"{image_server}/missing.jpg", retries=3)
+
+
+def test_transient_errors_are_retried(serve_images, image_names, monkeypatch):
+    """Server errors are retried up to the configured bound"""
+    name = image_names[0]
+    monkeypatch.setattr(FlakyHandler, "failures", 2)
+    with serve_images(handler=FlakyHandler) as base_url:
+        data = fetch_image_bytes(f"{base_url}/{name}", session=requests.Session(), retries=2)
+    assert len(data) == os.path.getsize(os.path.join(TEST_IMAGES_DIR, name))
+
+    monkeypatch.setattr(FlakyHandler, "failures", 3)
+    with serve_images(handler=FlakyHandler) as base_url, pytest.raises(ImageFetchError):
+        fetch_image_bytes(f"{base_url}/{name}", session=requests.Session(), retries=2)
+
+
+def main():
+    print("🧪 Testing Image Fetch Stage")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All image fetch tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test that an incremental analysis only re-runs the walls whose image changed
+"""
+
+import copy
+
+import pytest
+
+import building_health_report as report
+from app import previous_analysis_for
+from conftest import WALLS
+from detection_cache import DetectionCache
+
+
+def run_incremental(model, image_server, image_names):
+    walls = {wall: f"{image_server}/{name}" for wall, name in zip(WALLS, image_names)}
+    pdf_url, first = report.analyze_property_images(walls, "temp_incremental")
+    assert pdf_url.endswith("_temp_incremental_health_report.pdf")
+    assert model.images == 4
+    assert set(first["walls"]) == set(walls)
+
+    edited = {**walls, "leftWall": f"{image_server}/{image_names[4]}"}
+    pdf_url, second = report.analyze_property_images(edited, "temp_incremental", previous_analysis=first)
+    assert pdf_url.endswith("_temp_incremental_health_report.pdf")
+    assert second["walls"]["leftWall"]["imageUrl"] == edited["leftWall"]
+    return first, second
+
+
+def test_incremental_reuses_cached_walls(counting_model, local_store, image_server, image_names, monkeypatch,
+                                         tmp_path):
+    """Unchanged walls come straight from the detection cache"""
+    monkeypatch.setattr(report, "detection_cache", DetectionCache(directory=str(tmp_path / "cache")))
+    first, second = run_incremental(counting_model, image_server, image_names)
+
+    assert counting_model.images == 5, "only the replaced wall goes through the detector"
+    # The annotated image is published again from the cached record, under a new name
+    assert second["walls"]["frontWall"].pop("annotatedUrl") != first["walls"]["frontWall"].pop("annotatedUrl")
+    assert second["walls"]["frontWall"] == first["walls"]["frontWall"]
+    assert second["averageScore"] == first["averageScore"]
+
+
+def test_stored_results_are_rebuilt_from_the_cache(counting_model, local_store, image_server, image_names,
+                                                   monkeypatch, tmp_path):
+    """A tampered stored analysis only contributes its detection keys; nothing else is copied"""
+    monkeypatch.setattr(report, "detection_cache", DetectionCache(directory=str(tmp_path / "cache")))
+    walls = {wall: f"{image_server}/{name}" for wall, name in zip(WALLS, image_names)}
+    _, first = report.analyze_property_images(walls, "temp_tampered")
+
+    tampered = copy.deepcopy(first)
+    for result in tampered["walls"].values():
+        result.update(annotatedUrl="https://evil.example/wall.jpg", crackCount=0, score=10,
+                      quality={"phash": "not-a-hash", "issues": []})
+    _, second = report.analyze_property_images(walls, "temp_tampered", previous_analysis=tampered)
+
+    assert counting_model.images == 4
+    for wall, result in second["walls"].items():
+        assert result["annotatedUrl"] != "https://evil.example/wall.jpg"
+        assert result["crackCount"] == 1 and result["quality"] == first["walls"][wall]["quality"]
+    assert report.quality_hashes(tampered["walls"]) == {}
+
+
+def test_incremental_reruns_walls_missing_from_the_cache(counting_model, local_store, no_detection_cache,
+                                                         image_server, image_names):
+    """Without their cached detection, unchanged walls go through the detector again"""
+    first, second = run_incremental(counting_model, image_server, image_names)
+
+    assert counting_model.images == 8
+    assert second["walls"]["frontWall"]["boxes"] == first["walls"]["frontWall"]["boxes"]
+
+
+def test_new_record_format_invalidates_cached_walls(counting_model, local_store, image_server, image_names,
+                                                   monkeypatch, tmp_path):
+    """Records cached under an older record version or annotation size are not reused"""
+    monkeypatch.setattr(report, "detection_cache", DetectionCache(directory=str(tmp_path / "cache")))
+    walls = {wall: f"{image_server}/{name}" for wall, name in zip(WALLS, image_names)}
+    record_version = report.RECORD_VERSION
+    monkeypatch.setattr(report, "RECORD_VERSION", record_version - 1)
+    _, first = report.analyze_property_images(walls, "temp_versioned")
+    monkeypatch.setattr(report, "RECORD_VERSION", record_version)
+    _, second = report.analyze_property_images(walls, "temp_versioned", previous_analysis=first)
+    assert counting_model.images == 8
+
+    monkeypatch.setattr(report, "ANNOTATION_SETTINGS", "1x1:q1")
+    _, third = report.analyze_property_images(walls, "temp_versioned", previous_analysis=second)
+    assert counting_model.images == 12
+    keys = [{result["detectionKey"] for result in analysis["walls"].values()} for analysis in (first, second, third)]
+    assert len(set().union(*keys)) == 12
+
+
+def test_client_results_are_never_reused(counting_model, local_store, image_server, image_names, monkeypatch,
+                                         tmp_path):
+    """Forged results are ignored: previous analyses come from the server, keys must be cached digests"""
+    assert previous_analysis_for({"previousAnalysis": {"walls": {}}}, "64b7f0c2e1a9d3f4a5b6c7d8") is None
+    assert previous_analysis_for({"previousAnalysis": {"walls": {}}, "incremental": True}, "temp_1") is None
+
+    monkeypatch.setattr(report, "detection_cache", DetectionCache(directory=str(tmp_path / "cache")))
+    walls = {wall: f"{image_server}/{name}" for wall, name in zip(WALLS, image_names)}
+    forged = {"modelVersion": report.detector_version(), "walls": {
+        wall: {"imageUrl": url, "crackCount": 0, "confidences": [], "boxes": [], "score": 10,
+               "detectionKey": "../../etc/passwd"} for wall, url in walls.items()}}
+    _, analysis = report.analyze_property_images(walls, "temp_forged", previous_analysis=forged)
+
+    assert counting_model.images == 4
+    assert all(result["crackCount"] == 1 for result in analysis["walls"].values())
+
+
+def main():
+    print("🧪 Testing Incremental Re-analysis")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All incremental analysis tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test the pre/post-processing shared by the exported (ONNX / OpenVINO) inference backends
+"""
+
+import numpy as np
+
+from inference_backends import ExportedBackend, letterbox, postprocess
+
+
+class EchoRuntime(ExportedBackend):
+    """Exported backend whose "network" reports one crack at a fixed letterboxed position."""
+
+    def run(self, batch):
+        assert batch.dtype == np.float32 and batch.shape[1:] == (3, self.imgsz, self.imgsz)
+        prediction = np.zeros((len(batch), 6, 3), dtype=np.float32)
+        # cx, cy, w, h, crack score, other-class score for three anchors
+        prediction[:, :, 0] = [320, 320, 64, 32, 0.9, 0.0]
+        prediction[:, :, 1] = [322, 321, 64, 32, 0.6, 0.0]
+        prediction[:, :, 2] = [100, 100, 10, 10, 0.1, 0.05]
+        return prediction
+
+
+def test_letterbox_keeps_aspect_ratio():
+    """Wide images are scaled to fit and padded top and bottom with grey"""
+    image = np.full((500, 1000, 3), 200, dtype=np.uint8)
+    canvas, ratio, (left, top) = letterbox(image, 640)
+    assert canvas.shape == (640, 640, 3)
+    assert ratio == 0.64 and left == 0 and top == 160
+    assert (canvas[:top] == 114).all()
+    assert (canvas[top:top + 320] == 200).all()
+
+
+def test_postprocess_maps_boxes_back_to_the_image():
+    """Low scores are dropped, duplicates suppressed and boxes undo the letterbox"""
+    image = np.zeros((500, 1000, 3), dtype=np.uint8)
+    results = EchoRuntime(imgsz=640)([image, image])
+    assert len(results) == 2
+
+    boxes = results[0].boxes
+    assert boxes.conf.tolist() == [np.float32(0.9)]
+    assert boxes.cls.tolist() == [0.0]
+    # (288, 304)-(352, 336) in the letterbox → subtract the 160px pad and divide by 0.64
+    assert np.allclose(boxes.xyxy, [[450, 225, 550, 275]])
+    plotted = results[0].plot()
+    assert plotted.shape == (500, 1000, 3)
+    assert plotted[250, 450].tolist() == [56, 56, 255], "plot() is BGR like ultralytics"
+
+
+def test_postprocess_clips_and_caps_detections():
+    """Boxes are clipped to the image and no more than max_det are kept"""
+    prediction = np.array([[10, 600], [10, 600], [40, 100], [40, 100], [0.9, 0.8]], dtype=np.float32)
+    boxes, scores, classes = postprocess(prediction, 1.0, (0, 0), (620, 620), max_det=1)
+    assert np.allclose(boxes, [[0, 0, 30, 30]])
+    assert scores.tolist() == [np.float32(0.9)]
+
+
+def main():
+    print("🧪 Testing Inference Backend Processing")
+    print("=" * 30)
+    test_letterbox_keeps_aspect_ratio()
+    test_postprocess_maps_boxes_back_to_the_image()
+    test_postprocess_clips_and_caps_detections()
+    print("✅ All inference backend tests passed!")
+
+
+if __name__ == "__main__":
+    main()
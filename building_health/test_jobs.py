@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test the bounded analysis job queue used by the asynchronous /analyze mode
+"""
+
+import threading
+import time
+
+from jobs import JobQueue, QueueFullError
+
+
+def test_job_result_is_recorded():
+    """A queued job runs on a worker and exposes its result"""
+    jobs = JobQueue(workers=1, max_queued=4)
+    job = jobs.submit(lambda a, b: {"pdf_url": f"{a}/{b}"}, "https://example.com", "report.pdf")
+
+    assert job.wait(timeout=5)
+    status = jobs.get(job.id).to_dict()
+    assert status["status"] == "done"
+    assert status["result"] == {"pdf_url": "https://example.com/report.pdf"}
+    jobs.shutdown()
+
+
+def test_job_failure_is_recorded():
+    """Exceptions mark the job failed instead of killing the worker"""
+    jobs = JobQueue(workers=1, max_queued=4)
+
+    def boom():
+        raise RuntimeError("Cloudinary upload failed.")
+
+    failed = jobs.submit(boom)
+    ok = jobs.submit(lambda: "still alive")
+    assert failed.wait(timeout=5) and ok.wait(timeout=5)
+    assert failed.status == "failed" and failed.error == "Cloudinary upload failed."
+    assert ok.result == "still alive"
+    jobs.shutdown()
+
+
+def test_full_queue_rejects_immediately():
+    """Once workers are busy and the queue is full, submit raises instead of blocking"""
+    release = threading.Event()
+    jobs = JobQueue(workers=1, max_queued=2)
+    running = jobs.submit(release.wait)
+    while running.status != "running":
+        time.sleep(0.01)
+
+    queued = [jobs.submit(lambda: None) for _ in range(2)]
+    start = time.perf_counter()
+    try:
+        jobs.submit(lambda: None)
+        raise AssertionError("Full queue accepted a job")
+    except QueueFullError:
+        assert time.perf_counter() - start < 0.5
+
+    release.set()
+    assert all(job.wait(timeout=5) for job in queued)
+    jobs.shutdown()
+
+
+def test_finished_jobs_expire():
+    """Finished jobs are pruned after the result TTL"""
+    jobs = JobQueue(workers=1, max_queued=4, result_ttl=0)
+    job = jobs.submit(lambda: None)
+    assert job.wait(timeout=5)
+    time.sleep(0.01)
+    jobs.submit(lambda: None)
+    assert jobs.get(job.id) is None
+    jobs.shutdown()
+
+
+def main():
+    print("🧪 Testing Analysis Job Queue")
+    print("=" * 30)
+    test_job_result_is_recorded()
+    test_job_failure_is_recorded()
+    test_full_queue_rejects_immediately()
+    test_finished_jobs_expire()
+    print("✅ All job queue tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test the Prometheus-text metrics registry, stage timing spans and slow-request profiling
+"""
+
+import os
+import tempfile
+
+import metrics
+from profiling import profile_if_slow
+from stage_timing import timed_stage
+
+
+def test_counter_and_gauge_render():
+    """Counters and gauges render one sample per label set"""
+    counter = metrics.Counter("test_uploads_total", "Uploads by outcome.", ["status"])
+    counter.inc(status="ok")
+    counter.inc(2, status="ok")
+    counter.inc(status="failed")
+    gauge = metrics.Gauge("test_in_flight", "Requests in flight.")
+    with gauge.track_in_progress():
+        assert gauge.value() == 1
+    assert gauge.value() == 0
+
+    text = metrics.render()
+    assert "# TYPE test_uploads_total counter" in text
+    assert 'test_uploads_total{status="ok"} 3.0' in text
+    assert 'test_uploads_total{status="failed"} 1.0' in text
+    assert "test_in_flight 0.0" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    """Histogram buckets count every observation at or below their bound"""
+    histogram = metrics.Histogram("test_latency_seconds", "Latency.", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value)
+
+    text = histogram.render()
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "test_latency_seconds_sum 5.55" in text
+    assert "test_latency_seconds_count 3" in text
+
+
+def test_stage_spans_feed_the_stage_histogram():
+    """Every timed pipeline stage lands in building_health_stage_duration_seconds"""
+    with timed_stage("test_stage"):
+        pass
+    assert 'building_health_stage_duration_seconds_count{stage="test_stage"} 1' in metrics.render()
+
+
+def test_callback_metric_reads_at_scrape_time():
+    """Callback metrics report the current value of their source"""
+    depth = [3]
+    metrics.CallbackMetric("test_queue_depth", "Queue depth.", lambda: depth[0])
+    assert "test_queue_depth 3.0" in metrics.render()
+    depth[0] = 0
+    assert "test_queue_depth 0.0" in metrics.render()
+
+
+def test_profile_kept_only_for_slow_requests():
+    """A cProfile dump is written only when the block exceeds the threshold"""
+    with tempfile.TemporaryDirectory() as directory:
+        with profile_if_slow("fast", threshold=60, directory=directory):
+            sum(range(1000))
+        assert os.listdir(directory) == []
+
+        with profile_if_slow("slow/request", threshold=0, directory=directory):
+            sum(range(1000))
+        dumps = os.listdir(directory)
+        assert len(dumps) == 1 and dumps[0].startswith("slow_request_") and dumps[0].endswith(".prof")
+
+
+def main():
+    print("🧪 Testing Metrics and Profiling")
+    print("=" * 30)
+    test_counter_and_gauge_render()
+    test_histogram_buckets_are_cumulative()
+    test_stage_spans_feed_the_stage_histogram()
+    test_callback_metric_reads_at_scrape_time()
+    test_profile_kept_only_for_slow_requests()
+    print("✅ All metrics tests passed!")
+
+
+if __name__ == "__main__":
+    main()
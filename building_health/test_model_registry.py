@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test that the model registry loads each model once and serializes predictions across threads
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import inference_backends
+from model_registry import ModelRegistry
+
+
+class SlowModel:
+    """Records how many calls overlap, to catch predictions that are not serialized."""
+
+    def __init__(self, path):
+        self.path = path
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+
+    def __call__(self, source, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        self.calls += 1
+        self.active -= 1
+        return [kwargs]
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Paths passed to create_backend, which takes a while as a real model load does."""
+    loaded = []
+
+    def create_backend(path, backend):
+        time.sleep(0.05)
+        loaded.append(path)
+        return SlowModel(path)
+
+    monkeypatch.setattr(inference_backends, "create_backend", create_backend)
+    return loaded
+
+
+def test_each_model_loads_once(loads):
+    """Threads racing for the same model share one load; other names load separately"""
+    registry = ModelRegistry(model_paths={"walls": "walls.pt", "roofs": "roofs.pt"}, default_name="walls")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        models = list(pool.map(lambda _: registry.get(), range(16)))
+
+    assert loads == ["walls.pt"]
+    assert all(model is models[0] for model in models)
+    assert registry.get("roofs").path == "roofs.pt" and registry.get("roofs") is registry.get("roofs")
+    assert loads == ["walls.pt", "roofs.pt"]
+    with pytest.raises(KeyError):
+        registry.get("unknown")
+
+
+def test_predictions_are_serialized_per_model(loads):
+    """Concurrent predictions never overlap on one model and get the shared options"""
+    registry = ModelRegistry(model_paths={"walls": "walls.pt"}, default_name="walls", predict_options={"conf": 0.3})
+    threads = [threading.Thread(target=registry.predict, args=(None,), kwargs={"imgsz": 640}) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    model = registry.get()
+    assert model.calls == 8 and model.max_active == 1
+    assert registry.predict(None, imgsz=320) == [{"conf": 0.3, "imgsz": 320}]
+
+
+def main():
+    print("🧪 Testing Model Registry")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All model registry tests passed!")
+
+
+if __name__ == "__main__":
+    main()
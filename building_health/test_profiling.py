@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test that slow-request profiling captures inference and never overlaps with another profile
+"""
+
+import glob
+import os
+import pstats
+import threading
+
+import numpy as np
+import pytest
+
+import building_health_report as report
+from profiling import is_profiling, profile_if_slow
+
+
+def test_profile_captures_inference(counting_model, monkeypatch, tmp_path):
+    """Inference of a profiled request runs in its own thread and shows up in the dump"""
+    def no_scheduler(*args, **kwargs):
+        raise AssertionError("a profiled request must not hand inference to the scheduler")
+
+    monkeypatch.setattr(report, "get_scheduler", no_scheduler)
+    images = {"frontWall": np.zeros((64, 64, 3), dtype=np.uint8)}
+    with profile_if_slow("slow", threshold=0, directory=str(tmp_path)):
+        assert is_profiling()
+        records = report.run_detections(images, micro_batch=True)
+    assert not is_profiling()
+    assert records["frontWall"]["crack_count"] == 1
+
+    [path] = glob.glob(os.path.join(str(tmp_path), "slow_*.prof"))
+    functions = {name for _, _, name in pstats.Stats(path).stats}
+    assert "__call__" in functions, "the model call is in the profile"
+
+
+def test_overlapping_profiles_are_skipped(tmp_path):
+    """A request that starts while another is profiled runs unprofiled instead of failing"""
+    inside = threading.Event()
+    release = threading.Event()
+    seen = {}
+
+    def other_request():
+        with profile_if_slow("other", threshold=0, directory=str(tmp_path)):
+            seen["profiled"] = is_profiling()
+            inside.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=other_request)
+    thread.start()
+    assert inside.wait(5)
+    with profile_if_slow("overlapping", threshold=0, directory=str(tmp_path)):
+        assert not is_profiling()
+    release.set()
+    thread.join(5)
+
+    assert seen["profiled"]
+    assert [os.path.basename(path).split("_")[0] for path in glob.glob(os.path.join(str(tmp_path), "*.prof"))] == [
+        "other"]
+    with profile_if_slow("after", threshold=0, directory=str(tmp_path)):
+        assert is_profiling()
+
+
+def main():
+    print("🧪 Testing Profiling")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All profiling tests passed!")
+
+
+if __name__ == "__main__":
+    main()
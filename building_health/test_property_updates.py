@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test the write-behind MongoDB updater against a mongomock collection
+"""
+
+import mongomock
+from bson import ObjectId
+
+from property_updates import PropertyUpdater
+
+
+def make_collection(count):
+    collection = mongomock.MongoClient().aasrasewa.properties
+    ids = [str(collection.insert_one({"title": f"Property {i}"}).inserted_id) for i in range(count)]
+    return collection, ids
+
+
+def test_updates_are_coalesced_into_one_bulk_write():
+    """Several updates to one property merge into a single write flushed on demand"""
+    collection, ids = make_collection(2)
+    updater = PropertyUpdater(lambda: collection, batch_size=100, flush_interval=60)
+
+    first = updater.submit(ids[0], {"healthReportPDF": "https://example.com/old.pdf"})
+    second = updater.submit(ids[0], {"healthReportPDF": "https://example.com/new.pdf", "healthScore": 8.5})
+    other = updater.submit(ids[1], {"healthReportPDF": "https://example.com/other.pdf"})
+    assert updater.pending() == 2
+    assert not first.done()
+
+    assert updater.flush() == 2
+    assert first.result(timeout=1) and second.result(timeout=1) and other.result(timeout=1)
+    doc = collection.find_one({"_id": ObjectId(ids[0])})
+    assert doc["healthReportPDF"] == "https://example.com/new.pdf"
+    assert doc["healthScore"] == 8.5
+    updater.close()
+
+
+def test_batch_size_triggers_a_flush():
+    """Reaching batch_size wakes the flusher without waiting for the interval"""
+    collection, ids = make_collection(3)
+    updater = PropertyUpdater(lambda: collection, batch_size=3, flush_interval=60)
+    futures = [updater.submit(pid, {"healthReportPDF": f"https://example.com/{pid}.pdf"}) for pid in ids]
+    assert all(future.result(timeout=5) for future in futures)
+    assert collection.count_documents({"healthReportPDF": {"$exists": True}}) == 3
+    updater.close()
+
+
+def test_missing_and_invalid_properties_resolve_false():
+    """Unknown ids are reported per property; close() flushes what is still pending"""
+    collection, ids = make_collection(1)
+    updater = PropertyUpdater(lambda: collection, batch_size=100, flush_interval=60)
+    found = updater.submit(ids[0], {"healthReportPDF": "https://example.com/a.pdf"})
+    missing = updater.submit(str(ObjectId()), {"healthReportPDF": "https://example.com/b.pdf"})
+    invalid = updater.submit("temp_123", {"healthReportPDF": "https://example.com/c.pdf"})
+
+    assert invalid.result(timeout=1) is False
+    updater.close()
+    assert found.result(timeout=1) is True
+    assert missing.result(timeout=1) is False
+
+
+def main():
+    print("🧪 Testing Write-Behind Property Updates")
+    print("=" * 30)
+    test_updates_are_coalesced_into_one_bulk_write()
+    test_batch_size_triggers_a_flush()
+    test_missing_and_invalid_properties_resolve_false()
+    print("✅ All property update tests passed!")
+
+
+if __name__ == "__main__":
+    main()
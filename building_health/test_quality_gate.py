@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the pre-inference image quality gate and adaptive input sizing
+"""
+
+import glob
+import os
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+import building_health_report as report
+from conftest import TEST_IMAGES_DIR
+from image_fetch import decoded_size
+from quality_gate import ImageQualityError, assess_image, choose_imgsz, find_duplicates
+
+
+def wall_photos(count):
+    paths = sorted(glob.glob(os.path.join(TEST_IMAGES_DIR, "*.jpg")))[:count]
+    return [cv2.imread(path) for path in paths]
+
+
+def encode(image):
+    return cv2.imencode(".jpg", image)[1].tobytes()
+
+
+def test_assess_image_flags_bad_photos():
+    """Real wall photos pass; blurred, dark and tiny images are flagged with a reason"""
+    photo = wall_photos(1)[0]
+    assert assess_image(photo)["issues"] == []
+
+    flat = np.full((600, 800, 3), 128, dtype=np.uint8)
+    assert [issue.split(" ")[0] for issue in assess_image(flat)["issues"]] == ["blurry"]
+    dark = (photo * 0.05).astype(np.uint8)
+    assert any(issue.startswith("underexposed") for issue in assess_image(dark)["issues"])
+    assert any(issue.startswith("resolution") for issue in assess_image(photo[:100, :100])["issues"])
+
+
+def test_duplicates_survive_reencoding_but_not_other_walls():
+    """A resized, brighter copy of a wall is a duplicate; different walls are not"""
+    photos = wall_photos(4)
+    copy = cv2.convertScaleAbs(cv2.resize(photos[0], None, fx=0.5, fy=0.5), alpha=1.0, beta=15)
+    hashes = {f"wall{i}": assess_image(photo)["phash"] for i, photo in enumerate(photos)}
+    hashes["copy"] = assess_image(copy)["phash"]
+    assert find_duplicates(hashes) == {"copy": "wall0"}
+
+
+@pytest.mark.usefixtures("no_detection_cache")
+def test_reject_mode_fails_before_inference(counting_model, monkeypatch):
+    """In reject mode a duplicated wall fails the request without any model time"""
+    photos = wall_photos(3)
+    image_bytes = {"frontWall": encode(photos[0]), "backWall": encode(photos[1]),
+                   "leftWall": encode(photos[2]), "rightWall": encode(photos[0])}
+    monkeypatch.setattr(report, "QUALITY_GATE", "reject")
+    with pytest.raises(ImageQualityError) as error:
+        report.detect_cracks_cached(image_bytes)
+    assert error.value.issues == {"rightWall": ["duplicate of frontWall"]}
+    assert counting_model.images == 0
+
+    monkeypatch.setattr(report, "QUALITY_GATE", "flag")
+    records = report.detect_cracks_cached(image_bytes)
+    assert counting_model.images == 4
+    assert all(record["quality"]["issues"] == [] for record in records.values())
+
+
+@pytest.mark.usefixtures("no_detection_cache")
+def test_decompression_bombs_are_rejected(counting_model, monkeypatch):
+    """Images over PIL's pixel limit reject the request instead of failing it with a server error"""
+    photos = wall_photos(2)
+    bomb = encode(cv2.resize(photos[1], (2000, 1500)))
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1_000_000)
+    assert decoded_size(bomb) == 0
+
+    monkeypatch.setattr(report, "QUALITY_GATE", "flag")
+    with pytest.raises(ImageQualityError) as error:
+        report.detect_cracks_cached({"frontWall": encode(photos[0]), "backWall": bomb})
+    assert list(error.value.issues) == ["backWall"]
+    assert error.value.issues["backWall"][0].startswith("undecodable (Image is too large to decode")
+    assert counting_model.images == 0
+
+
+def test_choose_imgsz_covers_the_longest_side():
+    """Small photos run at a smaller size, large ones at the largest configured size"""
+    assert choose_imgsz((300, 200, 3), sizes=[320, 480, 640]) == 320
+    assert choose_imgsz((333, 500, 3), sizes=[320, 480, 640]) == 640
+    assert choose_imgsz((4080, 2296, 3), sizes=[320, 480, 640]) == 640
+
+
+def main():
+    print("🧪 Testing Image Quality Gate")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All quality gate tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test the cached report layout, print-sized image embedding and the HTML/JSON report outputs
+"""
+
+import json
+import re
+
+import cv2
+import numpy as np
+import pytest
+
+import app as server
+from annotation import ANNOTATION_HEIGHT, ANNOTATION_WIDTH, render_annotation
+from report_renderer import fit_image, page_layout, render_html, render_pdf, report_document
+
+
+def encode(image, quality=90):
+    return cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+def photo(height, width):
+    rng = np.random.default_rng(0)
+    return cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (5, 5), 0)
+
+
+def stored_analysis(walls=4):
+    results = {f"wall{i}": {"score": 8.5 - i, "crackCount": i, "imageUrl": f"https://img.example/{i}.jpg",
+                            "annotatedUrl": None, "quality": {"issues": [], "duplicateOf": None}}
+               for i in range(walls)}
+    results["wall1"]["quality"] = {"issues": ["blurry (sharpness 4.0 below 10.0)"], "duplicateOf": "wall0"}
+    results["wall2"]["annotatedUrl"] = "https://img.example/2-annotated.jpg"
+    return {"averageScore": 7.0, "modelVersion": "crack-detector|imgsz:640", "walls": results}
+
+
+def test_layout_is_cached_two_walls_per_page():
+    """One layout per wall count; the analysis shares the last page only when it has room"""
+    assert page_layout(4) is page_layout(4)
+    pages = {count: sum(op[0] == "page" for op in page_layout(count)) for count in range(1, 7)}
+    assert pages == {1: 1, 2: 2, 3: 2, 4: 3, 5: 3, 6: 4}
+
+
+def test_fit_image_downscales_to_printed_size_only():
+    """Full-resolution photos shrink to the pixels the box needs; print-sized JPEGs pass untouched"""
+    large = encode(photo(3000, 4000))
+    data, width_mm, height_mm = fit_image(large)
+    fitted = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    assert fitted.shape[1] == ANNOTATION_WIDTH and len(data) < len(large) / 5
+    assert round(width_mm) == 120 and round(height_mm) == 90
+
+    portrait = encode(photo(4000, 3000))
+    data, width_mm, height_mm = fit_image(portrait)
+    assert round(height_mm) == 105 and width_mm < 80
+    assert cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR).shape[0] == round(105 / 25.4 * 150)
+
+    annotated = encode(photo(532, ANNOTATION_WIDTH))
+    assert fit_image(annotated)[0] is annotated
+
+
+def test_annotations_are_embedded_without_re_encoding():
+    """render_annotation sizes landscape and portrait walls to the printed box"""
+    for height, width in ((3000, 4000), (4000, 3000), (4000, 1000)):
+        annotated = render_annotation(photo(height, width), [[100, 100, 900, 900]], [0.9])
+        shape = cv2.imdecode(np.frombuffer(annotated, dtype=np.uint8), cv2.IMREAD_COLOR).shape
+        assert shape[1] <= ANNOTATION_WIDTH and shape[0] <= ANNOTATION_HEIGHT
+        assert ANNOTATION_WIDTH in shape or ANNOTATION_HEIGHT in shape
+        assert fit_image(annotated)[0] is annotated
+
+
+def test_render_pdf_html_and_json():
+    """The same document renders to a PDF, a standalone HTML page and JSON with flagged walls"""
+    document = report_document(stored_analysis(walls=5))
+    assert document["severity"] == "Low" and document["walls"][1]["issues"] == [
+        "blurry (sharpness 4.0 below 10.0)", "duplicate of wall0"]
+
+    images = {f"wall{i}": encode(photo(3000, 4000)) for i in range(5)}
+    pdf = render_pdf(document, images)
+    assert pdf.startswith(b"%PDF") and b"/Count 3" in pdf
+    assert len(re.findall(rb"/Subtype /Image", pdf)) == 5
+
+    html = render_html(document).decode("utf-8")
+    assert "Wall1 Wall" in html and "duplicate of wall0" in html
+    assert 'src="https://img.example/2-annotated.jpg"' in html and 'src="https://img.example/0.jpg"' in html
+    assert "data:image/jpeg;base64," in render_html(document, {"wall0": images["wall0"]}).decode("utf-8")
+
+
+def test_report_endpoint_serves_stored_analysis(monkeypatch):
+    """/report renders the stored analysis as HTML or JSON and 404s when there is none"""
+    monkeypatch.setattr(server, "load_wall_analysis",
+                        lambda property_id: stored_analysis() if property_id == "known" else None)
+    client = server.app.test_client()
+    response = client.get("/report/known?format=json")
+    assert response.status_code == 200 and response.mimetype == "application/json"
+    assert [wall["wall"] for wall in json.loads(response.data)["walls"]] == ["wall0", "wall1", "wall2", "wall3"]
+    response = client.get("/report/known")
+    assert response.status_code == 200 and response.mimetype == "text/html"
+    assert client.get("/report/unknown").status_code == 404
+    assert client.get("/report/known?format=pdf").status_code == 400
+
+
+def main():
+    print("🧪 Testing Report Renderer")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All report renderer tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test per-job scratch directories, their TTL/size eviction and the decoded image memory budget
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+import building_health_report as report
+from conftest import TEST_IMAGES_DIR
+from image_fetch import MemoryBudget
+from scratch_space import ScratchSpace
+
+
+def write(directory, name, size):
+    with open(os.path.join(directory, name), "wb") as f:
+        f.write(b"\0" * size)
+
+
+def test_jobs_get_their_own_directories():
+    """Two jobs for the same property never share a directory, and running jobs are kept"""
+    with tempfile.TemporaryDirectory() as root:
+        space = ScratchSpace(root, ttl=0, max_bytes=0, cleanup_interval=3600)
+        with space.job("64b7f0c2e1a9d3f4a5b6c7d8") as first, space.job("64b7f0c2e1a9d3f4a5b6c7d8") as second:
+            assert first != second
+            write(first, "frontWall.jpg", 100)
+            assert space.cleanup(now=time.time() + 10) == 0
+        assert space.cleanup(now=time.time() + 10) == 2
+        assert space.usage() == (0, 0)
+
+
+def test_cleanup_expires_and_evicts_least_recently_used():
+    """Directories past the TTL go, then the oldest ones until the total fits the cap"""
+    with tempfile.TemporaryDirectory() as root:
+        space = ScratchSpace(root, ttl=3600, max_bytes=2500, cleanup_interval=3600)
+        now = time.time()
+        paths = []
+        for age in (7200, 300, 200, 100):
+            with space.job("temp_123") as path:
+                write(path, "report.pdf", 1000)
+            os.utime(path, (now - age, now - age))
+            paths.append(path)
+
+        assert space.cleanup(now=now) == 2
+        assert [os.path.exists(path) for path in paths] == [False, False, True, True]
+        assert space.usage() == (2000, 2)
+
+
+def test_detections_are_saved_in_job_directories(counting_model, monkeypatch, tmp_path, image_names):
+    """Annotated images of separate runs never overwrite each other, even for the same file name"""
+    monkeypatch.setattr(report, "scratch_space", ScratchSpace(str(tmp_path), cleanup_interval=3600))
+    path = os.path.join(TEST_IMAGES_DIR, image_names[0])
+
+    first, second = report.detect_cracks(path)[0], report.detect_cracks(path)[0]
+    batch = report.detect_cracks_batch({"frontWall": path, "backWall": path}, micro_batch=False)
+    saved = [first, second, batch["frontWall"][0], batch["backWall"][0]]
+
+    assert len(set(saved)) == 4 and len({os.path.dirname(p) for p in saved}) == 3
+    assert all(os.path.dirname(os.path.dirname(p)) == str(tmp_path) and os.path.exists(p) for p in saved)
+
+
+def test_memory_budget_waits_for_room():
+    """A reservation waits until earlier ones release; one larger than the budget runs alone"""
+    budget = MemoryBudget(max_bytes=100)
+    order = []
+
+    def job(name, nbytes, hold):
+        with budget.reserve(nbytes):
+            order.append(f"{name} start")
+            time.sleep(hold)
+            order.append(f"{name} end")
+
+    first = threading.Thread(target=job, args=("first", 80, 0.1))
+    first.start()
+    time.sleep(0.02)
+    second = threading.Thread(target=job, args=("second", 500, 0))
+    second.start()
+    first.join()
+    second.join()
+
+    assert order == ["first start", "first end", "second start", "second end"]
+    assert budget.in_use == 0
+
+
+def main():
+    print("🧪 Testing Scratch Space and Memory Budget")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All scratch space tests passed!")
+
+
+if __name__ == "__main__":
+    main()
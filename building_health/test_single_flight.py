@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test that identical in-flight analyses share one computation
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import coalesced_requests
+from single_flight import SingleFlight, image_set_key
+
+IMAGES = {"frontWall": "https://x/f.jpg", "backWall": "https://x/b.jpg",
+          "leftWall": "https://x/l.jpg", "rightWall": "https://x/r.jpg"}
+
+
+def test_concurrent_callers_share_one_call():
+    """Only the first caller runs the analysis; the rest receive its result"""
+    flight = SingleFlight("test")
+    calls = []
+    started = threading.Event()
+
+    def analyse():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "https://example.com/report.pdf"
+
+    before = coalesced_requests.value(level="test")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(flight.do, "key", analyse)
+        started.wait(timeout=5)
+        followers = [pool.submit(flight.do, "key", analyse) for _ in range(3)]
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(calls) == 1
+    assert results[0] == ("https://example.com/report.pdf", False)
+    assert all(result == ("https://example.com/report.pdf", True) for result in results[1:])
+    assert coalesced_requests.value(level="test") - before == 3
+    assert flight.in_flight() == 0
+
+    # Once finished, the same key starts a fresh analysis
+    assert flight.do("key", analyse) == ("https://example.com/report.pdf", False)
+    assert len(calls) == 2
+
+
+def test_errors_reach_every_waiter():
+    """A failed analysis fails the attached requests too, and is not remembered"""
+    flight = SingleFlight("test")
+    started = threading.Event()
+
+    def boom():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("Cloudinary upload failed.")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "key", boom)
+        started.wait(timeout=5)
+        follower = pool.submit(flight.do, "key", boom)
+        for future in (leader, follower):
+            try:
+                future.result()
+                assert False, "expected the analysis error"
+            except RuntimeError as e:
+                assert "Cloudinary" in str(e)
+    assert flight.in_flight() == 0
+
+
+def test_keys_for_temporary_and_real_properties():
+    """Temporary ids share work by image set; real ids keep their own key"""
+    assert image_set_key(IMAGES, "temp_1") == image_set_key(dict(reversed(IMAGES.items())), "temp_2")
+    assert image_set_key(IMAGES, "temp_1") != image_set_key({**IMAGES, "leftWall": "https://x/l2.jpg"}, "temp_1")
+    assert image_set_key(IMAGES, "64b7f0c2a1b2c3d4e5f60718") != image_set_key(IMAGES, "64b7f0c2a1b2c3d4e5f60719")
+    content = {wall: url.encode() for wall, url in IMAGES.items()}
+    assert image_set_key(content, "temp_1") == image_set_key(IMAGES, "temp_1")
+
+
+def main():
+    print("🧪 Testing Single-Flight De-duplication")
+    print("=" * 30)
+    test_concurrent_callers_share_one_call()
+    test_errors_reach_every_waiter()
+    test_keys_for_temporary_and_real_properties()
+    print("✅ All single-flight tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test that importing the server has no side effects and that /readyz waits for a warm model
+"""
+
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from app import app
+from config import DEFAULT_MODEL_NAME
+
+
+class NoopModel:
+    def __call__(self, source, **kwargs):
+        return []
+
+
+def test_import_does_not_connect():
+    """MongoDB and the artifact store are only set up on first use"""
+    # A fresh interpreter, since other tests in this process may already have used them
+    check = ("import app, building_health_report as report; "
+             "assert report._mongo_client is None and report._artifact_store is None")
+    subprocess.run([sys.executable, "-c", check], cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+                   capture_output=True, env={**os.environ, "MODEL_PRELOAD": "0"})
+
+
+def test_readyz_turns_ready_once_warm(isolated_registry):
+    """/healthz is always live; /readyz only reports ready after the model warmed up"""
+    for thread in threading.enumerate():
+        if thread.name == "model-warm-up":
+            thread.join(timeout=30)
+
+    client = app.test_client()
+    assert client.get("/healthz").status_code == 200
+
+    isolated_registry.set_model(DEFAULT_MODEL_NAME, NoopModel())
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.get_json()["status"] in ("warming", "failed")
+
+    isolated_registry.warm_up()
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "ready"
+
+
+def main():
+    print("🧪 Testing Server Startup")
+    print("=" * 30)
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ All startup tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import logging
+
+import numpy as np
+
+from annotation import render_annotation
+from config import TILE_SIZE, TILE_OVERLAP, TILE_NMS_IOU
+from model_registry import registry
+from stage_timing import timed_stage
+
+
+def tile_origins(length, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """Start offsets of overlapping tiles covering [0, length); the last tile is flush with the edge."""
+    if length <= tile_size:
+        return [0]
+    stride = max(1, tile_size - overlap)
+    origins = list(range(0, length - tile_size, stride))
+    origins.append(length - tile_size)
+    return origins
+
+
+def split_tiles(image, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    height, width = image.shape[:2]
+    return [
+        (x, y, image[y:y + tile_size, x:x + tile_size])
+        for y in tile_origins(height, tile_size, overlap)
+        for x in tile_origins(width, tile_size, overlap)
+    ]
+
+
+def box_iou(boxes_a, boxes_b):
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy boxes, as an (N, M) matrix."""
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    inter = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(np.clip(boxes_a[:, 2:] - boxes_a[:, :2], 0, None), axis=1)
+    area_b = np.prod(np.clip(boxes_b[:, 2:] - boxes_b[:, :2], 0, None), axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def nms(boxes, scores, iou_threshold=TILE_NMS_IOU):
+    """Indices of the boxes kept by greedy non-maximum suppression, highest score first."""
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    order = np.argsort(-np.asarray(scores, dtype=np.float32), kind="stable")
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        order = rest[box_iou(boxes[best], boxes[rest])[0] <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def detect_tiled(image, model_name=None, tile_size=TILE_SIZE, overlap=TILE_OVERLAP, iou_threshold=TILE_NMS_IOU):
+    """Detect cracks on overlapping tiles run as one batch, stitched back with NMS.
+
+    Returns the same record as building_health_report.extract_detections.
+    """
+    from inference_backends import result_arrays
+
+    tiles = split_tiles(image, tile_size, overlap)
+    with timed_stage("inference"):
+        results = registry.predict([tile for _, _, tile in tiles], name=model_name)
+
+    all_boxes = []
+    all_scores = []
+    for (x, y, _), result in zip(tiles, results):
+        xyxy, conf, cls = result_arrays(result)
+        cracks = cls.astype(int) == 0
+        all_boxes.append(xyxy[cracks] + np.array([x, y, x, y], dtype=xyxy.dtype))
+        all_scores.append(conf[cracks])
+
+    boxes = np.concatenate(all_boxes) if all_boxes else np.empty((0, 4), dtype=np.float32)
+    scores = np.concatenate(all_scores) if all_scores else np.empty(0, dtype=np.float32)
+    keep = nms(boxes, scores, iou_threshold)
+    boxes, scores = boxes[keep], scores[keep]
+
+    with timed_stage("annotate"):
+        annotated = render_annotation(image, boxes, scores)
+    logging.info(f"🧩 Tiled detection over {len(tiles)} tiles → {len(keep)} cracks after NMS")
+
+    return {
+        "crack_count": int(len(keep)),
+        "confidences": scores.tolist(),
+        "boxes": boxes.tolist(),
+        "annotated": annotated,
+    }
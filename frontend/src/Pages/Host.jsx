@@ -160,42 +160,40 @@ export default function HostPage() {
         images[wall] = result.url;
       });
 
-      // 1. First, call building health analysis to get the PDF URL
+      // 1. Save the property first, so the analysis can be stored against its real ID
+      const propertyData = {
+        ...formData,
+        images,
+        propertyImage: propertyImageUrl,
+      };
+
+      const result = await apiService.registerProperty(propertyData);
+
+      if (!result.success) {
+        setError(result.error || "Failed to register property");
+        setLoading(false);
+        return;
+      }
+
+      // 2. Run the building health analysis; the analysis service stores the PDF URL,
+      // score and per-wall results on the property itself
       const analyzeResponse = await fetch("http://localhost:5001/analyze", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
           images, // { frontWall: url, backWall: url, ... }
-          propertyId: "temp_" + Date.now(), // Temporary ID for analysis
+          propertyId: result.data.property._id,
         }),
       });
-      
-      let healthReportPDF = null;
+
       if (analyzeResponse.ok) {
         const analyzeResult = await analyzeResponse.json();
-        healthReportPDF = analyzeResult.pdf_url;
         console.log("✅ Building health analysis completed successfully");
-        console.log("📄 PDF URL:", healthReportPDF);
+        console.log("📄 PDF URL:", analyzeResult.pdf_url);
       } else {
         const analyzeResult = await analyzeResponse.json();
         console.warn("⚠️ Building health analysis failed:", analyzeResult.message);
-        // Continue without health report - property will be saved without PDF
-      }
-
-      // 2. Now save the property with all data including the PDF URL
-      const propertyData = {
-        ...formData,
-        images,
-        propertyImage: propertyImageUrl,
-        healthReportPDF, // Include the PDF URL if analysis was successful
-      };
-      
-      const result = await apiService.registerProperty(propertyData);
-
-      if (!result.success) {
-        setError(result.error || "Failed to register property");
-        setLoading(false);
-        return;
+        // The property stays registered without a health report
       }
 
       // Property registered successfully